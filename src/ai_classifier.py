@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+AI CONTENT CLASSIFIER
+Single AI / NON-AI caption classifier shared by the daily processor and the
+micro-poller, so both subsystems label the same video the same way.
+
+All rules are compiled into ONE regex at import time:
+  1. Phrase keywords (substring match): 'ai filter', 'filtro ia', ...
+  2. Hashtags #ia / #ki delimited by whitespace
+  3. Standalone words 'ia' / 'ki'
+  4. Any word containing 'ai' that is not on the exclusion list
+
+classify_series() runs the pattern over a whole caption Series in one pass
+(optionally chunked across a process pool for very large scrapes);
+classify_text() / is_ai_text() are the pure-Python path for the pandas-free
+poller.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pandas as pd
+except ImportError:  # micro-poller environment
+    pd = None
+
+
+# =============================================================================
+# KEYWORDS
+# =============================================================================
+
+AI_KEYWORDS = [
+    'artificial intelligence', 'capcut ai', 'capcutai', 'ai filter', 'ai effect',
+    'ai generated', 'ai video', 'ai photo', 'ai template', 'aifilter', 'aieffect',
+    'filtro ki', 'filtro ia', 'ki filter', 'ia filter',  # International: German, Spanish/Portuguese
+]
+# The poller's old 'ki video' / 'ia efecto' style phrases are covered by the
+# standalone 'ki' / 'ia' rule below; as substrings they misfired ('via video').
+
+# These short terms need word boundary matching (not substring)
+AI_KEYWORDS_WORD_BOUNDARY = ['#ia', '#ki', 'ia', 'ki']
+
+AI_EXCLUSIONS = [
+    'aicover', 'aivoice', 'aiart', 'airdrop', 'air', 'hair', 'fair', 'chair', 'stairs',
+    'kia', 'bikini', 'skiing', 'skirt', 'skin', 'kilo', 'kid', 'kids', 'kind', 'king',
+    'kiss', 'kit', 'kite', 'kitchen', 'hiking', 'liking', 'making', 'taking', 'waking',
+    'breaking', 'speaking', 'media', 'via'
+]
+
+AI_LABEL = 'AI'
+NON_AI_LABEL = 'NON-AI'
+
+# Below this many captions a process pool costs more than it saves
+PARALLEL_MIN_ROWS = 200_000
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _build_pattern():
+    hashtags = [kw[1:] for kw in AI_KEYWORDS_WORD_BOUNDARY if kw.startswith('#')]
+    words = [kw for kw in AI_KEYWORDS_WORD_BOUNDARY if not kw.startswith('#')]
+    parts = [
+        '|'.join(re.escape(kw) for kw in AI_KEYWORDS),
+        r'(?:^|(?<=\s))#(?:' + '|'.join(map(re.escape, hashtags)) + r')(?=\s|$)',
+        r'\b(?:' + '|'.join(map(re.escape, words)) + r')\b',
+        # A whole word containing 'ai', unless the whole word is excluded
+        r'\b(?!(?:' + '|'.join(map(re.escape, AI_EXCLUSIONS)) + r')\b)\w*ai\w*\b',
+    ]
+    return re.compile('|'.join('(?:' + p + ')' for p in parts))
+
+
+AI_PATTERN = _build_pattern()
+
+
+# =============================================================================
+# PURE-PYTHON PATH
+# =============================================================================
+
+def is_ai_text(text) -> bool:
+    """True if a single caption is AI-related."""
+    if text is None or (isinstance(text, float) and text != text):
+        return False
+    return AI_PATTERN.search(str(text).lower()) is not None
+
+
+def classify_text(text) -> str:
+    """'AI' or 'NON-AI' for a single caption."""
+    return AI_LABEL if is_ai_text(text) else NON_AI_LABEL
+
+
+def _classify_chunk(texts):
+    """Process-pool worker: list of captions -> list of bools."""
+    search = AI_PATTERN.search
+    return [isinstance(t, str) and search(t.lower()) is not None for t in texts]
+
+
+# =============================================================================
+# VECTORIZED PATH
+# =============================================================================
+
+def _default_workers():
+    try:
+        return int(os.environ.get('AI_CLASSIFIER_WORKERS', '1'))
+    except ValueError:
+        return 1
+
+
+def classify_series(texts, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Label every caption in a Series as 'AI' / 'NON-AI' in one pass.
+
+    workers > 1 (or AI_CLASSIFIER_WORKERS) splits very large inputs into
+    chunks classified in a process pool; small inputs always run in-process.
+    """
+    if workers is None:
+        workers = _default_workers()
+
+    valid = texts.notna()
+    lowered = texts.where(valid, '').astype(str).str.lower()
+
+    if workers > 1 and len(lowered) >= PARALLEL_MIN_ROWS:
+        values = lowered.tolist()
+        chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            flags = [flag for part in pool.map(_classify_chunk, chunks) for flag in part]
+        is_ai = pd.Series(flags, index=texts.index, dtype=bool)
+    else:
+        is_ai = lowered.str.contains(AI_PATTERN, regex=True).astype(bool)
+
+    is_ai = is_ai & valid
+    return is_ai.map({True: AI_LABEL, False: NON_AI_LABEL})
@@ -3,11 +3,22 @@
 APIFY DATA FETCHER
 Fetches TikTok data from Apify API
 INCLUDES: flatten_dict() for nested JSON handling
+Datasets are paged with offset/limit and flattened page by page
+All tasks are downloaded concurrently over one pooled keep-alive session
+Each run's dataset is cached locally by run ID and can be replayed offline
 """
 
+import gzip
 import os
+import threading
+import time
 import requests
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from apify_schema import FIELD_MANIFEST, MANIFEST_PREFIXES, apify_fields_param
 
 
 def flatten_dict(d, parent_key='', sep='_'):
@@ -32,45 +43,383 @@ def flatten_dict(d, parent_key='', sep='_'):
     return dict(items)
 
 
-def flatten_apify_data(data_list):
+def flatten_projected(d, parent_key='', sep='_'):
+    """flatten_dict() restricted to apify_schema.FIELD_MANIFEST.
+    
+    Subtrees that cannot contain a manifest field (videoMeta, covers,
+    authorMeta_avatar...) are skipped without being walked or copied.
+    """
+    if not isinstance(d, dict):
+        return d
+    out = {}
+    for k, v in d.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if isinstance(v, dict):
+            if new_key in MANIFEST_PREFIXES:
+                out.update(flatten_projected(v, new_key, sep))
+        elif new_key in FIELD_MANIFEST:
+            out[new_key] = v
+    return out
+
+
+def flatten_apify_data(data_list, project=False):
     """
     Flatten all records in Apify response.
     Each record may contain nested objects like authorMeta, musicMeta, etc.
+    project=True keeps only the apify_schema field manifest.
     """
     if not data_list:
         return []
     
+    flatten = flatten_projected if project else flatten_dict
     flattened = []
     for record in data_list:
         if isinstance(record, dict):
-            flattened.append(flatten_dict(record))
+            flattened.append(flatten(record))
         else:
             flattened.append(record)
     return flattened
 
 
-def fetch_task_data(task_id, api_token):
-    """Fetch latest data from an Apify task and flatten nested JSON."""
-    if not task_id or not api_token:
-        return None
+# =============================================================================
+# HTTP SESSION (pooled keep-alive + retries)
+# =============================================================================
+
+APIFY_API_BASE = "https://api.apify.com/v2"
+REQUEST_TIMEOUT = 120
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 2.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+DEFAULT_FETCH_WORKERS = 4
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def get_session():
+    """One keep-alive requests.Session shared by every fetch thread."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+    return _session
+
+
+def _retry_delay(attempt, response=None):
+    """Exponential backoff, or the server's Retry-After when it sends one."""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return float(retry_after)
+    return RETRY_BACKOFF_SECONDS * (2 ** attempt)
+
+
+def apify_get(url, api_token, params=None, stream=False, retries=None):
+    """GET an Apify endpoint on the shared session.
     
-    url = f"https://api.apify.com/v2/actor-tasks/{task_id}/runs/last/dataset/items"
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    exponential backoff (MAX_RETRIES, APIFY_MAX_RETRIES). Any other error
+    status raises immediately. Returns the (checked) response.
+    """
+    retries = _env_int('APIFY_MAX_RETRIES', MAX_RETRIES) if retries is None else retries
     headers = {"Authorization": f"Bearer {api_token}"}
+    attempt = 0
+    while True:
+        try:
+            response = get_session().get(url, headers=headers, params=params,
+                                         timeout=REQUEST_TIMEOUT, stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= retries:
+                raise
+            delay = _retry_delay(attempt)
+            print(f"    ⚠️ {type(e).__name__} — retry {attempt + 1}/{retries} in {delay:.0f}s")
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= retries:
+                response.raise_for_status()
+                return response
+            delay = _retry_delay(attempt, response)
+            response.close()
+            print(f"    ⚠️ HTTP {response.status_code} — retry {attempt + 1}/{retries} in {delay:.0f}s")
+        time.sleep(delay)
+        attempt += 1
+
+
+# =============================================================================
+# PAGINATED DATASET STREAMING
+# =============================================================================
+
+DEFAULT_PAGE_SIZE = 5000
+
+
+# Only finished runs are read: a RUNNING / FAILED / ABORTED run's dataset is partial
+FINISHED_STATUS = 'SUCCEEDED'
+
+
+def run_succeeded(run):
+    """True for a run object whose dataset is complete (safe to cache or compare)."""
+    return bool(run and run.get('id') and run.get('status') == FINISHED_STATUS)
+
+
+def resolve_last_run(task_id, api_token):
+    """Return the task's last succeeded run object (id, defaultDatasetId, status, ...).
     
+    Paging a fixed dataset ID instead of runs/last keeps every page on the
+    same run even if a new one finishes mid-download. A run still in
+    progress is skipped in favour of the previous finished one. None on
+    failure.
+    """
+    url = f"{APIFY_API_BASE}/actor-tasks/{task_id}/runs/last"
     try:
-        response = requests.get(url, headers=headers, timeout=120)
-        response.raise_for_status()
-        data = response.json()
-        raw_data = data if isinstance(data, list) else []
+        response = apify_get(url, api_token, params={'status': FINISHED_STATUS})
+        return response.json().get('data') or None
+    except Exception as e:
+        print(f"    Could not resolve last run for {task_id}: {e}")
+        return None
+
+
+def field_projection_enabled():
+    """APIFY_FIELD_PROJECTION=0 fetches and keeps every raw field."""
+    return os.environ.get('APIFY_FIELD_PROJECTION', '1').lower() not in ('0', 'false', 'no')
+
+
+def _fetch_page(items_url, api_token, offset, limit, fmt, project=True):
+    """Download one page and flatten it record by record.
+    
+    Returns (flattened records, total item count reported by Apify or None).
+    With fmt='jsonl' the body is parsed line by line as it streams in, so the
+    raw page is never held as one decoded list. With project=True Apify is
+    asked for the manifest fields only and the flattener keeps just those.
+    """
+    params = {'offset': offset, 'limit': limit, 'format': fmt}
+    if project:
+        params['fields'] = apify_fields_param()
+    flatten = flatten_projected if project else flatten_dict
+    with apify_get(items_url, api_token, params=params, stream=(fmt == 'jsonl')) as response:
+        total = response.headers.get('X-Apify-Pagination-Total')
+        total = int(total) if total and total.isdigit() else None
+        if fmt == 'jsonl':
+            page = []
+            for line in response.iter_lines():
+                if line:
+                    page.append(flatten(json.loads(line)))
+        else:
+            data = response.json()
+            page = flatten_apify_data(data if isinstance(data, list) else [], project=project)
+    return page, total
+
+
+def iter_task_pages(task_id, api_token, page_size=None, fmt=None, workers=None, project=None, run=None):
+    """Yield the last run's dataset one flattened page at a time.
+    
+    page_size / fmt / workers default to APIFY_PAGE_SIZE (5000),
+    APIFY_PAGE_FORMAT ('json' or 'jsonl') and APIFY_PAGE_WORKERS (1);
+    project defaults to field_projection_enabled().
+    With workers > 1 the remaining pages are fetched in parallel, at most
+    `workers` pages in flight, and still yielded in dataset order.
+    Pass `run` (from resolve_last_run) to skip resolving it again.
+    """
+    page_size = page_size or _env_int('APIFY_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    fmt = fmt or os.environ.get('APIFY_PAGE_FORMAT', 'json')
+    workers = workers or _env_int('APIFY_PAGE_WORKERS', 1)
+    project = field_projection_enabled() if project is None else project
+    
+    if run is None:
+        run = resolve_last_run(task_id, api_token)
+    if run and run.get('defaultDatasetId'):
+        items_url = f"{APIFY_API_BASE}/datasets/{run['defaultDatasetId']}/items"
+    else:
+        items_url = f"{APIFY_API_BASE}/actor-tasks/{task_id}/runs/last/dataset/items?status={FINISHED_STATUS}"
+    
+    page, total = _fetch_page(items_url, api_token, 0, page_size, fmt, project)
+    yield page
+    if len(page) < page_size or (total is not None and len(page) >= total):
+        return
+    
+    if total is None or workers <= 1:
+        offset = len(page)
+        while True:
+            page, _ = _fetch_page(items_url, api_token, offset, page_size, fmt, project)
+            if not page:
+                return
+            yield page
+            offset += len(page)
+            if len(page) < page_size or (total is not None and offset >= total):
+                return
+    
+    offsets = list(range(page_size, total, page_size))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for offset in offsets:
+            pending.append(pool.submit(_fetch_page, items_url, api_token, offset, page_size, fmt, project))
+            if len(pending) >= workers:
+                yield pending.popleft().result()[0]
+        while pending:
+            yield pending.popleft().result()[0]
+
+
+def iter_task_records(task_id, api_token, **kwargs):
+    """Yield flattened records from the task's last run, page by page."""
+    for page in iter_task_pages(task_id, api_token, **kwargs):
+        yield from page
+
+
+# =============================================================================
+# RUN-ID RAW CACHE (skip unchanged runs, offline replay)
+# =============================================================================
+
+DEFAULT_RAW_CACHE_KEEP = 3
+
+
+def replay_enabled():
+    """APIFY_REPLAY=1 serves every task from the local run cache, no network."""
+    return os.environ.get('APIFY_REPLAY', '').lower() in ('1', 'true', 'yes')
+
+
+def raw_cache_dir():
+    return os.environ.get('APIFY_RAW_CACHE_DIR') or os.path.join(os.environ.get('CACHE_DIR', 'data'), 'apify_runs')
+
+
+def raw_cache_path(task_id, run_id, project):
+    suffix = '' if project else '_full'
+    return os.path.join(raw_cache_dir(), f"{task_id}_{run_id}{suffix}.jsonl.gz")
+
+
+def _cached_runs(task_id, project):
+    """[(run_id, path)] cached for a task, newest first."""
+    directory = raw_cache_dir()
+    if not os.path.isdir(directory):
+        return []
+    suffix = ('' if project else '_full') + '.jsonl.gz'
+    prefix = f"{task_id}_"
+    found = []
+    for name in os.listdir(directory):
+        if not (name.startswith(prefix) and name.endswith(suffix)):
+            continue
+        run_id = name[len(prefix):-len(suffix)]
+        if project and run_id.endswith('_full'):
+            continue
+        path = os.path.join(directory, name)
+        found.append((os.path.getmtime(path), run_id, path))
+    return [(run_id, path) for _, run_id, path in sorted(found, reverse=True)]
+
+
+def load_raw_cache(path):
+    """Read a cached run (gzip JSON lines of flattened records)."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def prune_raw_cache(task_id, project, keep=None):
+    """Keep only the newest `keep` (APIFY_RAW_CACHE_KEEP, default 3) runs per task."""
+    keep = _env_int('APIFY_RAW_CACHE_KEEP', DEFAULT_RAW_CACHE_KEEP) if keep is None else keep
+    for _, path in _cached_runs(task_id, project)[keep:]:
+        os.remove(path)
+
+
+def resolve_runs(tasks, api_token):
+    """{label: last run object or None} for {label: task_id}.
+    
+    In replay mode the newest cached run stands in for the remote one.
+    """
+    tasks = {label: task_id for label, task_id in tasks.items() if task_id}
+    if replay_enabled():
+        project = field_projection_enabled()
+        runs = {}
+        for label, task_id in tasks.items():
+            cached = _cached_runs(task_id, project)
+            # Only complete downloads are cached
+            runs[label] = {'id': cached[0][0], 'status': FINISHED_STATUS} if cached else None
+        return runs
+    if not tasks:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+        futures = {label: pool.submit(resolve_last_run, task_id, api_token) for label, task_id in tasks.items()}
+        return {label: future.result() for label, future in futures.items()}
+
+
+# =============================================================================
+# TASK FETCH
+# =============================================================================
+
+def fetch_task_data(task_id, api_token, label=None, run=None):
+    """Fetch latest data from an Apify task and flatten nested JSON.
+    
+    Resolves the last run first: a run already in the local cache is loaded
+    from disk instead of downloaded. Otherwise pages through the dataset
+    (iter_task_pages), flattening each page as it arrives and streaming it
+    into the cache, so peak memory is the flattened result plus one raw page.
+    """
+    replay = replay_enabled()
+    if not task_id or not (api_token or replay):
+        return None
+    label = label or task_id
+    project = field_projection_enabled()
+    
+    try:
+        if replay:
+            cached = _cached_runs(task_id, project)
+            if not cached:
+                print(f"    [{label}] Replay: no cached run for task {task_id}")
+                return None
+            run_id, path = cached[0]
+            flattened = load_raw_cache(path)
+            print(f"    [{label}] Replay: {len(flattened)} records from cached run {run_id}")
+            return flattened
         
-        # CRITICAL: Flatten nested JSON before returning
-        flattened = flatten_apify_data(raw_data)
-        print(f"    Fetched {len(raw_data)} records, flattened to columns")
+        if run is None:
+            run = resolve_last_run(task_id, api_token)
+        # Never cache or short-circuit on a run that has not finished
+        run_id = run.get('id') if run_succeeded(run) else None
+        
+        if run_id:
+            path = raw_cache_path(task_id, run_id, project)
+            if os.path.exists(path):
+                flattened = load_raw_cache(path)
+                print(f"    [{label}] Run {run_id} unchanged — {len(flattened)} records from local cache")
+                return flattened
+        
+        # CRITICAL: every page is flattened before it is kept
+        flattened = []
+        pages = 0
+        cache_file = tmp_path = None
+        if run_id:
+            os.makedirs(raw_cache_dir(), exist_ok=True)
+            tmp_path = path + '.tmp'
+            cache_file = gzip.open(tmp_path, 'wt', encoding='utf-8')
+        try:
+            for page in iter_task_pages(task_id, api_token, run=run):
+                flattened.extend(page)
+                pages += 1
+                if cache_file is not None:
+                    for record in page:
+                        cache_file.write(json.dumps(record, default=str))
+                        cache_file.write('\n')
+        except Exception:
+            if cache_file is not None:
+                cache_file.close()
+                os.remove(tmp_path)
+            raise
+        if cache_file is not None:
+            cache_file.close()
+            os.replace(tmp_path, path)
+            prune_raw_cache(task_id, project)
+        print(f"    [{label}] Fetched {len(flattened)} records in {pages} page(s), flattened to columns")
         
         # Debug: Show sample column names to verify flattening worked
         if flattened:
             sample_keys = list(flattened[0].keys())[:10]
-            print(f"    Sample columns: {sample_keys}")
+            print(f"    [{label}] Sample columns: {sample_keys}")
         
         return flattened
     except Exception as e:
@@ -78,36 +427,61 @@ def fetch_task_data(task_id, api_token):
         return None
 
 
-def fetch_all_data():
-    """Fetch all required data from Apify."""
-    api_token = os.environ.get('APIFY_TOKEN')
-    
-    if not api_token:
-        print("  WARNING: APIFY_TOKEN not set!")
-        return None, None, None, None
+def fetch_tasks(tasks, api_token, workers=None, runs=None):
+    """Fetch several tasks concurrently.
     
-    # Task IDs from environment
-    us_video_task = os.environ.get('US_VIDEO_TASK_ID')
-    uk_video_task = os.environ.get('UK_VIDEO_TASK_ID')
-    us_music_task = os.environ.get('US_MUSIC_TASK_ID')
-    uk_music_task = os.environ.get('UK_MUSIC_TASK_ID')
+    tasks: {label: task_id}. Returns {label: records or None}. At most
+    `workers` (APIFY_FETCH_WORKERS, default 4) downloads run at once, so the
+    wall-clock time is roughly the slowest task instead of the sum.
+    runs: optional {label: run} from resolve_runs() to avoid resolving twice.
+    """
+    runs = runs or {}
+    workers = workers or _env_int('APIFY_FETCH_WORKERS', DEFAULT_FETCH_WORKERS)
+    tasks = {label: task_id for label, task_id in tasks.items() if task_id}
+    if not tasks:
+        return {}
     
-    print(f"  Fetching US videos...")
-    us_data = fetch_task_data(us_video_task, api_token)
+    def timed(label, task_id):
+        start = time.perf_counter()
+        records = fetch_task_data(task_id, api_token, label=label, run=runs.get(label))
+        return records, time.perf_counter() - start
     
-    print(f"  Fetching UK videos...")
-    uk_data = fetch_task_data(uk_video_task, api_token)
+    start = time.perf_counter()
+    results, timings = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tasks)))) as pool:
+        futures = {label: pool.submit(timed, label, task_id) for label, task_id in tasks.items()}
+        for label, future in futures.items():
+            results[label], timings[label] = future.result()
+    elapsed = time.perf_counter() - start
     
-    # Music tasks are optional
-    us_music = None
-    uk_music = None
+    for label, seconds in timings.items():
+        status = f"{len(results[label])} records" if results[label] is not None else "FAILED"
+        print(f"    {label}: {status} in {seconds:.1f}s")
+    slowest = max(timings, key=timings.get)
+    print(f"  Fetched {len(tasks)} task(s) in {elapsed:.1f}s "
+          f"(sum {sum(timings.values()):.1f}s, slowest {slowest})")
+    return results
+
+
+def fetch_all_data():
+    """Fetch all required data from Apify (all tasks concurrently)."""
+    api_token = os.environ.get('APIFY_TOKEN')
     
-    if us_music_task:
-        print(f"  Fetching US music...")
-        us_music = fetch_task_data(us_music_task, api_token)
+    if replay_enabled():
+        print("  APIFY_REPLAY set — serving every task from the local run cache")
+    elif not api_token:
+        print("  WARNING: APIFY_TOKEN not set!")
+        return None, None, None, None
     
-    if uk_music_task:
-        print(f"  Fetching UK music...")
-        uk_music = fetch_task_data(uk_music_task, api_token)
+    # Task IDs from environment (music tasks are optional)
+    tasks = {
+        'US videos': os.environ.get('US_VIDEO_TASK_ID'),
+        'UK videos': os.environ.get('UK_VIDEO_TASK_ID'),
+        'US music': os.environ.get('US_MUSIC_TASK_ID'),
+        'UK music': os.environ.get('UK_MUSIC_TASK_ID'),
+    }
+    print(f"  Fetching {', '.join(label for label, task_id in tasks.items() if task_id)}...")
+    results = fetch_tasks(tasks, api_token)
     
-    return us_data, uk_data, us_music, uk_music
+    return (results.get('US videos'), results.get('UK videos'),
+            results.get('US music'), results.get('UK music'))
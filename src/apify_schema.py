@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+APIFY SCHEMA RESOLVER
+Different Apify scraper versions spell the same field differently
+(authorMeta_name vs author vs username, createTimeISO vs createTime, ...).
+
+Instead of probing every alias on every row, the schema is resolved once per
+dataset: we decide which physical columns supply each canonical field, then
+coalesce them into fixed, correctly typed columns. Downstream code only reads
+the canonical names:
+
+    author              str, 'Unknown' when no alias has a value
+    createTime_parsed   naive UTC datetime (NaT when missing)
+    shareCount / diggCount / playCount / commentCount   numeric, 0 when missing
+    music_name / artist / is_original / play_url / music_id
+
+FIELD_MANIFEST (derived from the same alias lists) is what the fetcher asks
+Apify for and keeps when flattening, so a new alias is picked up end to end.
+
+pandas is optional here: micro_poller.py runs with only `requests`
+installed and uses the record-level helpers.
+"""
+
+from datetime import datetime, timezone
+
+try:
+    import pandas as pd
+except ImportError:  # micro-poller environment
+    pd = None
+
+
+# =============================================================================
+# CANONICAL FIELDS (aliases in priority order)
+# =============================================================================
+
+AUTHOR_ALIASES = [
+    # Most common after flattening
+    'authorMeta_name', 'authorMeta_uniqueId', 'authorMeta_nickname',
+    # Alternative naming
+    'author_name', 'authorName', 'author',
+    # Direct fields
+    'username', 'creator', 'nickname',
+    # With dots (in case data comes from different source)
+    'authorMeta.name', 'authorMeta.uniqueId',
+]
+
+CREATE_TIME_ALIASES = ['createTimeISO', 'createTime', 'created_time']
+
+COUNT_ALIASES = {
+    'shareCount': ['shareCount', 'stats_shareCount', 'share_count'],
+    'diggCount': ['diggCount', 'stats_diggCount', 'digg_count'],
+    'playCount': ['playCount', 'stats_playCount', 'play_count'],
+    'commentCount': ['commentCount', 'stats_commentCount', 'comment_count'],
+}
+
+MUSIC_ALIASES = {
+    'music_name': ['musicMeta_musicName', 'musicName'],
+    'artist': ['musicMeta_musicAuthor', 'musicAuthor'],
+    'is_original': ['musicMeta_musicOriginal', 'musicOriginal'],
+    'play_url': ['musicMeta_playUrl', 'playUrl'],
+    'music_id': ['musicMeta_musicId', 'musicId'],
+}
+
+UNKNOWN_AUTHOR = 'Unknown'
+
+# Read directly by downstream code (no aliases)
+PASSTHROUGH_FIELDS = ['webVideoUrl', 'text']
+
+
+def resolve_schema(columns) -> dict:
+    """Map each canonical field to the alias columns present in this dataset.
+
+    Returns {canonical: [physical columns in priority order]}; fields with no
+    source column map to an empty list.
+    """
+    present = set(columns)
+    schema = {
+        'author': [c for c in AUTHOR_ALIASES if c in present],
+        'createTime_parsed': [c for c in CREATE_TIME_ALIASES if c in present],
+    }
+    for canonical, aliases in list(COUNT_ALIASES.items()) + list(MUSIC_ALIASES.items()):
+        schema[canonical] = [c for c in aliases if c in present]
+    return schema
+
+
+# =============================================================================
+# FIELD MANIFEST (fetch-time projection)
+# =============================================================================
+
+def _manifest_fields():
+    fields = list(PASSTHROUGH_FIELDS) + AUTHOR_ALIASES + CREATE_TIME_ALIASES
+    for aliases in list(COUNT_ALIASES.values()) + list(MUSIC_ALIASES.values()):
+        fields.extend(aliases)
+    return list(dict.fromkeys(fields))
+
+
+def _flattened_prefixes(fields, sep='_'):
+    """Every parent key a wanted flattened field could be nested under.
+
+    'authorMeta_name' -> {'authorMeta'}; 'stats_shareCount' -> {'stats'}.
+    """
+    prefixes = set()
+    for name in fields:
+        parts = name.split(sep)
+        for i in range(1, len(parts)):
+            prefixes.add(sep.join(parts[:i]))
+    return prefixes
+
+
+# Flattened (underscore-joined) names the pipeline reads: every alias above
+# plus the passthrough fields. Anything else in an Apify item is dropped.
+FIELD_MANIFEST = frozenset(_manifest_fields())
+MANIFEST_PREFIXES = frozenset(_flattened_prefixes(FIELD_MANIFEST))
+
+
+def apify_fields_param() -> str:
+    """Server-side `fields` selection for the Apify dataset items API.
+
+    Apify picks top-level keys only, so this lists every manifest field and
+    every parent it may be nested under; keys a dataset lacks are ignored.
+    """
+    return ','.join(sorted(FIELD_MANIFEST | MANIFEST_PREFIXES))
+
+
+# =============================================================================
+# DATAFRAME PATH (vectorized)
+# =============================================================================
+
+def _coalesce_text(df, sources):
+    """First non-blank stripped string across source columns, else NaN."""
+    out = pd.Series(pd.NA, index=df.index, dtype='object')
+    for col in sources:
+        s = df[col]
+        s = s.where(s.notna()).astype('object')
+        stripped = s.map(str, na_action='ignore').str.strip()
+        stripped = stripped.where(stripped != '')
+        out = out.where(out.notna(), stripped)
+    return out
+
+
+def _parse_times(s):
+    """Parse ISO strings or epoch seconds into naive UTC datetimes."""
+    if pd.api.types.is_numeric_dtype(s):
+        parsed = pd.to_datetime(s, unit='s', errors='coerce', utc=True)
+    else:
+        parsed = pd.to_datetime(s, errors='coerce', utc=True)
+    return parsed.dt.tz_localize(None)
+
+
+def normalize_frame(df, schema=None):
+    """Add the canonical columns to df (in place) and return it.
+
+    Resolves the schema from df.columns unless one is passed in. Alias
+    columns are left untouched so full-data exports keep the raw fields.
+    """
+    if schema is None:
+        schema = resolve_schema(df.columns)
+
+    author = _coalesce_text(df, schema['author'])
+    df['author'] = author.fillna(UNKNOWN_AUTHOR)
+
+    parsed = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    for col in schema['createTime_parsed']:
+        parsed = parsed.fillna(_parse_times(df[col]))
+    df['createTime_parsed'] = parsed
+
+    for canonical in COUNT_ALIASES:
+        values = pd.Series(float('nan'), index=df.index)
+        for col in schema[canonical]:
+            values = values.fillna(pd.to_numeric(df[col], errors='coerce'))
+        df[canonical] = values.fillna(0)
+
+    for canonical in MUSIC_ALIASES:
+        sources = schema[canonical]
+        if not sources:
+            df[canonical] = pd.NA
+            continue
+        values = df[sources[0]]
+        for col in sources[1:]:
+            values = values.where(values.notna(), df[col])
+        df[canonical] = values
+
+    return df
+
+
+# =============================================================================
+# RECORD PATH (pure Python, used by micro_poller)
+# =============================================================================
+
+def resolve_record_schema(records) -> dict:
+    """Resolve the schema for a list of flattened Apify records."""
+    keys = set()
+    for record in records:
+        if isinstance(record, dict):
+            keys.update(record.keys())
+    return resolve_schema(keys)
+
+
+def _parse_time_value(value):
+    """Parse one ISO string / epoch value into an aware UTC datetime."""
+    if value is None or value == '':
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(float(value), tz=timezone.utc)
+        s = str(value)
+        if s.endswith('Z'):
+            s = s[:-1] + '+00:00'
+        parsed = datetime.fromisoformat(s)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed
+    except (ValueError, TypeError, OverflowError, OSError):
+        return None
+
+
+def normalize_record(record: dict, schema: dict) -> dict:
+    """Return a copy of record with the canonical fields filled in.
+
+    createTime_parsed is an aware UTC datetime (or None) on this path.
+    """
+    out = dict(record)
+
+    author = UNKNOWN_AUTHOR
+    for col in schema['author']:
+        value = record.get(col)
+        if value is not None and str(value).strip():
+            author = str(value).strip()
+            break
+    out['author'] = author
+
+    created = None
+    for col in schema['createTime_parsed']:
+        created = _parse_time_value(record.get(col))
+        if created is not None:
+            break
+    out['createTime_parsed'] = created
+
+    for canonical in COUNT_ALIASES:
+        count = 0
+        for col in schema[canonical]:
+            try:
+                count = float(record.get(col))
+                break
+            except (TypeError, ValueError):
+                continue
+        out[canonical] = count
+
+    for canonical in MUSIC_ALIASES:
+        value = None
+        for col in schema[canonical]:
+            if record.get(col) is not None:
+                value = record[col]
+                break
+        out[canonical] = value
+
+    return out
+
+
+def normalize_records(records) -> list:
+    """Resolve the schema once and normalize every record against it."""
+    schema = resolve_record_schema(records)
+    return [normalize_record(r, schema) for r in records if isinstance(r, dict)]
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+PREDICTION BACKTEST
+Scores each day's velocity predictions against what happened the next day,
+using the prediction columns stored in the dated snapshots
+(snapshot_store.py):
+
+    day D snapshot      momentum_score, predicted_24h, action_window
+    day D+1 snapshot    momentum_score (observed)   -> one scored pair per URL
+
+All days in a range are paired in one keyed lookup and scored with bincount, so
+re-scoring months of history is a single pass over the stacked snapshots.
+Per outcome day:
+
+    direction_accuracy_pct    predicted and observed 24h change agree in sign
+    bias                      total (predicted - observed) / total observed, in %
+    mean_absolute_pct_error   MAPE of predicted_24h vs observed momentum
+    build confusion matrix    build call (ACT NOW / 6-12H window) vs momentum
+                              growing at least BUILD_SUCCESS_GROWTH next day
+
+Usage:
+  python backtest.py                         # every stored day
+  python backtest.py 2026-09-01 2026-09-30   # outcome dates in a range
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import snapshot_store
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Action windows that count as a call to build the template
+BUILD_WINDOWS = ('ACT NOW', '6-12H')
+
+# A build call is correct when momentum grows at least this much by next day
+BUILD_SUCCESS_GROWTH = 0.10
+
+# Bias (%) inside which the model counts as neutral
+BIAS_TOLERANCE_PCT = 10.0
+
+# Predictions from fewer velocity points are flat extrapolations, not scored
+MIN_VELOCITY_POINTS = 2
+
+SCORE_COLUMNS = [
+    'date', 'trends_tracked', 'direction_accuracy_pct', 'bias', 'mean_absolute_pct_error',
+    'correct_build', 'false_positive', 'missed_opportunity', 'correct_skip', 'tuning_suggestion',
+]
+
+OUTCOME_KEYS = {
+    'correct_build': 'CORRECT_BUILD',
+    'false_positive': 'FALSE_POSITIVE',
+    'missed_opportunity': 'MISSED_OPPORTUNITY',
+    'correct_skip': 'CORRECT_SKIP',
+}
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+# =============================================================================
+# PAIRING
+# =============================================================================
+
+def load_prediction_history(cache_dir: str, start=None, end=None) -> pd.DataFrame:
+    """Both markets' snapshots dated start..end with their prediction columns (US rows first)."""
+    frames = [snapshot_store.load_range(market, cache_dir, start=start, end=end, predictions=True)
+              for market in ('us', 'uk')]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _day_numbers(days) -> np.ndarray:
+    """Proleptic ordinals of a column of dates (converted once per distinct date)."""
+    codes, uniques = pd.factorize(pd.Series(days))
+    ordinals = np.array([pd.Timestamp(d).toordinal() for d in uniques], dtype='int64')
+    return ordinals[codes] if len(uniques) else np.array([], dtype='int64')
+
+
+def pair_outcomes(history: pd.DataFrame, observed: pd.DataFrame = None, observed_date=None) -> pd.DataFrame:
+    """Join every day's predictions against the next day's momentum, in one pass.
+
+    history is load_prediction_history() output. observed is an extra day
+    of momentum not yet in the store (today's scrape), dated observed_date;
+    it wins over a stored snapshot of the same day. A URL in both markets
+    counts once per day (first row kept). Only predictions fitted on at
+    least MIN_VELOCITY_POINTS snapshots are scored; a first sighting has no
+    velocity and would only skew direction, bias and MAPE. URLs and days are
+    reduced to one integer key, so the join is a single hash lookup per row.
+    Returns one row per URL and outcome date: date, webVideoUrl,
+    momentum_then, predicted_24h, action_window, momentum_now.
+    """
+    urls = [history['webVideoUrl'].to_numpy(dtype=object)]
+    days = [_day_numbers(history['snapshot_date'])]
+    momentum = [pd.to_numeric(history['momentum_score'], errors='coerce').to_numpy(dtype='float64')]
+    if observed is not None and len(observed) > 0:
+        observed_date = pd.Timestamp(observed_date).date() if observed_date is not None else _utc_today()
+        urls.insert(0, observed['webVideoUrl'].to_numpy(dtype=object))
+        days.insert(0, np.full(len(observed), observed_date.toordinal(), dtype='int64'))
+        momentum.insert(0, pd.to_numeric(observed['momentum_score'], errors='coerce').to_numpy(dtype='float64'))
+    n_observed = len(urls[0]) if len(urls) > 1 else 0
+
+    url_codes, url_values = pd.factorize(np.concatenate(urls))
+    days = np.concatenate(days)
+    momentum = np.concatenate(momentum)
+    stride = max(len(url_values), 1)
+    keys = days * stride + url_codes
+    first = ~pd.Index(keys).duplicated(keep='first')
+
+    # Prediction rows (stored history only) look up the same URL one day later
+    predicted_24h = history['predicted_24h'].to_numpy(dtype='float64')
+    points = pd.to_numeric(history['velocity_points'], errors='coerce').to_numpy(dtype='float64')
+    is_pred = np.zeros(len(keys), dtype=bool)
+    is_pred[n_observed:] = first[n_observed:] & ~np.isnan(predicted_24h) & (points >= MIN_VELOCITY_POINTS)
+    pred_rows = np.flatnonzero(is_pred)
+    out_rows = np.flatnonzero(first)
+    match = pd.Index(keys[out_rows]).get_indexer(keys[pred_rows] + stride)
+    pred_rows, now_rows = pred_rows[match >= 0], out_rows[match[match >= 0]]
+
+    then, now = momentum[pred_rows], momentum[now_rows]
+    ok = ~np.isnan(then) & ~np.isnan(now)
+    pred_rows, now_rows = pred_rows[ok], now_rows[ok]
+
+    outcome_days, day_codes = np.unique(days[now_rows], return_inverse=True)
+    history_rows = pred_rows - n_observed
+    return pd.DataFrame({
+        'date': np.array([date.fromordinal(int(d)) for d in outcome_days], dtype=object)[day_codes],
+        'webVideoUrl': url_values[url_codes[pred_rows]],
+        'momentum_then': momentum[pred_rows],
+        'predicted_24h': predicted_24h[history_rows],
+        'action_window': history['action_window'].fillna('').astype(str).to_numpy()[history_rows],
+        'momentum_now': momentum[now_rows],
+    })
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+def tuning_suggestion(score) -> str:
+    """One-line tuning hint for a day's score (dict or Series)."""
+    if score['trends_tracked'] == 0:
+        return 'Insufficient data for tuning'
+    if score['false_positive'] > score['correct_build'] and score['false_positive'] >= 3:
+        return 'Too many false positives: raise ACT NOW / 6-12H velocity thresholds'
+    if score['missed_opportunity'] > score['correct_build'] and score['missed_opportunity'] >= 3:
+        return 'Missing growers: lower ACT NOW / 6-12H velocity thresholds'
+    if score['bias'] > BIAS_TOLERANCE_PCT:
+        return 'Over-predicting: tighten the acceleration cap'
+    if score['bias'] < -BIAS_TOLERANCE_PCT:
+        return 'Under-predicting: loosen the acceleration cap'
+    return 'Model within tolerance'
+
+
+def score_pairs(pairs: pd.DataFrame) -> pd.DataFrame:
+    """Accuracy per outcome date from pair_outcomes() rows (one bincount per metric)."""
+    if len(pairs) == 0:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    then = pairs['momentum_then'].to_numpy(dtype='float64')
+    now = pairs['momentum_now'].to_numpy(dtype='float64')
+    predicted = pairs['predicted_24h'].to_numpy(dtype='float64')
+    # A handful of distinct windows: match the labels once, not every row
+    window_codes, windows = pd.factorize(pairs['action_window'])
+    build = pd.Series(windows).str.contains('|'.join(BUILD_WINDOWS), na=False).to_numpy()[window_codes]
+    grew = now > then * (1 + BUILD_SUCCESS_GROWTH)
+    has_now = now > 0
+
+    codes, days = pd.factorize(pairs['date'], sort=True)
+    n_days = len(days)
+
+    def total(values):
+        return np.bincount(codes, weights=np.asarray(values, dtype='float64'), minlength=n_days)
+
+    tracked = np.bincount(codes, minlength=n_days)
+    observed = total(now)
+    ape_n = total(has_now)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bias = np.where(observed > 0, 100 * total(predicted - now) / observed, 0.0)
+        mape = np.where(ape_n > 0, 100 * total(np.divide(np.abs(predicted - now), now, out=np.zeros_like(now),
+                                                          where=has_now)) / ape_n, 0.0)
+
+    scores = pd.DataFrame({
+        'date': np.asarray(days, dtype=object),
+        'trends_tracked': tracked,
+        'direction_accuracy_pct': np.round(100 * total(((predicted - then) > 0) == ((now - then) > 0)) / tracked, 1),
+        'bias': np.round(bias, 1) + 0.0,
+        'mean_absolute_pct_error': np.round(mape, 1),
+        'correct_build': total(build & grew).astype('int64'),
+        'false_positive': total(build & ~grew).astype('int64'),
+        'missed_opportunity': total(~build & grew).astype('int64'),
+        'correct_skip': total(~build & ~grew).astype('int64'),
+    })
+    scores['tuning_suggestion'] = [tuning_suggestion(row) for row in scores.to_dict('records')]
+    return scores[SCORE_COLUMNS]
+
+
+def run_backtest(cache_dir: str, start=None, end=None) -> pd.DataFrame:
+    """Scores for every outcome date start..end (inclusive) in the snapshot store."""
+    load_start = pd.Timestamp(start).date() - timedelta(days=1) if start is not None else None
+    history = load_prediction_history(cache_dir, start=load_start, end=end)
+    return score_pairs(pair_outcomes(history))
+
+
+def score_today(cache_dir: str, df_today: pd.DataFrame, today=None) -> pd.DataFrame:
+    """Yesterday's stored predictions scored against today's scraped momentum.
+
+    Returns the pairs (see pair_outcomes) so callers can score any subset
+    of URLs, e.g. one market's workbook.
+    """
+    today = pd.Timestamp(today).date() if today is not None else _utc_today()
+    yesterday = today - timedelta(days=1)
+    history = load_prediction_history(cache_dir, start=yesterday, end=yesterday)
+    if len(history) == 0 or df_today is None or 'webVideoUrl' not in df_today.columns:
+        return pair_outcomes(history.iloc[0:0])
+    return pair_outcomes(history, observed=df_today, observed_date=today)
+
+
+def model_summary(score: dict) -> dict:
+    """One day's score (a score_pairs() row) as the dashboard payload's model_summary dict."""
+    if not score:
+        return {}
+    return {
+        'date': str(score['date']),
+        'trends_tracked': int(score['trends_tracked']),
+        'direction_accuracy_pct': float(score['direction_accuracy_pct']),
+        'bias': float(score['bias']),
+        'mean_absolute_pct_error': float(score['mean_absolute_pct_error']),
+        'action_outcomes': {key: int(score[col]) for col, key in OUTCOME_KEYS.items()},
+        'tuning_suggestions': [score['tuning_suggestion']],
+    }
+
+
+if __name__ == '__main__':
+    cache_dir = os.environ.get('CACHE_DIR', 'data')
+    start = sys.argv[1] if len(sys.argv) > 1 else None
+    end = sys.argv[2] if len(sys.argv) > 2 else None
+    scores = run_backtest(cache_dir, start=start, end=end)
+    if len(scores) == 0:
+        print(f"No scored days in {snapshot_store.snapshot_dir(cache_dir)} (snapshots need stored predictions)")
+    else:
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(scores.to_string(index=False))
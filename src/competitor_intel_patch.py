@@ -21,6 +21,9 @@ from datetime import datetime, timedelta
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
+from workbook_styles import (BOLD_FONT, LINK_FONT, THIN_BORDER, WHITE_BOLD_FONT,
+                             register_styles, solid, style, styles_for)
+
 # Import shared config
 try:
     from v35_enhancements import YOUR_ACCOUNTS, COMPETITOR_ACCOUNTS, _sanitize_cell
@@ -128,12 +131,16 @@ def load_competitor_history(cache_dir, days=7):
 # ANALYSIS FUNCTIONS
 # =============================================================================
 
-def build_competitor_intel(df_today, cache_dir):
+def build_competitor_intel(df_today, cache_dir, history=None):
     """
     Build all competitor intel data structures from today's data + 7-day history.
     Returns dict with all analysis sections ready for Excel rendering.
+    
+    history: output of load_competitor_history(), when the caller already
+    loaded it (shared across the US/UK/combined workbooks).
     """
-    history = load_competitor_history(cache_dir)
+    if history is None:
+        history = load_competitor_history(cache_dir)
     
     comp_lower = [a.lower() for a in COMPETITOR_ACCOUNTS]
     your_lower = [a.lower() for a in YOUR_ACCOUNTS]
@@ -602,27 +609,48 @@ def _analyze_win_loss(comp_df, your_df, history):
 # EXCEL TAB BUILDER
 # =============================================================================
 
+# Named styles for the repeated cells of the tab (see workbook_styles.py)
+register_styles({
+    'intel.cell': style(border=THIN_BORDER),
+    'intel.alt': style(border=THIN_BORDER, fill=solid('F9F9F9')),
+    'intel.cell.link': style(border=THIN_BORDER, font=LINK_FONT),
+    'intel.alt.link': style(border=THIN_BORDER, fill=solid('F9F9F9'), font=LINK_FONT),
+    'intel.mom.3000': style(border=THIN_BORDER, fill=solid('FF0000'), font=WHITE_BOLD_FONT),
+    'intel.mom.2000': style(border=THIN_BORDER, fill=solid('FFE4B5'), font=BOLD_FONT),
+    'intel.mom.1000': style(border=THIN_BORDER, fill=solid('FFFDE0')),
+    'intel.label': style(fill=solid('E8F4FD'), font=BOLD_FONT),
+    'intel.stat': style(fill=solid('F5F5F5'), font=BOLD_FONT),
+    'intel.stat.plain': style(fill=solid('F5F5F5')),
+    'intel.bar': style(font=Font(color='1F4E78')),
+    'intel.gold': style(fill=solid('FFD700')),
+    'intel.gold.cell': style(border=THIN_BORDER, fill=solid('FFD700')),
+    'intel.good': style(fill=solid('E0FFE0')),
+    'intel.fair': style(fill=solid('FFFDE0')),
+    'intel.bad': style(fill=solid('FFE0E0')),
+    'intel.verdict.good': style(fill=solid('E0FFE0'), font=Font(bold=True, color='006600')),
+    'intel.verdict.bad': style(fill=solid('FFE0E0'), font=Font(bold=True, color='CC0000')),
+    'intel.score.label': style(fill=solid('E8F4FD'), font=Font(bold=True, size=11)),
+    **{f'intel.score.{kind}': style(fill=solid(color), font=Font(bold=True, size=14))
+       for kind, color in [('win', '90EE90'), ('loss', 'FF6B6B'), ('draw', 'FFFDE0'), ('rate', 'FFD700')]},
+    'intel.result.win': style(border=THIN_BORDER, fill=solid('90EE90'), font=BOLD_FONT),
+    'intel.result.loss': style(border=THIN_BORDER, fill=solid('FF6B6B'), font=WHITE_BOLD_FONT),
+    'intel.result.draw': style(border=THIN_BORDER, fill=solid('FFFDE0')),
+})
+
+
 def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border):
     """
     Build the COMPETITOR_INTEL tab with 9 sections.
     """
     row = 1
+    st = styles_for(ws)
     
-    # Color palette
+    # Color palette (section headers; every other cell uses a named 'intel.*' style)
     section_fill = PatternFill('solid', fgColor='1F4E78')
     section_font = Font(bold=True, color='FFFFFF', size=12)
     subsection_fill = PatternFill('solid', fgColor='E8F4FD')
     subsection_font = Font(bold=True, size=11)
-    stat_fill = PatternFill('solid', fgColor='F5F5F5')
-    win_fill = PatternFill('solid', fgColor='90EE90')
-    loss_fill = PatternFill('solid', fgColor='FF6B6B')
-    draw_fill = PatternFill('solid', fgColor='FFFDE0')
-    gold_fill = PatternFill('solid', fgColor='FFD700')
-    orange_fill = PatternFill('solid', fgColor='FFE4B5')
-    cyan_fill = PatternFill('solid', fgColor='E0FFFF')
     green_fill = PatternFill('solid', fgColor='E0FFE0')
-    red_fill_light = PatternFill('solid', fgColor='FFE0E0')
-    alt_fill = PatternFill('solid', fgColor='F9F9F9')
     
     days_available = intel.get('days_of_data', 0)
     
@@ -652,28 +680,24 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
                     int(entry.get('views_h',0)), round(entry.get('age_h',0), 1),
                     entry.get('market',''), entry.get('ai_cat',''), entry.get('status',''),
                     entry.get('url','')]
+            row_style = 'intel.alt' if i % 2 == 1 else 'intel.cell'
             for ci, val in enumerate(vals, 1):
-                c = ws.cell(row=row, column=ci, value=_sanitize_cell(val))
-                c.border = thin_border
-                if i % 2 == 1:
-                    c.fill = alt_fill
+                st.apply(ws.cell(row=row, column=ci, value=_sanitize_cell(val)), row_style)
             # Color momentum cell based on value
             mom_cell = ws.cell(row=row, column=6)
             mom = int(entry.get('momentum', 0))
             if mom >= 3000:
-                mom_cell.fill = PatternFill('solid', fgColor='FF0000')
-                mom_cell.font = Font(bold=True, color='FFFFFF')
+                st.apply(mom_cell, 'intel.mom.3000')
             elif mom >= 2000:
-                mom_cell.fill = orange_fill
-                mom_cell.font = Font(bold=True)
+                st.apply(mom_cell, 'intel.mom.2000')
             elif mom >= 1000:
-                mom_cell.fill = draw_fill
+                st.apply(mom_cell, 'intel.mom.1000')
             # Hyperlink URL
             url_cell = ws.cell(row=row, column=13)
             url_val = entry.get('url', '')
             if url_val and str(url_val).startswith('http'):
                 url_cell.hyperlink = str(url_val)
-                url_cell.font = Font(color='0000FF', underline='single')
+                st.apply(url_cell, row_style + '.link')
             row += 1
     else:
         ws.cell(row=row, column=1, value='No competitor posts found. Run for 2+ days to populate.').font = Font(italic=True, color='999999')
@@ -695,10 +719,8 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
         ('Busiest Hour', patterns.get('busiest_hour', 'N/A')),
     ]
     for label, val in stats:
-        c1 = ws.cell(row=row, column=1, value=label)
-        c1.font = Font(bold=True); c1.fill = subsection_fill
-        c2 = ws.cell(row=row, column=2, value=_sanitize_cell(val))
-        c2.fill = stat_fill; c2.font = Font(bold=True)
+        st.apply(ws.cell(row=row, column=1, value=label), 'intel.label')
+        st.apply(ws.cell(row=row, column=2, value=_sanitize_cell(val)), 'intel.stat')
         row += 1
     row += 1
     
@@ -710,10 +732,9 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
             count = by_day.get(day_name, 0)
             c1 = ws.cell(row=row, column=1, value=day_name)
             c2 = ws.cell(row=row, column=2, value=count)
-            c3 = ws.cell(row=row, column=3, value='█' * min(count, 30))
-            c3.font = Font(color='1F4E78')
+            st.apply(ws.cell(row=row, column=3, value='█' * min(count, 30)), 'intel.bar')
             if count == max(by_day.values()):
-                c1.fill = gold_fill; c2.fill = gold_fill
+                st.apply(c1, 'intel.gold'); st.apply(c2, 'intel.gold')
             row += 1
     row += 1
     
@@ -726,10 +747,9 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
             if count > 0:
                 c1 = ws.cell(row=row, column=1, value=f'{hour:02d}:00')
                 c2 = ws.cell(row=row, column=2, value=count)
-                c3 = ws.cell(row=row, column=3, value='█' * min(count, 30))
-                c3.font = Font(color='1F4E78')
+                st.apply(ws.cell(row=row, column=3, value='█' * min(count, 30)), 'intel.bar')
                 if count == max(by_hour.values()):
-                    c1.fill = gold_fill; c2.fill = gold_fill
+                    st.apply(c1, 'intel.gold'); st.apply(c2, 'intel.gold')
                 row += 1
     row += 1
     
@@ -743,14 +763,14 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
         ('Speed Verdict', resp.get('speed_advantage', 'N/A')),
     ]
     for label, val in stats:
-        c1 = ws.cell(row=row, column=1, value=label)
-        c1.font = Font(bold=True); c1.fill = subsection_fill
+        st.apply(ws.cell(row=row, column=1, value=label), 'intel.label')
         c2 = ws.cell(row=row, column=2, value=_sanitize_cell(str(val)))
-        c2.fill = stat_fill
         if 'faster' in str(val).lower() and 'you' in str(val).lower():
-            c2.fill = green_fill; c2.font = Font(bold=True, color='006600')
+            st.apply(c2, 'intel.verdict.good')
         elif 'faster' in str(val).lower() and 'they' in str(val).lower():
-            c2.fill = red_fill_light; c2.font = Font(bold=True, color='CC0000')
+            st.apply(c2, 'intel.verdict.bad')
+        else:
+            st.apply(c2, 'intel.stat.plain')
         row += 1
     
     # Per-account response times
@@ -762,11 +782,11 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
             c1 = ws.cell(row=row, column=1, value=acct)
             c2 = ws.cell(row=row, column=2, value=f'{avg_age}h avg')
             if avg_age < 24:
-                c2.fill = green_fill
+                st.apply(c2, 'intel.good')
             elif avg_age < 48:
-                c2.fill = draw_fill
+                st.apply(c2, 'intel.fair')
             else:
-                c2.fill = red_fill_light
+                st.apply(c2, 'intel.bad')
             row += 1
     row += 1
     
@@ -801,8 +821,7 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
         
         vals = [metric_name, comp_val, your_val, verdict]
         for ci, val in enumerate(vals, 1):
-            c = ws.cell(row=row, column=ci, value=_sanitize_cell(val))
-            c.border = thin_border
+            st.apply(ws.cell(row=row, column=ci, value=_sanitize_cell(val)), 'intel.cell')
         row += 1
     row += 1
     
@@ -825,8 +844,7 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
                 f"{comp_info.get('count',0)} ({comp_info.get('pct',0)}%)",
                 f"{your_info.get('count',0)} ({your_info.get('pct',0)}%)"]
         for ci, val in enumerate(vals, 1):
-            c = ws.cell(row=row, column=ci, value=_sanitize_cell(val))
-            c.border = thin_border
+            st.apply(ws.cell(row=row, column=ci, value=_sanitize_cell(val)), 'intel.cell')
         row += 1
     
     # Market split
@@ -844,8 +862,7 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
                 f"{comp_info.get('count',0)} ({comp_info.get('pct',0)}%)",
                 f"{your_info.get('count',0)} ({your_info.get('pct',0)}%)"]
         for ci, val in enumerate(vals, 1):
-            c = ws.cell(row=row, column=ci, value=_sanitize_cell(val))
-            c.border = thin_border
+            st.apply(ws.cell(row=row, column=ci, value=_sanitize_cell(val)), 'intel.cell')
         row += 1
     
     # Gaps
@@ -854,8 +871,7 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
         row += 1
         row = _write_subsection(ws, row, '⚠️ Coverage Gaps (Where they outweigh you)', subsection_fill, subsection_font)
         for gap in gaps:
-            c = ws.cell(row=row, column=1, value=_sanitize_cell(gap))
-            c.fill = red_fill_light
+            st.apply(ws.cell(row=row, column=1, value=_sanitize_cell(gap)), 'intel.bad')
             ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=4)
             row += 1
     row += 1
@@ -878,8 +894,7 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
     for metric_name, comp_val, your_val in stats:
         vals = [metric_name, comp_val, your_val]
         for ci, val in enumerate(vals, 1):
-            c = ws.cell(row=row, column=ci, value=_sanitize_cell(val))
-            c.border = thin_border
+            st.apply(ws.cell(row=row, column=ci, value=_sanitize_cell(val)), 'intel.cell')
         row += 1
     row += 1
     
@@ -897,10 +912,9 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
     
     top_earner = rev.get('top_earner')
     if top_earner:
-        c1 = ws.cell(row=row, column=1, value='Top Earning Trend')
-        c1.font = Font(bold=True); c1.fill = subsection_fill
-        c2 = ws.cell(row=row, column=2, value=f"${top_earner['est_revenue']:,.0f} — {top_earner['trend']}")
-        c2.fill = gold_fill
+        st.apply(ws.cell(row=row, column=1, value='Top Earning Trend'), 'intel.label')
+        st.apply(ws.cell(row=row, column=2, value=f"${top_earner['est_revenue']:,.0f} — {top_earner['trend']}"),
+                 'intel.gold')
         row += 1
     row += 1
     
@@ -911,11 +925,9 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
         for i, t in enumerate(per_trend[:15]):
             vals = [t.get('account',''), t.get('trend',''), int(t.get('momentum',0)),
                     round(t.get('est_revenue',0), 2), t.get('market',''), t.get('date','')]
+            row_style = 'intel.alt' if i % 2 == 1 else 'intel.cell'
             for ci, val in enumerate(vals, 1):
-                c = ws.cell(row=row, column=ci, value=_sanitize_cell(val))
-                c.border = thin_border
-                if i % 2 == 1:
-                    c.fill = alt_fill
+                st.apply(ws.cell(row=row, column=ci, value=_sanitize_cell(val)), row_style)
             row += 1
     row += 1
     
@@ -932,24 +944,22 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
     for label, comp_key, your_key in [('🌐 BOTH', 'both', 'both'), ('🇺🇸 US Only', 'us_only', 'us_only'), ('🇬🇧 UK Only', 'uk_only', 'uk_only')]:
         vals = [label, comp_cross.get(comp_key, 0), your_cross.get(your_key, 0)]
         for ci, val in enumerate(vals, 1):
-            c = ws.cell(row=row, column=ci, value=_sanitize_cell(val))
-            c.border = thin_border
+            st.apply(ws.cell(row=row, column=ci, value=_sanitize_cell(val)), 'intel.cell')
         if label == '🌐 BOTH':
-            ws.cell(row=row, column=1).fill = gold_fill
+            st.apply(ws.cell(row=row, column=1), 'intel.gold.cell')
         row += 1
     
     # BOTH percentage comparison
     comp_both_pct = comp_cross.get('both_pct', 0)
     your_both_pct = your_cross.get('both_pct', 0)
     row += 1
-    c1 = ws.cell(row=row, column=1, value='BOTH Market Focus')
-    c1.font = Font(bold=True); c1.fill = subsection_fill
+    st.apply(ws.cell(row=row, column=1, value='BOTH Market Focus'), 'intel.label')
     c2 = ws.cell(row=row, column=2, value=f"Comp: {comp_both_pct}%")
     c3 = ws.cell(row=row, column=3, value=f"You: {your_both_pct}%")
     if your_both_pct > comp_both_pct:
-        c3.fill = green_fill
+        st.apply(c3, 'intel.good')
     elif comp_both_pct > your_both_pct:
-        c2.fill = green_fill
+        st.apply(c2, 'intel.good')
     row += 2
     
     # ===== SECTION 9: WIN/LOSS SCORECARD =====
@@ -963,16 +973,14 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
     draws = wl.get('draws', 0)
     
     score_labels = [
-        ('✅ WINS (You caught, they missed)', wins, win_fill),
-        ('❌ LOSSES (They caught, you missed)', losses, loss_fill),
-        ('🟰 DRAWS (Both caught)', draws, draw_fill),
-        ('Win Rate', f"{wl.get('win_rate', 0)}%", gold_fill),
+        ('✅ WINS (You caught, they missed)', wins, 'intel.score.win'),
+        ('❌ LOSSES (They caught, you missed)', losses, 'intel.score.loss'),
+        ('🟰 DRAWS (Both caught)', draws, 'intel.score.draw'),
+        ('Win Rate', f"{wl.get('win_rate', 0)}%", 'intel.score.rate'),
     ]
-    for label, val, fill in score_labels:
-        c1 = ws.cell(row=row, column=1, value=label)
-        c1.font = Font(bold=True, size=11); c1.fill = subsection_fill
-        c2 = ws.cell(row=row, column=2, value=_sanitize_cell(val))
-        c2.font = Font(bold=True, size=14); c2.fill = fill
+    for label, val, score_style in score_labels:
+        st.apply(ws.cell(row=row, column=1, value=label), 'intel.score.label')
+        st.apply(ws.cell(row=row, column=2, value=_sanitize_cell(val)), score_style)
         ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=1)
         row += 1
     row += 1
@@ -986,21 +994,16 @@ def build_competitor_intel_tab(ws, intel, header_fill, header_font, thin_border)
             result = d.get('result', '')
             vals = [result, int(d.get('your_momentum', 0)), int(d.get('comp_momentum', 0)), d.get('url', '')]
             for ci, val in enumerate(vals, 1):
-                c = ws.cell(row=row, column=ci, value=_sanitize_cell(val))
-                c.border = thin_border
+                st.apply(ws.cell(row=row, column=ci, value=_sanitize_cell(val)), 'intel.cell')
             result_cell = ws.cell(row=row, column=1)
-            if result == 'WIN':
-                result_cell.fill = win_fill; result_cell.font = Font(bold=True)
-            elif result == 'LOSS':
-                result_cell.fill = loss_fill; result_cell.font = Font(bold=True, color='FFFFFF')
-            elif result == 'DRAW':
-                result_cell.fill = draw_fill
+            if result in ('WIN', 'LOSS', 'DRAW'):
+                st.apply(result_cell, f'intel.result.{result.lower()}')
             # Hyperlink
             url_cell = ws.cell(row=row, column=4)
             url_val = d.get('url', '')
             if url_val and str(url_val).startswith('http'):
                 url_cell.hyperlink = str(url_val)
-                url_cell.font = Font(color='0000FF', underline='single')
+                st.apply(url_cell, 'intel.cell.link')
             row += 1
     
     # Column widths
@@ -16,15 +16,23 @@ Fixes:
 """
 
 import pandas as pd
+import numpy as np
 import json
 import os
-import re
-from datetime import datetime, timedelta
-from openpyxl import Workbook
+from datetime import datetime, timedelta, timezone
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
+import snapshot_store
+from full_data_export import export_full_data
+from render_scheduler import RenderScheduler
+from sheet_model import CellRule, SheetModel, Styled, add_rules, append_rows, export_models, write_xlsx
+from workbook_styles import register_styles, style
+from apify_schema import AUTHOR_ALIASES, normalize_frame
+from rules_engine import BUILD_NOW_RULES, TUTORIAL_TRIGGER_RULES
+from ai_classifier import classify_text, classify_series
+
 
 def _safe_int(val, default=0):
     """Safely convert to int, returning default for NaN/None."""
@@ -69,21 +77,17 @@ COMPETITOR_ACCOUNTS = [
     'capcut_templatetrends', 'capcut_core', 'capcut.trends.uk1'
 ]
 
-AI_KEYWORDS = [
-    'artificial intelligence', 'capcut ai', 'capcutai', 'ai filter', 'ai effect',
-    'ai generated', 'ai video', 'ai photo', 'ai template', 'aifilter', 'aieffect',
-    'filtro ki', 'filtro ia', 'ki filter', 'ia filter',  # International: German, Spanish/Portuguese
+# Standard output files: (output key, file suffix, rows per video/audio tab)
+BUILD_OUTPUTS = [
+    ('build_top20', 'TOP20', 20),
+    ('build_top100', 'TOP100', None),
 ]
+STANDARD_OUTPUTS = ('build_top20', 'build_top100', 'full_us', 'full_uk')
 
-# These short terms need word boundary matching (not substring)
-AI_KEYWORDS_WORD_BOUNDARY = ['#ia', '#ki', 'ia', 'ki']
-
-AI_EXCLUSIONS = [
-    'aicover', 'aivoice', 'aiart', 'airdrop', 'air', 'hair', 'fair', 'chair', 'stairs',
-    'kia', 'bikini', 'skiing', 'skirt', 'skin', 'kilo', 'kid', 'kids', 'kind', 'king',
-    'kiss', 'kit', 'kite', 'kitchen', 'hiking', 'liking', 'making', 'taking', 'waking',
-    'breaking', 'speaking', 'media', 'via'
-]
+# Status engine: elapsed time assumed for snapshots without a timestamp,
+# and the floor that keeps a quick re-run from dividing by ~0 hours
+STATUS_DEFAULT_HOURS = 24.0
+STATUS_MIN_ELAPSED_HOURS = 1.0
 
 # Colors
 CYAN_FILL = PatternFill(start_color="E0FFFF", end_color="E0FFFF", fill_type="solid")
@@ -114,97 +118,40 @@ URGENCY_COLORS = {
 
 
 def get_author_name(row):
-    """Extract author name from various possible column names.
+    """Extract author name from a single row.
     
-    Apify can return author data in different formats:
-    - Nested: {"authorMeta": {"name": "user"}} -> flattened to authorMeta_name
-    - Direct: {"author": "user"}
-    - Various naming conventions across different scraper versions
+    Row-wise fallback kept for callers outside the pipeline; the enrichment
+    stage coalesces the same aliases (apify_schema.AUTHOR_ALIASES) once per
+    dataset with normalize_frame().
     """
-    possible_cols = [
-        # Most common after flattening
-        'authorMeta_name', 'authorMeta_uniqueId', 'authorMeta_nickname',
-        # Alternative naming
-        'author_name', 'authorName', 'author',
-        # Direct fields
-        'username', 'creator', 'nickname',
-        # With dots (in case data comes from different source)
-        'authorMeta.name', 'authorMeta.uniqueId'
-    ]
-    for col in possible_cols:
+    for col in AUTHOR_ALIASES:
         if col in row.index and pd.notna(row[col]) and str(row[col]).strip():
             return str(row[col]).strip()
     return 'Unknown'
 
 
 def detect_ai(text):
-    """Detect if content is AI-related."""
-    if pd.isna(text):
-        return 'NON-AI'
-    text_lower = str(text).lower()
-    
-    # Check multi-word/phrase keywords (substring match)
-    for kw in AI_KEYWORDS:
-        if kw in text_lower:
-            return 'AI'
-    
-    # Check short keywords with word boundary matching (#ia, #ki, ia, ki)
-    for kw in AI_KEYWORDS_WORD_BOUNDARY:
-        if kw.startswith('#'):
-            # Hashtag: match exactly as #word with boundary after
-            if re.search(r'(?:^|\s)' + re.escape(kw) + r'(?:\s|$)', text_lower):
-                return 'AI'
-        else:
-            # Standalone word: must be whole word
-            if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
-                # Check it's not part of an excluded word
-                match_pos = re.search(r'\b' + re.escape(kw) + r'\b', text_lower)
-                if match_pos:
-                    # Get the full word containing this match
-                    start = match_pos.start()
-                    end = match_pos.end()
-                    # Expand to find the full token
-                    while start > 0 and text_lower[start-1].isalnum():
-                        start -= 1
-                    while end < len(text_lower) and text_lower[end].isalnum():
-                        end += 1
-                    full_word = text_lower[start:end]
-                    if full_word not in AI_EXCLUSIONS:
-                        return 'AI'
-    
-    # Check words containing 'ai' with exclusion list
-    for word in re.findall(r'\b\w*ai\w*\b', text_lower):
-        if word not in AI_EXCLUSIONS:
-            return 'AI'
-    
-    return 'NON-AI'
+    """Detect if content is AI-related (single caption; see ai_classifier)."""
+    return classify_text(text)
 
 
 def calculate_metrics(df):
-    """Calculate time-normalized metrics."""
+    """Calculate time-normalized metrics.
+    
+    Reads the canonical createTime_parsed / shareCount / diggCount / playCount
+    columns produced by apify_schema.normalize_frame() (applied here if the
+    frame has not been normalized yet).
+    """
     now = datetime.utcnow()
     
-    # Find createTime column
-    time_col = None
-    for col in ['createTimeISO', 'createTime', 'created_time']:
-        if col in df.columns:
-            time_col = col
-            break
+    if 'createTime_parsed' not in df.columns:
+        df = normalize_frame(df)
     
-    if time_col is None:
-        df['age_hours'] = 24
-    else:
-        df['createTime_parsed'] = pd.to_datetime(df[time_col], errors='coerce', utc=True)
-        df['createTime_parsed'] = df['createTime_parsed'].dt.tz_localize(None)
+    if df['createTime_parsed'].notna().any():
         df['age_hours'] = (now - df['createTime_parsed']).dt.total_seconds() / 3600
         df['age_hours'] = df['age_hours'].clip(lower=0.1)
-    
-    # Get counts - ensure Series even if column missing
-    for col, default in [('shareCount', 0), ('diggCount', 0), ('playCount', 0)]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        else:
-            df[col] = 0
+    else:
+        df['age_hours'] = 24
     
     # Calculate per-hour metrics
     df['shares_per_hour'] = df['shareCount'] / df['age_hours']
@@ -221,7 +168,7 @@ def calculate_metrics(df):
     return df
 
 
-def calculate_status(df, yesterday_data=None):
+def calculate_status(df, yesterday_data=None, now=None):
     """Calculate 24h status based on raw engagement growth.
     
     v5.8.1 FIX: Uses raw count growth (shares, views, likes gained in 24h)
@@ -229,12 +176,16 @@ def calculate_status(df, yesterday_data=None):
     naturally declines as content ages, making the old approach produce
     COOLING for virtually everything.
     
-    New approach:
-    - Cache stores raw counts (shareCount, diggCount, playCount)
-    - Delta = growth in raw counts over ~24h period
+    Approach:
+    - Cache stores raw counts (shareCount, diggCount, playCount) plus the
+      snapshot's captured_at timestamp
+    - Delta = growth in raw counts since the snapshot, divided by the real
+      elapsed hours (24h assumed when the snapshot has no timestamp)
     - growth_momentum = (delta_shares/h × 10) + (delta_likes/h × 3) + (delta_views/h × 0.01)
     - Same thresholds: SPIKING > 100, RISING > 0, COOLING > -100, DYING <= -100
     
+    Vectorized: one URL-keyed merge against the snapshot + np.select.
+    
     Backward compatible: if old cache format detected (has momentum_score
     but no shareCount), falls back to NEW for all entries.
     """
@@ -242,7 +193,10 @@ def calculate_status(df, yesterday_data=None):
         df['status'] = '🆕 NEW'
         return df
     
-    yesterday_df = pd.DataFrame(yesterday_data)
+    if isinstance(yesterday_data, pd.DataFrame):
+        yesterday_df = yesterday_data
+    else:
+        yesterday_df = pd.DataFrame(yesterday_data)
     
     if 'webVideoUrl' not in yesterday_df.columns or len(yesterday_df) == 0:
         df['status'] = '🆕 NEW'
@@ -259,56 +213,50 @@ def calculate_status(df, yesterday_data=None):
         df['status'] = '🆕 NEW'
         return df
     
-    # Build lookup: URL → {shareCount, diggCount, playCount}
-    yesterday_lookup = {}
-    for _, row in yesterday_df.iterrows():
-        url = row.get('webVideoUrl', '')
-        if url:
-            yesterday_lookup[url] = {
-                'shareCount': float(row.get('shareCount', 0)),
-                'diggCount': float(row.get('diggCount', 0)),
-                'playCount': float(row.get('playCount', 0)),
-            }
-    
-    def get_status(row):
-        url = row.get('webVideoUrl', '')
-        if url not in yesterday_lookup:
-            return '🆕 NEW'
-        
-        prev = yesterday_lookup[url]
-        
-        # Raw count growth over ~24h
-        delta_shares = float(row.get('shareCount', 0)) - prev['shareCount']
-        delta_likes = float(row.get('diggCount', 0)) - prev['diggCount']
-        delta_views = float(row.get('playCount', 0)) - prev['playCount']
-        
-        # Convert to per-hour growth (assuming ~24h between cache reads)
-        # This gives us a "growth rate" comparable to the momentum formula weights
-        hours_between = 24.0  # approximate — cache is saved daily
-        growth_shares_h = delta_shares / hours_between
-        growth_likes_h = delta_likes / hours_between
-        growth_views_h = delta_views / hours_between
-        
-        # Growth momentum using same weights as momentum_score formula
-        growth_momentum = (
-            growth_shares_h * 10 +
-            growth_likes_h * 3 +
-            growth_views_h * 0.01
-        )
-        
-        # Same thresholds as spec
-        if growth_momentum > 100:
-            return '🚀 SPIKING'
-        elif growth_momentum > 0:
-            return '📈 RISING'
-        elif growth_momentum > -100:
-            return '📉 COOLING'
-        else:
-            return '❄️ DYING'
+    if now is None:
+        now = datetime.utcnow()
+    
+    count_cols = ['shareCount', 'diggCount', 'playCount']
+    prev = yesterday_df.reindex(columns=['webVideoUrl'] + count_cols + ['captured_at'])
+    prev = prev[prev['webVideoUrl'].notna() & (prev['webVideoUrl'] != '')]
+    prev = prev.drop_duplicates(subset=['webVideoUrl'], keep='first')
+    for col in count_cols:
+        prev[col] = pd.to_numeric(prev[col], errors='coerce')
     
-    df['status'] = df.apply(get_status, axis=1)
+    # Real elapsed hours since each snapshot row was captured
+    captured = pd.to_datetime(prev['captured_at'], errors='coerce', utc=True).dt.tz_localize(None)
+    prev['hours_between'] = ((now - captured).dt.total_seconds() / 3600).fillna(STATUS_DEFAULT_HOURS)
+    prev['hours_between'] = prev['hours_between'].clip(lower=STATUS_MIN_ELAPSED_HOURS)
+    prev = prev.drop(columns=['captured_at'])
+    
+    merged = df[['webVideoUrl'] + count_cols].merge(
+        prev, on='webVideoUrl', how='left', suffixes=('', '_prev')
+    )
+    hours = merged['hours_between'].to_numpy()
+    
+    # Growth momentum using same weights as momentum_score formula
+    growth_momentum = (
+        (merged['shareCount'] - merged['shareCount_prev']).to_numpy() / hours * 10 +
+        (merged['diggCount'] - merged['diggCount_prev']).to_numpy() / hours * 3 +
+        (merged['playCount'] - merged['playCount_prev']).to_numpy() / hours * 0.01
+    )
+    
+    # Same thresholds as spec (unseen URLs are NEW)
+    df['status'] = np.select(
+        [
+            merged['hours_between'].isna().to_numpy(),
+            growth_momentum > 100,
+            growth_momentum > 0,
+            growth_momentum > -100,
+        ],
+        ['🆕 NEW', '🚀 SPIKING', '📈 RISING', '📉 COOLING'],
+        default='❄️ DYING',
+    )
     
     # Log status distribution for debugging
+    known_hours = prev['hours_between']
+    if len(known_hours) > 0:
+        print(f"  Snapshot age: {known_hours.median():.1f}h (median)")
     status_counts = df['status'].value_counts()
     print(f"  Status distribution: {dict(status_counts)}")
     
@@ -316,50 +264,92 @@ def calculate_status(df, yesterday_data=None):
 
 
 def calculate_build_now(row):
-    """Calculate BUILD_NOW flag."""
-    try:
-        age = row.get('age_hours', 999)
-        shares_h = row.get('shares_per_hour', 0)
-        views_h = row.get('views_per_hour', 0)
-        # Guard against None/NaN
-        if pd.isna(age) or pd.isna(shares_h) or pd.isna(views_h):
-            return 'NO'
-        if age <= 72 and shares_h >= 5 and views_h >= 1000:
-            return 'BUILD NOW'
-        return 'NO'
-    except (TypeError, ValueError):
-        return 'NO'
+    """Calculate BUILD_NOW flag for one row (rules_engine.BUILD_NOW_RULES)."""
+    return BUILD_NOW_RULES.evaluate(row)['BUILD_NOW']
 
 
 def calculate_tutorial_trigger(row):
-    """Calculate tutorial trigger and urgency."""
-    momentum = row.get('momentum_score', 0)
-    shares_h = row.get('shares_per_hour', 0)
-    status = str(row.get('status', ''))
-    build_now = row.get('BUILD_NOW', '')
-    
-    if momentum >= 3000:
-        return '🔴 MAKE_NOW', '🔥 URGENT', f'Momentum {int(momentum)} ≥ 3,000'
-    if shares_h >= 100:
-        return '🔴 MAKE_NOW', '🔥 URGENT', f'Shares/h {round(shares_h,1)} ≥ 100'
-    if '🚀 SPIKING' in status and momentum >= 2000:
-        return '🔴 MAKE_NOW', '🔥 URGENT', f'SPIKING + Momentum {int(momentum)}'
-    if momentum >= 2000:
-        return '🔴 MAKE_NOW', '⚡ HIGH', f'Momentum {int(momentum)} ≥ 2,000'
-    if shares_h >= 60:
-        return '🔴 MAKE_NOW', '⚡ HIGH', f'Shares/h {round(shares_h,1)} ≥ 60'
-    if '🚀 SPIKING' in status and momentum >= 1500:
-        return '🔴 MAKE_NOW', '⚡ HIGH', f'SPIKING + Momentum {int(momentum)}'
-    if momentum >= 1000:
-        return '🟡 WATCH', '🟡 WATCH', f'Momentum {int(momentum)} ≥ 1,000'
-    if shares_h >= 25:
-        return '🟡 WATCH', '🟡 WATCH', f'Shares/h {round(shares_h,1)} ≥ 25'
-    if '📈 RISING' in status and momentum >= 800:
-        return '🟡 WATCH', '🟡 WATCH', f'RISING + Momentum {int(momentum)}'
-    if build_now == 'BUILD NOW':
-        return '🟡 WATCH', '🟡 WATCH', 'BUILD_NOW active'
-    
-    return 'NONE', '', ''
+    """Calculate tutorial trigger, urgency and reason for one row.
+
+    Thresholds live in rules_engine.TUTORIAL_TRIGGER_RULES; frames use
+    TUTORIAL_TRIGGER_RULES.apply() instead of calling this per row.
+    """
+    out = TUTORIAL_TRIGGER_RULES.evaluate(row)
+    return out['TUTORIAL_TRIGGER'], out['URGENCY'], out['trigger_reason']
+
+
+# =============================================================================
+# ENRICHMENT STAGE
+# =============================================================================
+
+BOTH_MARKET_LABEL = '🌐 BOTH'
+MARKET_LABELS = {'us': '🇺🇸 US ONLY', 'uk': '🇬🇧 UK ONLY'}
+
+
+def enrich_market_frame(data, yesterday_data=None):
+    """Run the full enrichment pass for one market.
+
+    Accepts raw Apify records (list of dicts) or a DataFrame and returns a
+    deduplicated frame with the canonical schema columns (apify_schema),
+    metrics, author, AI_CATEGORY, status and BUILD_NOW.
+    Market and trigger columns are added by build_enriched_frames() once both
+    markets are known.
+    """
+    if isinstance(data, pd.DataFrame):
+        df = data.copy()
+    else:
+        df = pd.DataFrame(data) if data else pd.DataFrame()
+    if len(df) == 0 or 'webVideoUrl' not in df.columns:
+        return pd.DataFrame()
+    
+    df = df.drop_duplicates(subset=['webVideoUrl'], keep='first').reset_index(drop=True)
+    df = normalize_frame(df)
+    df = calculate_metrics(df)
+    df = calculate_status(df, yesterday_data)
+    df['acceleration_status'] = df['status']
+    text = df['text'] if 'text' in df.columns else pd.Series('', index=df.index)
+    df['AI_CATEGORY'] = classify_series(text)
+    df['BUILD_NOW'] = BUILD_NOW_RULES.apply(df)['BUILD_NOW']
+    return df
+
+
+def build_enriched_frames(us_data, uk_data, yesterday_us=None, yesterday_uk=None):
+    """Enrich each market once and derive the combined frame.
+
+    Returns {'us': df, 'uk': df, 'combined': df}. The combined frame is the
+    URL-deduplicated union (US row wins for BOTH-market videos). Every pipeline
+    step reads these frames instead of re-running enrichment, so treat them as
+    read-only: copy before adding or overwriting columns.
+    """
+    print("  Enriching US data...")
+    us_df = enrich_market_frame(us_data, yesterday_us)
+    print("  Enriching UK data...")
+    uk_df = enrich_market_frame(uk_data, yesterday_uk)
+    
+    # Cross-market detection
+    us_urls = set(us_df['webVideoUrl']) if len(us_df) > 0 else set()
+    uk_urls = set(uk_df['webVideoUrl']) if len(uk_df) > 0 else set()
+    both_urls = us_urls & uk_urls
+    
+    for df, key in [(us_df, 'us'), (uk_df, 'uk')]:
+        if len(df) == 0:
+            continue
+        df['Market'] = df['webVideoUrl'].isin(both_urls).map(
+            {True: BOTH_MARKET_LABEL, False: MARKET_LABELS[key]}
+        )
+        triggers = TUTORIAL_TRIGGER_RULES.apply(df)
+        for col in ('TUTORIAL_TRIGGER', 'URGENCY', 'trigger_reason'):
+            df[col] = triggers[col]
+    
+    frames = [df for df in (us_df, uk_df) if len(df) > 0]
+    if frames:
+        combined = pd.concat(frames, ignore_index=True)
+        combined = combined.drop_duplicates(subset=['webVideoUrl'], keep='first').reset_index(drop=True)
+    else:
+        combined = pd.DataFrame()
+    
+    print(f"  Enriched: US {len(us_df)}, UK {len(uk_df)}, combined {len(combined)} ({len(both_urls)} in BOTH)")
+    return {'us': us_df, 'uk': uk_df, 'combined': combined}
 
 
 def process_audio_data(audio_data):
@@ -367,20 +357,16 @@ def process_audio_data(audio_data):
     if not audio_data:
         return pd.DataFrame()
     
-    df = pd.DataFrame(audio_data)
+    df = normalize_frame(pd.DataFrame(audio_data))
     
-    # Deduplicate by musicId or musicName
-    if 'musicMeta_musicId' in df.columns:
-        df = df.drop_duplicates(subset=['musicMeta_musicId'], keep='first')
-    elif 'musicMeta_musicName' in df.columns:
-        df = df.drop_duplicates(subset=['musicMeta_musicName'], keep='first')
+    # Deduplicate by music id, falling back to music name
+    if df['music_id'].notna().any():
+        df = df.drop_duplicates(subset=['music_id'], keep='first')
+    elif df['music_name'].notna().any():
+        df = df.drop_duplicates(subset=['music_name'], keep='first')
     
     # Extract music metadata
-    result = pd.DataFrame()
-    result['music_name'] = df.get('musicMeta_musicName', df.get('musicName', 'Unknown'))
-    result['artist'] = df.get('musicMeta_musicAuthor', df.get('musicAuthor', 'Unknown'))
-    result['is_original'] = df.get('musicMeta_musicOriginal', df.get('musicOriginal', False))
-    result['play_url'] = df.get('musicMeta_playUrl', df.get('playUrl', ''))
+    result = df[['music_name', 'artist', 'is_original', 'play_url']].copy()
     result['used_count'] = 1  # Each row is one video using this audio
     
     # Aggregate by music
@@ -394,64 +380,37 @@ def process_audio_data(audio_data):
     return result.head(100)
 
 
-def process_data(us_data, uk_data, us_music_data, uk_music_data, yesterday_us, yesterday_uk, output_dir, cache_dir, revenue_lookup=None):
+def process_data(us_data, uk_data, us_music_data, uk_music_data, yesterday_us, yesterday_uk, output_dir, cache_dir, revenue_lookup=None, enriched=None, scheduler=None, outputs=None):
     """Main processing function.
     
     Args:
         revenue_lookup: dict mapping TikTok URL → revenue data (from revenue_persistence.py)
+        enriched: output of build_enriched_frames(); built here when not supplied
+        scheduler: RenderScheduler to queue the workbooks on; without one they
+            are rendered before this function returns
+        outputs: {output key: tabs or None} over STANDARD_OUTPUTS; files left
+            out are not built, None builds every tab (outputs=None = all
+            files). The summary report is always written.
     """
     today = datetime.now().strftime('%Y-%m-%d')
     stats = {}
+    if outputs is None:
+        outputs = dict.fromkeys(STANDARD_OUTPUTS)
+    build_targets = [
+        (f"{output_dir}/BUILD_TODAY_{suffix}_{today}.xlsx", suffix, limit, outputs[key])
+        for key, suffix, limit in BUILD_OUTPUTS if key in outputs
+    ]
     
-    print("  Processing US data...")
-    us_df = pd.DataFrame(us_data) if us_data else pd.DataFrame()
-    if len(us_df) > 0:
-        us_df = us_df.drop_duplicates(subset=['webVideoUrl'], keep='first')
-        us_df = calculate_metrics(us_df)
-        us_df = calculate_status(us_df, yesterday_us)
-        us_df['author'] = us_df.apply(get_author_name, axis=1)
-        us_df['AI_CATEGORY'] = us_df.get('text', pd.Series([''])).apply(detect_ai)
-        us_df['BUILD_NOW'] = us_df.apply(calculate_build_now, axis=1)
-    
-    print("  Processing UK data...")
-    uk_df = pd.DataFrame(uk_data) if uk_data else pd.DataFrame()
-    if len(uk_df) > 0:
-        uk_df = uk_df.drop_duplicates(subset=['webVideoUrl'], keep='first')
-        uk_df = calculate_metrics(uk_df)
-        uk_df = calculate_status(uk_df, yesterday_uk)
-        uk_df['author'] = uk_df.apply(get_author_name, axis=1)
-        uk_df['AI_CATEGORY'] = uk_df.get('text', pd.Series([''])).apply(detect_ai)
-        uk_df['BUILD_NOW'] = uk_df.apply(calculate_build_now, axis=1)
-    
-    # Cross-market detection
-    print("  Detecting cross-market content...")
-    us_urls = set(us_df['webVideoUrl']) if len(us_df) > 0 else set()
-    uk_urls = set(uk_df['webVideoUrl']) if len(uk_df) > 0 else set()
-    both_urls = us_urls & uk_urls
-    
-    if len(us_df) > 0:
-        us_df['market'] = us_df['webVideoUrl'].apply(
-            lambda u: '🌐 BOTH' if u in both_urls else '🇺🇸 US ONLY'
-        )
-    
-    if len(uk_df) > 0:
-        uk_df['market'] = uk_df['webVideoUrl'].apply(
-            lambda u: '🌐 BOTH' if u in both_urls else '🇬🇧 UK ONLY'
-        )
-    
-    # Calculate triggers for ALL data
-    print("  Calculating tutorial triggers for ALL data...")
-    for df in [us_df, uk_df]:
-        if len(df) > 0:
-            triggers = df.apply(lambda row: calculate_tutorial_trigger(row), axis=1)
-            df['TUTORIAL_TRIGGER'] = [t[0] for t in triggers]
-            df['URGENCY'] = [t[1] for t in triggers]
-            df['trigger_reason'] = [t[2] for t in triggers]
+    if enriched is None:
+        enriched = build_enriched_frames(us_data, uk_data, yesterday_us, yesterday_uk)
+    us_df = enriched['us']
+    uk_df = enriched['uk']
+    both_count = int((enriched['combined']['Market'] == BOTH_MARKET_LABEL).sum()) if len(enriched['combined']) > 0 else 0
     
     # Store processed data (before 72h filter) for YOUR posts and competitor detection
     # BUG FIX 1 & 2: Use ALL processed data, not just fresh
-    us_processed = us_df.copy() if len(us_df) > 0 else pd.DataFrame()
-    uk_processed = uk_df.copy() if len(uk_df) > 0 else pd.DataFrame()
+    us_processed = us_df
+    uk_processed = uk_df
     
     # Fresh content filter (72h) - only for TOP100 video sheets
     us_fresh = us_df[us_df['age_hours'] <= 72].copy() if len(us_df) > 0 else pd.DataFrame()
@@ -463,11 +422,6 @@ def process_data(us_data, uk_data, us_music_data, uk_music_data, yesterday_us, y
     uk_ai_100 = uk_fresh[uk_fresh['AI_CATEGORY'] == 'AI'].nlargest(100, 'momentum_score') if len(uk_fresh) > 0 else pd.DataFrame()
     uk_non_100 = uk_fresh[uk_fresh['AI_CATEGORY'] == 'NON-AI'].nlargest(100, 'momentum_score') if len(uk_fresh) > 0 else pd.DataFrame()
     
-    us_ai_20 = us_ai_100.head(20)
-    us_non_20 = us_non_100.head(20)
-    uk_ai_20 = uk_ai_100.head(20)
-    uk_non_20 = uk_non_100.head(20)
-    
     # BUG FIX 1: Find YOUR posts from PROCESSED data (not fresh)
     # BUG FIX 4: DON'T deduplicate across markets - concat US and UK separately
     print("  Finding YOUR posts from ALL processed data...")
@@ -485,25 +439,27 @@ def process_data(us_data, uk_data, us_music_data, uk_music_data, yesterday_us, y
     # BUG FIX 3: Calculate trigger counts from ALL processed data (not YOUR posts)
     all_processed = pd.concat([us_processed, uk_processed]).drop_duplicates(subset=['webVideoUrl']) if len(us_processed) > 0 or len(uk_processed) > 0 else pd.DataFrame()
     
-    # Process audio data (BUG FIX 5)
+    # Process audio data (BUG FIX 5) - only the BUILD_TODAY audio tabs use it
     # FALLBACK: If no separate music data, extract from video data
-    print("  Processing audio data...")
-    if us_music_data:
-        us_audio = process_audio_data(us_music_data)
-    else:
-        # Extract music from video data as fallback
-        print("    No separate US music data - extracting from video data")
-        us_audio = process_audio_data(us_data)
-    
-    if uk_music_data:
-        uk_audio = process_audio_data(uk_music_data)
-    else:
-        # Extract music from video data as fallback
-        print("    No separate UK music data - extracting from video data")
-        uk_audio = process_audio_data(uk_data)
-    
-    print(f"    US audio tracks: {len(us_audio)}")
-    print(f"    UK audio tracks: {len(uk_audio)}")
+    us_audio = uk_audio = pd.DataFrame()
+    if any(tabs is None or {'UK_AUDIO', 'US_AUDIO'} & set(tabs) for *_, tabs in build_targets):
+        print("  Processing audio data...")
+        if us_music_data:
+            us_audio = process_audio_data(us_music_data)
+        else:
+            # Extract music from video data as fallback
+            print("    No separate US music data - extracting from video data")
+            us_audio = process_audio_data(us_data)
+        
+        if uk_music_data:
+            uk_audio = process_audio_data(uk_music_data)
+        else:
+            # Extract music from video data as fallback
+            print("    No separate UK music data - extracting from video data")
+            uk_audio = process_audio_data(uk_data)
+        
+        print(f"    US audio tracks: {len(us_audio)}")
+        print(f"    UK audio tracks: {len(uk_audio)}")
     
     # Stats - BUG FIX 3: Count triggers from ALL data
     stats['us_raw'] = len(us_data) if us_data else 0
@@ -512,7 +468,7 @@ def process_data(us_data, uk_data, us_music_data, uk_music_data, yesterday_us, y
     stats['uk_unique'] = len(uk_processed)
     stats['us_fresh'] = len(us_fresh)
     stats['uk_fresh'] = len(uk_fresh)
-    stats['both_count'] = len(both_urls)
+    stats['both_count'] = both_count
     stats['your_posts'] = len(your_posts)
     stats['competitor'] = len(competitor_posts)
     
@@ -534,30 +490,28 @@ def process_data(us_data, uk_data, us_music_data, uk_music_data, yesterday_us, y
     
     # Create Excel files
     print("  Creating Excel files...")
+    render_queue = scheduler if scheduler is not None else RenderScheduler()
+    
+    # BUILD_TODAY_TOP20 + BUILD_TODAY_TOP100 in one render pass:
+    # rows are formatted once at TOP100 depth, TOP20 writes the first 20
+    if build_targets:
+        create_build_files(
+            build_targets,
+            uk_ai_100, uk_non_100, uk_audio,
+            us_ai_100, us_non_100, us_audio,
+            your_posts, stats, today,
+            revenue_lookup=revenue_lookup,
+            scheduler=render_queue
+        )
     
-    # BUILD_TODAY_TOP20
-    create_build_file(
-        f"{output_dir}/BUILD_TODAY_TOP20_{today}.xlsx",
-        uk_ai_20, uk_non_20, uk_audio.head(20),
-        us_ai_20, us_non_20, us_audio.head(20),
-        your_posts, stats, today, "TOP20",
-        revenue_lookup=revenue_lookup
-    )
-    
-    # BUILD_TODAY_TOP100
-    create_build_file(
-        f"{output_dir}/BUILD_TODAY_TOP100_{today}.xlsx",
-        uk_ai_100, uk_non_100, uk_audio,
-        us_ai_100, us_non_100, us_audio,
-        your_posts, stats, today, "TOP100",
-        revenue_lookup=revenue_lookup
-    )
+    # Full data files (curated columns, FULL_EXPORT_FORMAT backend)
+    if 'full_us' in outputs and len(us_df) > 0:
+        export_full_data(us_df, f"{output_dir}/TikTok_Trend_System_US_{today}", scheduler=render_queue)
+    if 'full_uk' in outputs and len(uk_df) > 0:
+        export_full_data(uk_df, f"{output_dir}/TikTok_Trend_System_UK_{today}", scheduler=render_queue)
     
-    # Full data files
-    if len(us_df) > 0:
-        us_df.to_excel(f"{output_dir}/TikTok_Trend_System_US_{today}.xlsx", index=False)
-    if len(uk_df) > 0:
-        uk_df.to_excel(f"{output_dir}/TikTok_Trend_System_UK_{today}.xlsx", index=False)
+    if scheduler is None:
+        render_queue.run()
     
     # Summary report
     with open(f"{output_dir}/SUMMARY_REPORT_{today}.txt", 'w') as f:
@@ -581,53 +535,99 @@ def process_data(us_data, uk_data, us_music_data, uk_music_data, yesterday_us, y
     return stats
 
 
-def create_build_file(filepath, uk_ai, uk_non, uk_audio, us_ai, us_non, us_audio, your_posts, stats, today, suffix, revenue_lookup=None):
-    """Create BUILD_TODAY Excel file with correct tab order."""
-    wb = Workbook()
-    
-    # START_HERE sheet (BUG FIX 6: Full summary)
-    ws = wb.active
-    ws.title = "START_HERE"
-    create_start_here_sheet(ws, stats, today)
-    
-    # BUG FIX 7: Correct tab order - UK together, US together
-    # UK Video sheets
-    ws = wb.create_sheet(f"UK_AI_{suffix}")
-    create_video_sheet(ws, uk_ai)
-    
-    ws = wb.create_sheet(f"UK_NON_AI_{suffix}")
-    create_video_sheet(ws, uk_non)
-    
-    # UK Audio sheet (BUG FIX 5)
-    ws = wb.create_sheet(f"UK_AUDIO_{suffix}")
-    create_audio_sheet(ws, uk_audio)
-    
-    # US Video sheets
-    ws = wb.create_sheet(f"US_AI_{suffix}")
-    create_video_sheet(ws, us_ai)
-    
-    ws = wb.create_sheet(f"US_NON_AI_{suffix}")
-    create_video_sheet(ws, us_non)
-    
-    # US Audio sheet (BUG FIX 5)
-    ws = wb.create_sheet(f"US_AUDIO_{suffix}")
-    create_audio_sheet(ws, us_audio)
-    
-    # MY_PERFORMANCE sheet
-    ws = wb.create_sheet("MY_PERFORMANCE")
-    create_my_performance_sheet(ws, your_posts, today, revenue_lookup=revenue_lookup)
-    
-    wb.save(filepath)
+# =============================================================================
+# BUILD_TODAY WORKBOOKS (write-only / streaming)
+# =============================================================================
+# Every tab is prepared once as a SheetModel (sheet_model.py) whose styled
+# cells carry one of the named 'build.*' styles below; the xlsx sink streams
+# them into a write_only=True workbook, so memory no longer grows with the
+# whole cell graph and no style object is built per cell. Status, market,
+# trigger/urgency and account colours are conditional-format CellRules over
+# the whole tab, so body cells are written unstyled.
+
+URGENT_FONT = Font(color="FFFFFF")
+TITLE_FONT = Font(bold=True, size=14)
+SECTION_FONT = Font(bold=True, size=12)
+
+YOUR_ACCOUNTS_LOWER = {a.lower() for a in YOUR_ACCOUNTS}
+COMPETITOR_ACCOUNTS_LOWER = {a.lower() for a in COMPETITOR_ACCOUNTS}
+
+
+def _label_key(label):
+    """'🔥 URGENT' -> 'urgent' (style IDs stay plain ASCII)."""
+    return label.split()[-1].lower()
+
+
+STATUS_STYLES = {label: f"build.status.{_label_key(label)}" for label in STATUS_COLORS}
+TRIGGER_STYLES = {label: f"build.trigger.{_label_key(label)}" for label in TRIGGER_COLORS}
+URGENCY_STYLES = {label: f"build.urgency.{_label_key(label)}" for label in URGENCY_COLORS}
+
+register_styles({
+    'build.header': style(fill=HEADER_FILL, font=HEADER_FONT),
+    'build.title': style(font=TITLE_FONT),
+    'build.section': style(font=SECTION_FONT),
+    'build.cyan': style(fill=CYAN_FILL),
+    'build.orange': style(fill=ORANGE_FILL),
+    'build.gold': style(fill=GOLD_FILL),
+    'build.manual': style(fill=LIGHT_YELLOW_FILL),
+    **{STATUS_STYLES[label]: style(fill=fill) for label, fill in STATUS_COLORS.items()},
+    **{TRIGGER_STYLES[label]: style(fill=fill) for label, fill in TRIGGER_COLORS.items()},
+    **{URGENCY_STYLES[label]: style(fill=fill, font=URGENT_FONT if label == '🔥 URGENT' else None)
+       for label, fill in URGENCY_COLORS.items()},
+})
+
+
+def _header_row(headers):
+    return [Styled(header, 'build.header') for header in headers]
+
+
+# -----------------------------------------------------------------------------
+# Row preparation: every value is formatted and styled exactly once here, then
+# emitted into as many workbooks as need it (TOP20 takes a prefix of TOP100).
+# -----------------------------------------------------------------------------
+
+VIDEO_HEADERS = ['#', 'Market', 'Status', 'Trend', 'Creator', 'Age', 'Momentum', 'Shares/h', 'Views/h', 'URL', 'Account']
+AUDIO_HEADERS = ['#', 'Status', 'Music Name', 'Artist', 'Type', 'Used By', 'Play URL']
+MY_PERFORMANCE_HEADERS = [
+    'Date', 'Account', 'Trend', 'Age', 'Momentum', 'Status', 'Market',
+    'Views/h', 'Shares/h', 'BUILD_NOW', 'TikTok URL', 'TUTORIAL_TRIGGER',
+    'URGENCY', 'Trigger Reason', 'Competitor Count', 'Tutorial Link',
+    'Template Link', 'Revenue', 'Notes'
+]
 
+# Account column of the video tabs (the key of the row highlight rules)
+YOUR_ACCOUNT_FLAG = '⭐ YOURS'
+COMPETITOR_ACCOUNT_FLAG = '🎯 COMPETITOR'
+
+# Conditional formats, highest priority first: YOUR/COMPETITOR rows
+# override the market and status colours
+VIDEO_RULES = [
+    CellRule('build.cyan', 'A:K', key='K', values=(YOUR_ACCOUNT_FLAG,)),
+    CellRule('build.orange', 'A:K', key='K', values=(COMPETITOR_ACCOUNT_FLAG,)),
+    # GOLD on column B ONLY if BOTH (not whole row)
+    CellRule('build.gold', 'B', key='B', values=(BOTH_MARKET_LABEL,)),
+    # Status color on column C only
+    *[CellRule(style_id, 'C', key='C', values=(label,)) for label, style_id in STATUS_STYLES.items()],
+]
 
-def create_start_here_sheet(ws, stats, today):
-    """Create START_HERE summary sheet (BUG FIX 6)."""
-    ws['A1'] = f"TikTok Trend System v5.8.1 - {today}"
-    ws['A1'].font = Font(bold=True, size=14)
-    
-    ws['A3'] = "📊 DAILY SUMMARY"
-    ws['A3'].font = Font(bold=True, size=12)
-    
+MY_PERFORMANCE_RULES = [
+    # Data columns 1-11 in CYAN
+    CellRule('build.cyan', 'A:K'),
+    # Trigger / urgency colors on columns 12-13
+    *[CellRule(style_id, 'L', key='L', values=(label,)) for label, style_id in TRIGGER_STYLES.items()],
+    *[CellRule(style_id, 'M', key='M', values=(label,)) for label, style_id in URGENCY_STYLES.items()],
+    # Light yellow for manual entry columns 15-19 (18 = Revenue)
+    CellRule('build.manual', 'O:S'),
+]
+
+
+def prepare_start_here_rows(stats, today):
+    """START_HERE summary rows (BUG FIX 6)."""
+    rows = [
+        [Styled(f"TikTok Trend System v5.8.1 - {today}", 'build.title')],
+        [],
+        [Styled("📊 DAILY SUMMARY", 'build.section')],
+    ]
     summary_data = [
         ('Your Posts', stats.get('your_posts', 0)),
         ('Competitor Posts', stats.get('competitor', 0)),
@@ -640,240 +640,328 @@ def create_start_here_sheet(ws, stats, today):
         ('US Unique', stats.get('us_unique', 0)),
         ('UK Unique', stats.get('uk_unique', 0)),
     ]
-    
-    for idx, (label, value) in enumerate(summary_data, 4):
-        ws.cell(row=idx, column=1, value=label)
-        ws.cell(row=idx, column=2, value=value)
+    rows.extend([label, value] for label, value in summary_data)
+    return rows
 
 
-def create_video_sheet(ws, df):
-    """Create video sheet with formatting."""
-    headers = ['#', 'Market', 'Status', 'Trend', 'Creator', 'Age', 'Momentum', 'Shares/h', 'Views/h', 'URL']
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = HEADER_FILL
-        cell.font = HEADER_FONT
-    
+def prepare_video_rows(df):
+    """Body rows for a video sheet, numbered from 1 in the frame's order."""
+    rows = []
     if len(df) == 0:
-        return
-    
-    for idx, (_, row) in enumerate(df.iterrows(), 2):
-        ws.cell(row=idx, column=1, value=idx-1)
-        ws.cell(row=idx, column=2, value=_safe_text(row.get('market', ''), 30))
-        ws.cell(row=idx, column=3, value=_safe_text(row.get('status', ''), 20))
-        ws.cell(row=idx, column=4, value=_safe_text(row.get('text'), 80))
-        ws.cell(row=idx, column=5, value=_safe_text(row.get('author', ''), 20))
-        ws.cell(row=idx, column=6, value=f"{_safe_round(row.get('age_hours', 0), 1)}h")
-        ws.cell(row=idx, column=7, value=_safe_int(row.get('momentum_score', 0)))
-        ws.cell(row=idx, column=8, value=_safe_round(row.get('shares_per_hour', 0), 1))
-        ws.cell(row=idx, column=9, value=_safe_int(row.get('views_per_hour', 0)))
-        ws.cell(row=idx, column=10, value=row.get('webVideoUrl', ''))
-        
-        # Apply status color to column C only
-        status = row.get('status', '')
-        if status in STATUS_COLORS:
-            ws.cell(row=idx, column=3).fill = STATUS_COLORS[status]
-        
-        # Apply GOLD to column B ONLY if BOTH (not whole row)
-        if '🌐 BOTH' in str(row.get('market', '')):
-            ws.cell(row=idx, column=2).fill = GOLD_FILL
-        
-        # Apply row highlighting for YOUR/COMPETITOR (overrides other colors)
-        author = str(row.get('author', '')).lower()
-        if author in [a.lower() for a in YOUR_ACCOUNTS]:
-            for col in range(1, 11):
-                ws.cell(row=idx, column=col).fill = CYAN_FILL
-        elif author in [a.lower() for a in COMPETITOR_ACCOUNTS]:
-            for col in range(1, 11):
-                ws.cell(row=idx, column=col).fill = ORANGE_FILL
-
-
-def create_audio_sheet(ws, df):
-    """Create audio sheet with formatting (BUG FIX 5)."""
-    headers = ['#', 'Status', 'Music Name', 'Artist', 'Type', 'Used By', 'Play URL']
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = HEADER_FILL
-        cell.font = HEADER_FONT
+        return rows
     
+    for idx, row in enumerate(df.to_dict('records'), 1):
+        author = str(row.get('author', '')).lower()
+        if author in YOUR_ACCOUNTS_LOWER:
+            account = YOUR_ACCOUNT_FLAG
+        elif author in COMPETITOR_ACCOUNTS_LOWER:
+            account = COMPETITOR_ACCOUNT_FLAG
+        else:
+            account = ''
+        rows.append([
+            idx,
+            _safe_text(row.get('Market', ''), 30),
+            _safe_text(row.get('status', ''), 20),
+            _safe_text(row.get('text'), 80),
+            _safe_text(row.get('author', ''), 20),
+            f"{_safe_round(row.get('age_hours', 0), 1)}h",
+            _safe_int(row.get('momentum_score', 0)),
+            _safe_round(row.get('shares_per_hour', 0), 1),
+            _safe_int(row.get('views_per_hour', 0)),
+            row.get('webVideoUrl', ''),
+            account,
+        ])
+    return rows
+
+
+def prepare_audio_rows(df):
+    """Body rows for an audio sheet (BUG FIX 5)."""
+    rows = []
     if len(df) == 0:
-        return
+        return rows
     
-    for idx, (_, row) in enumerate(df.iterrows(), 2):
-        ws.cell(row=idx, column=1, value=idx-1)
-        ws.cell(row=idx, column=2, value='🆕 NEW')  # Audio always NEW (no 24h tracking)
-        ws.cell(row=idx, column=3, value=_safe_text(row.get('music_name', ''), 50))
-        ws.cell(row=idx, column=4, value=_safe_text(row.get('artist', ''), 30))
-        ws.cell(row=idx, column=5, value='Original' if row.get('is_original', False) else 'Sound')
-        ws.cell(row=idx, column=6, value=f"{_safe_int(row.get('used_count', 0))} videos")
-        ws.cell(row=idx, column=7, value=row.get('play_url', ''))
+    for idx, row in enumerate(df.to_dict('records'), 1):
+        rows.append([
+            idx,
+            '🆕 NEW',  # Audio always NEW (no 24h tracking)
+            _safe_text(row.get('music_name', ''), 50),
+            _safe_text(row.get('artist', ''), 30),
+            'Original' if row.get('is_original', False) else 'Sound',
+            f"{_safe_int(row.get('used_count', 0))} videos",
+            row.get('play_url', ''),
+        ])
+    return rows
 
 
-def create_my_performance_sheet(ws, your_posts, today, revenue_lookup=None):
-    """Create MY_PERFORMANCE sheet with proper formatting.
+def prepare_my_performance_rows(your_posts, today, revenue_lookup=None):
+    """Body rows for MY_PERFORMANCE.
     
     Args:
         revenue_lookup: dict mapping TikTok URL → revenue data (v5.8.0+)
     """
-    headers = [
-        'Date', 'Account', 'Trend', 'Age', 'Momentum', 'Status', 'Market',
-        'Views/h', 'Shares/h', 'BUILD_NOW', 'TikTok URL', 'TUTORIAL_TRIGGER',
-        'URGENCY', 'Trigger Reason', 'Competitor Count', 'Tutorial Link',
-        'Template Link', 'Revenue', 'Notes'
-    ]
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = HEADER_FILL
-        cell.font = HEADER_FONT
-    
+    rows = []
     if len(your_posts) == 0:
-        return
-    
-    for idx, (_, row) in enumerate(your_posts.iterrows(), 2):
-        ws.cell(row=idx, column=1, value=today)
-        ws.cell(row=idx, column=2, value=_safe_text(row.get('author', ''), 30))
-        ws.cell(row=idx, column=3, value=_safe_text(row.get('text'), 60))
-        ws.cell(row=idx, column=4, value=f"{_safe_round(row.get('age_hours', 0), 1)}h")
-        ws.cell(row=idx, column=5, value=_safe_int(row.get('momentum_score', 0)))
-        ws.cell(row=idx, column=6, value=_safe_text(row.get('status', ''), 20))
-        ws.cell(row=idx, column=7, value=_safe_text(row.get('market', ''), 20))
-        ws.cell(row=idx, column=8, value=_safe_int(row.get('views_per_hour', 0)))
-        ws.cell(row=idx, column=9, value=_safe_round(row.get('shares_per_hour', 0), 1))
-        ws.cell(row=idx, column=10, value=row.get('BUILD_NOW', ''))
-        ws.cell(row=idx, column=11, value=row.get('webVideoUrl', ''))
-        ws.cell(row=idx, column=12, value=row.get('TUTORIAL_TRIGGER', ''))
-        ws.cell(row=idx, column=13, value=row.get('URGENCY', ''))
-        ws.cell(row=idx, column=14, value=_safe_text(row.get('trigger_reason', ''), 80))
-        # Columns 15-17 are manual entry (blank)
+        return rows
+    
+    for row in your_posts.to_dict('records'):
+        url = row.get('webVideoUrl', '')
         
         # Column 18: Revenue — auto-populated from Google Sheet (v5.8.0+)
-        url = row.get('webVideoUrl', '')
+        revenue_val = None
         if revenue_lookup and url in revenue_lookup:
             rev_data = revenue_lookup[url]
-            revenue_val = rev_data.get('revenue', rev_data.get('Received ($)', ''))
-            if revenue_val:
-                ws.cell(row=idx, column=18, value=revenue_val)
-        
-        # Column 19: Notes (blank)
-        
-        # Apply CYAN to data columns 1-11
-        for col in range(1, 12):
-            ws.cell(row=idx, column=col).fill = CYAN_FILL
-        
-        # Apply trigger colors to column 12
-        trigger = row.get('TUTORIAL_TRIGGER', '')
-        if trigger in TRIGGER_COLORS:
-            ws.cell(row=idx, column=12).fill = TRIGGER_COLORS[trigger]
-        
-        # Apply urgency colors to column 13
-        urgency = row.get('URGENCY', '')
-        if urgency in URGENCY_COLORS:
-            ws.cell(row=idx, column=13).fill = URGENCY_COLORS[urgency]
-            if urgency == '🔥 URGENT':
-                ws.cell(row=idx, column=13).font = Font(color="FFFFFF")
+            revenue_val = rev_data.get('revenue', rev_data.get('Received ($)', '')) or None
         
-        # Light yellow for manual entry columns 15-19
-        for col in range(15, 20):
-            ws.cell(row=idx, column=col).fill = LIGHT_YELLOW_FILL
+        rows.append([
+            today,
+            _safe_text(row.get('author', ''), 30),
+            _safe_text(row.get('text'), 60),
+            f"{_safe_round(row.get('age_hours', 0), 1)}h",
+            _safe_int(row.get('momentum_score', 0)),
+            _safe_text(row.get('status', ''), 20),
+            _safe_text(row.get('Market', ''), 20),
+            _safe_int(row.get('views_per_hour', 0)),
+            _safe_round(row.get('shares_per_hour', 0), 1),
+            row.get('BUILD_NOW', ''),
+            url,
+            row.get('TUTORIAL_TRIGGER', ''),
+            row.get('URGENCY', ''),
+            _safe_text(row.get('trigger_reason', ''), 80),
+            # Manual entry columns 15-19 (18 = Revenue)
+            None, None, None, revenue_val, None,
+        ])
+    return rows
+
+
+# -----------------------------------------------------------------------------
+# Rendering
+# -----------------------------------------------------------------------------
+
+def prepare_build_tabs(uk_ai, uk_non, uk_audio, us_ai, us_non, us_audio, your_posts, stats, today, revenue_lookup=None):
+    """Format every BUILD_TODAY tab once as a SheetModel (plain picklable data).
+    
+    START_HERE and MY_PERFORMANCE are identical in every BUILD file and are
+    shared verbatim; the six market tabs are kept at full depth under their
+    bare names (UK_AI, ...) and get the file suffix in build_file_models().
+    """
+    def market_tab(name, headers, rows, rules=()):
+        return SheetModel(name, header=headers, rows=rows, header_style='build.header', rules=list(rules))
+    
+    return [
+        SheetModel('START_HERE', rows=prepare_start_here_rows(stats, today)),
+        # BUG FIX 7: Correct tab order - UK together, US together
+        market_tab('UK_AI', VIDEO_HEADERS, prepare_video_rows(uk_ai), VIDEO_RULES),
+        market_tab('UK_NON_AI', VIDEO_HEADERS, prepare_video_rows(uk_non), VIDEO_RULES),
+        market_tab('UK_AUDIO', AUDIO_HEADERS, prepare_audio_rows(uk_audio)),
+        market_tab('US_AI', VIDEO_HEADERS, prepare_video_rows(us_ai), VIDEO_RULES),
+        market_tab('US_NON_AI', VIDEO_HEADERS, prepare_video_rows(us_non), VIDEO_RULES),
+        market_tab('US_AUDIO', AUDIO_HEADERS, prepare_audio_rows(us_audio)),
+        market_tab('MY_PERFORMANCE', MY_PERFORMANCE_HEADERS,
+                   prepare_my_performance_rows(your_posts, today, revenue_lookup), MY_PERFORMANCE_RULES),
+    ]
 
 
-def load_yesterday_cache(cache_dir):
-    """Load yesterday's cached data."""
+MARKET_TABS = ('UK_AI', 'UK_NON_AI', 'UK_AUDIO', 'US_AI', 'US_NON_AI', 'US_AUDIO')
+BUILD_TABS = ('START_HERE',) + MARKET_TABS + ('MY_PERFORMANCE',)
+
+
+def build_file_models(models, suffix, limit=None, tabs=None):
+    """The tabs of one BUILD file: market tabs renamed NAME_SUFFIX and cut to limit rows.
+    
+    tabs (bare names, e.g. 'UK_AI') keeps only those tabs; None keeps all.
+    """
+    return [m.renamed(f"{m.name}_{suffix}", limit) if m.name in MARKET_TABS else m
+            for m in models if tabs is None or m.name in tabs]
+
+
+def create_build_files(targets, uk_ai, uk_non, uk_audio, us_ai, us_non, us_audio, your_posts, stats, today, revenue_lookup=None, scheduler=None):
+    """Render several BUILD_TODAY workbooks from ONE set of prepared tabs.
+    
+    targets: [(filepath, suffix, limit[, tabs])] — limit caps every video/audio
+    tab (None = all rows), so TOP20 is the first 20 rows of the TOP100
+    buffers; tabs optionally limits the file to those BUILD_TABS.
+    With a RenderScheduler each workbook (and each SHEET_EXPORT_SINKS copy)
+    is queued instead of written here.
+    """
+    prepared = prepare_build_tabs(uk_ai, uk_non, uk_audio, us_ai, us_non, us_audio,
+                                  your_posts, stats, today, revenue_lookup)
+    for filepath, suffix, limit, *tabs in targets:
+        models = build_file_models(prepared, suffix, limit, tabs[0] if tabs else None)
+        if scheduler is not None:
+            scheduler.submit(filepath, write_xlsx, models, filepath)
+        else:
+            write_xlsx(models, filepath)
+        export_models(models, os.path.splitext(filepath)[0], scheduler=scheduler)
+
+
+def create_build_file(filepath, uk_ai, uk_non, uk_audio, us_ai, us_non, us_audio, your_posts, stats, today, suffix, revenue_lookup=None):
+    """Create BUILD_TODAY Excel file with correct tab order."""
+    create_build_files(
+        [(filepath, suffix, None)],
+        uk_ai, uk_non, uk_audio, us_ai, us_non, us_audio,
+        your_posts, stats, today, revenue_lookup=revenue_lookup
+    )
+
+
+def create_start_here_sheet(ws, stats, today):
+    """Create START_HERE summary sheet (BUG FIX 6)."""
+    append_rows(ws, prepare_start_here_rows(stats, today))
+
+
+def create_video_sheet(ws, df):
+    """Create video sheet with formatting."""
+    rows = prepare_video_rows(df)
+    append_rows(ws, [_header_row(VIDEO_HEADERS)] + rows)
+    add_rules(ws, SheetModel(ws.title, header=VIDEO_HEADERS, rows=rows, rules=VIDEO_RULES))
+
+
+def create_audio_sheet(ws, df):
+    """Create audio sheet with formatting (BUG FIX 5)."""
+    append_rows(ws, [_header_row(AUDIO_HEADERS)] + prepare_audio_rows(df))
+
+
+def create_my_performance_sheet(ws, your_posts, today, revenue_lookup=None):
+    """Create MY_PERFORMANCE sheet with proper formatting."""
+    rows = prepare_my_performance_rows(your_posts, today, revenue_lookup)
+    append_rows(ws, [_header_row(MY_PERFORMANCE_HEADERS)] + rows)
+    add_rules(ws, SheetModel(ws.title, header=MY_PERFORMANCE_HEADERS, rows=rows, rules=MY_PERFORMANCE_RULES))
+
+
+def _read_snapshot_file(path):
+    """Read one cache file → (records, captured_at ISO string or None).
+    
+    v5.9 files wrap the records with the time they were captured; older
+    plain-list files fall back to the file's modification time.
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return data.get('records'), data.get('captured_at')
+    mtime = datetime.utcfromtimestamp(os.path.getmtime(path))
+    return data, mtime.isoformat() + '+00:00'
+
+
+def _load_legacy_cache(cache_dir):
+    """Pre-v6.0 single-file cache (yesterday_us.json / yesterday_uk.json)."""
     us_path = os.path.join(cache_dir, 'yesterday_us.json')
     uk_path = os.path.join(cache_dir, 'yesterday_uk.json')
     
-    print(f"  Looking for cache:")
-    print(f"    US: {us_path} - exists: {os.path.exists(us_path)}")
-    print(f"    UK: {uk_path} - exists: {os.path.exists(uk_path)}")
+    print(f"    Legacy US: {us_path} - exists: {os.path.exists(us_path)}")
+    print(f"    Legacy UK: {uk_path} - exists: {os.path.exists(uk_path)}")
     
     if not os.path.exists(us_path) or not os.path.exists(uk_path):
         return None, None
     
+    us_data, us_captured = _read_snapshot_file(us_path)
+    uk_data, uk_captured = _read_snapshot_file(uk_path)
+    # Validate cache structure - must be lists of dicts
+    if not isinstance(us_data, list) or not isinstance(uk_data, list):
+        print(f"  Cache format invalid (expected list, got {type(us_data).__name__}/{type(uk_data).__name__})")
+        return None, None
+    
+    # Detect cache format
+    if us_data and 'shareCount' in us_data[0]:
+        print(f"    Cache format: v5.8.1+ (raw counts) ✓")
+    elif us_data and 'momentum_score' in us_data[0]:
+        print(f"    Cache format: pre-v5.8.1 (momentum only) — will upgrade on next save")
+    
+    for records, captured in [(us_data, us_captured), (uk_data, uk_captured)]:
+        for record in records:
+            record['captured_at'] = captured
+    return us_data, uk_data
+
+
+def load_yesterday_cache(cache_dir):
+    """Load the most recent snapshot taken before today for each market.
+    
+    Reads the dated snapshot store (snapshot_store.py) and falls back to the
+    legacy yesterday_*.json files until the first dated snapshot exists.
+    Each returned record carries the snapshot's captured_at timestamp so
+    calculate_status can use the real elapsed time.
+    """
+    print(f"  Looking for cache in {snapshot_store.snapshot_dir(cache_dir)}:")
+    
     try:
-        with open(us_path, 'r') as f:
-            us_data = json.load(f)
-        with open(uk_path, 'r') as f:
-            uk_data = json.load(f)
-        # Validate cache structure - must be lists of dicts
-        if not isinstance(us_data, list) or not isinstance(uk_data, list):
-            print(f"  Cache format invalid (expected list, got {type(us_data).__name__}/{type(uk_data).__name__})")
-            return None, None
+        snapshots = {}
+        for market in ('us', 'uk'):
+            recent = snapshot_store.load_recent_snapshots(market, cache_dir, k=1)
+            snapshots[market] = recent[0] if recent else None
+            print(f"    {market.upper()}: {recent[0][0] if recent else 'none'}")
+        
+        if snapshots['us'] is None or snapshots['uk'] is None:
+            us_data, uk_data = _load_legacy_cache(cache_dir)
+        else:
+            us_data = snapshots['us'][1].to_dict('records')
+            uk_data = snapshots['uk'][1].to_dict('records')
         
-        # Detect cache format
-        if us_data and 'shareCount' in us_data[0]:
-            print(f"    Cache format: v5.8.1 (raw counts) ✓")
-        elif us_data and 'momentum_score' in us_data[0]:
-            print(f"    Cache format: pre-v5.8.1 (momentum only) — will upgrade on next save")
+        if us_data is None or uk_data is None:
+            return None, None
         
-        print(f"    Loaded US: {len(us_data)} records")
-        print(f"    Loaded UK: {len(uk_data)} records")
+        us_captured = us_data[0]['captured_at'] if us_data else None
+        uk_captured = uk_data[0]['captured_at'] if uk_data else None
+        print(f"    Loaded US: {len(us_data)} records (captured {us_captured})")
+        print(f"    Loaded UK: {len(uk_data)} records (captured {uk_captured})")
         return us_data, uk_data
     except Exception as e:
         print(f"  Cache load error: {e}")
         return None, None
 
 
-def save_today_cache(us_df, uk_df, cache_dir):
-    """Save today's data for tomorrow's comparison.
+def load_two_days_cache(cache_dir):
+    """Load the snapshot before yesterday's for each market as DataFrames.
+    
+    Feeds the acceleration term of the velocity engine. Returns (None, None)
+    for a market with fewer than two earlier snapshots.
+    """
+    out = []
+    for market in ('us', 'uk'):
+        try:
+            recent = snapshot_store.load_recent_snapshots(market, cache_dir, k=2)
+        except Exception as e:
+            print(f"  Snapshot load error ({market}): {e}")
+            recent = []
+        if len(recent) == 2:
+            day, frame = recent[1]
+            print(f"    {market.upper()} 2-day snapshot: {day} ({len(frame)} records)")
+            out.append(frame)
+        else:
+            out.append(None)
+    return out[0], out[1]
+
+
+def save_today_cache(us_df, uk_df, cache_dir, predictions=None):
+    """Save today's snapshot for tomorrow's comparison.
     
     v5.8.1 FIX: Now saves raw engagement counts (shareCount, diggCount, playCount)
     instead of momentum_score. This enables accurate growth-based status calculation
     that doesn't penalize content for aging.
     
-    Cache format v5.8.1:
-    [
-        {
-            "webVideoUrl": "https://...",
-            "shareCount": 1234,
-            "diggCount": 5678,
-            "playCount": 90000,
-            "momentum_score": 456.7  # kept for backward compat / velocity engine
-        },
-        ...
-    ]
-    """
-    os.makedirs(cache_dir, exist_ok=True)
-    
-    us_path = os.path.join(cache_dir, 'yesterday_us.json')
-    uk_path = os.path.join(cache_dir, 'yesterday_uk.json')
-    
-    print(f"  Saving cache (v5.8.1 format — raw counts):")
-    print(f"    US: {us_path}")
-    print(f"    UK: {uk_path}")
-    
-    # Save raw counts + momentum for 24h tracking
-    # Replace NaN with 0 to produce valid JSON
-    cache_cols = ['webVideoUrl', 'shareCount', 'diggCount', 'playCount', 'momentum_score']
-    
-    if len(us_df) > 0:
-        # Ensure all required columns exist
-        for col in cache_cols:
-            if col not in us_df.columns:
-                us_df[col] = 0
-        cache_df = us_df[cache_cols].copy()
-        cache_df = cache_df.fillna(0)
-        us_cache = cache_df.to_dict('records')
-    else:
-        us_cache = []
-    
-    if len(uk_df) > 0:
-        for col in cache_cols:
-            if col not in uk_df.columns:
-                uk_df[col] = 0
-        cache_df = uk_df[cache_cols].copy()
-        cache_df = cache_df.fillna(0)
-        uk_cache = cache_df.to_dict('records')
-    else:
-        uk_cache = []
-    
-    with open(us_path, 'w') as f:
-        json.dump(us_cache, f)
-    
-    with open(uk_path, 'w') as f:
-        json.dump(uk_cache, f)
+    v6.0: one dated columnar snapshot per market per day
+    ({cache_dir}/snapshots/us_YYYY-MM-DD.npz) holding webVideoUrl, the raw
+    counts, momentum_score (velocity engine) and captured_at. Snapshots past
+    SNAPSHOT_RETENTION_DAYS are pruned.
     
-    print(f"    US records: {len(us_cache)}")
-    print(f"    UK records: {len(uk_cache)}")
+    predictions (the run's velocity predictions, keyed by webVideoUrl) adds
+    each URL's predicted_24h / velocity_points / action_window to the
+    snapshot so backtest.py can score them tomorrow.
+    """
+    captured_at = datetime.now(timezone.utc)
+    
+    if predictions is not None and len(predictions) > 0:
+        keep = ['webVideoUrl'] + snapshot_store.PREDICTION_COLUMNS + snapshot_store.PREDICTION_LABELS
+        if all(col in predictions.columns for col in keep):
+            pred = predictions[keep].drop_duplicates(subset=['webVideoUrl'], keep='first')
+            if len(us_df) > 0:
+                us_df = us_df.drop(columns=keep[1:], errors='ignore').merge(pred, on='webVideoUrl', how='left')
+            if len(uk_df) > 0:
+                uk_df = uk_df.drop(columns=keep[1:], errors='ignore').merge(pred, on='webVideoUrl', how='left')
+    
+    print(f"  Saving snapshots (captured {captured_at.isoformat()}):")
+    us_path = snapshot_store.save_snapshot(us_df, 'us', cache_dir, captured_at)
+    uk_path = snapshot_store.save_snapshot(uk_df, 'uk', cache_dir, captured_at)
+    print(f"    US: {us_path} ({len(us_df)} records)")
+    print(f"    UK: {uk_path} ({len(uk_df)} records)")
+    
+    removed = snapshot_store.prune_snapshots(cache_dir, today=captured_at.date())
+    if removed:
+        print(f"    Pruned {removed} snapshots older than {snapshot_store.retention_days()} days")
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+DASHBOARD STATE STORE
+Carried-forward dashboard state (REVENUE_TRACKER and PREDICTION_LOG rows of
+TikTok_Dashboard_With_Revenue.xlsx) kept in a compact sidecar next to the
+workbook:
+
+    {CACHE_DIR}/TikTok_Dashboard_With_Revenue.xlsx
+    {CACHE_DIR}/TikTok_Dashboard_With_Revenue.state.json
+
+The sidecar records the size and mtime of the workbook it was read from, so
+loading is one small JSON read while the workbook is unchanged. When the
+workbook is new or was replaced, both tabs are read in a single read-only
+iter_rows pass and the sidecar is rewritten. Values keep their cell types
+(dates are stored as tagged ISO text); no pickles.
+
+PREDICTION_LOG rows are only read to seed prediction_log.py's store the
+first time it is used; after that the store is the history.
+"""
+
+import json
+import os
+from datetime import date, datetime, time
+
+import pandas as pd
+from openpyxl import load_workbook
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+STATE_VERSION = 1
+
+# Tab -> number of leading columns carried forward
+STATE_TABS = {
+    'REVENUE_TRACKER': 19,
+    'PREDICTION_LOG': 10,
+}
+
+# Loaded states for this process, keyed by (path, size, mtime_ns)
+_MEMO = {}
+
+
+def state_path(dashboard_path: str) -> str:
+    return os.path.splitext(dashboard_path)[0] + '.state.json'
+
+
+def _signature(dashboard_path: str) -> dict:
+    st = os.stat(dashboard_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+# =============================================================================
+# VALUE ENCODING
+# =============================================================================
+
+# Cell types JSON cannot hold; their values are stored once as ISO text in
+# the tab's 'typed' list as [row, col, kind, text] and left null in 'rows',
+# so decoding only touches those cells
+_TYPED = (('datetime', datetime), ('date', date), ('time', time))
+
+
+def _encode_tab(body: dict) -> dict:
+    rows, typed = [], []
+    for ri, row in enumerate(body['rows']):
+        out = list(row)
+        for ci, value in enumerate(row):
+            for kind, cls in _TYPED:
+                if isinstance(value, cls):
+                    typed.append([ri, ci, kind, value.isoformat()])
+                    out[ci] = None
+                    break
+        rows.append(out)
+    return {'columns': body['columns'], 'rows': rows, 'typed': typed}
+
+
+def _decode_tab(body: dict) -> dict:
+    rows = body['rows']
+    types = dict(_TYPED)
+    for ri, ci, kind, text in body.get('typed', ()):
+        rows[ri][ci] = types[kind].fromisoformat(text)
+    return {'columns': body['columns'], 'rows': rows}
+
+
+# =============================================================================
+# LEGACY WORKBOOK READ
+# =============================================================================
+
+def _has_data(values) -> bool:
+    return any(v is not None and str(v).strip() != '' for v in values)
+
+
+def read_dashboard_tabs(dashboard_path: str) -> dict:
+    """Read the carried-forward tabs straight from the workbook.
+
+    One read-only, values-only pass per tab. Returns
+    {tab: {'columns': [...], 'rows': [[...]]}} for the tabs present; blank
+    rows are dropped.
+    """
+    wb = load_workbook(dashboard_path, read_only=True, data_only=True)
+    try:
+        tabs = {}
+        for tab, width in STATE_TABS.items():
+            if tab not in wb.sheetnames:
+                continue
+            ws = wb[tab]
+            # Sheets written by other tools can carry a stale <dimension>
+            ws.reset_dimensions()
+            rows = ws.iter_rows(max_col=width, values_only=True)
+            header = next(rows, ())
+            columns = list(header) + [None] * (width - len(header))
+            data = []
+            for row in rows:
+                values = list(row) + [None] * (width - len(row))
+                if _has_data(values):
+                    data.append(values)
+            tabs[tab] = {'columns': columns, 'rows': data}
+        return tabs
+    finally:
+        wb.close()
+
+
+# =============================================================================
+# SIDECAR
+# =============================================================================
+
+def _read_state(dashboard_path: str, signature: dict):
+    path = state_path(dashboard_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != STATE_VERSION or state.get('source') != signature:
+        return None
+    return {tab: _decode_tab(body) for tab, body in state.get('tabs', {}).items()}
+
+
+def save_state(dashboard_path: str, tabs: dict, signature: dict = None) -> str:
+    """Write the sidecar for dashboard_path's current size/mtime; returns its path."""
+    signature = signature or _signature(dashboard_path)
+    state = {
+        'version': STATE_VERSION,
+        'source': signature,
+        'tabs': {tab: _encode_tab(body) for tab, body in tabs.items()},
+    }
+    path = state_path(dashboard_path)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_state(dashboard_path: str) -> dict:
+    """Carried-forward tabs of a dashboard workbook ({tab: {'columns', 'rows'}}).
+
+    Served from memory or the sidecar while the workbook is unchanged;
+    otherwise read from the workbook and the sidecar refreshed.
+    """
+    signature = _signature(dashboard_path)
+    key = (os.path.abspath(dashboard_path), signature['size'], signature['mtime_ns'])
+    tabs = _MEMO.get(key)
+    if tabs is not None:
+        return tabs
+
+    tabs = _read_state(dashboard_path, signature)
+    if tabs is None:
+        tabs = read_dashboard_tabs(dashboard_path)
+        try:
+            save_state(dashboard_path, tabs, signature)
+        except OSError as e:
+            print(f"  Warning: Could not write dashboard state sidecar: {e}")
+    _MEMO[key] = tabs
+    return tabs
+
+
+# =============================================================================
+# FRAMES
+# =============================================================================
+
+def load_revenue_tracker(dashboard_path: str):
+    """REVENUE_TRACKER rows as a DataFrame keyed by header, or None if absent/empty."""
+    body = load_state(dashboard_path).get('REVENUE_TRACKER')
+    if not body or not body['rows']:
+        return None
+    # Same frame as building it from {header: value} dicts: a repeated
+    # header keeps its first position and its last column's values
+    last = {name: i for i, name in enumerate(body['columns'])}
+    keep = [last[name] for name in dict.fromkeys(body['columns'])]
+    rows = [[row[i] for i in keep] for row in body['rows']]
+    return pd.DataFrame(rows, columns=[body['columns'][i] for i in keep])
+
+
+def load_prediction_log(dashboard_path: str):
+    """PREDICTION_LOG rows as a DataFrame (first 10 columns), or None if absent/empty."""
+    body = load_state(dashboard_path).get('PREDICTION_LOG')
+    if not body or not body['rows']:
+        return None
+    return pd.DataFrame(body['rows'], columns=body['columns'])
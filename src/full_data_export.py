@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+FULL-DATA EXPORTER
+Writes the per-market TikTok_Trend_System_{US,UK}_{date} dumps.
+
+The dump used to be `df.to_excel()` of every flattened Apify column, which
+was one of the slowest steps and produced files nobody filters in Excel.
+It is now a curated column projection written by a pluggable backend:
+
+    FULL_EXPORT_FORMAT=xlsx      constant-memory openpyxl write-only (default)
+    FULL_EXPORT_FORMAT=csv       gzip-compressed CSV (.csv.gz)
+    FULL_EXPORT_FORMAT=parquet   Parquet if pyarrow/fastparquet is installed,
+                                 otherwise falls back to .csv.gz
+
+    FULL_EXPORT_COLUMNS=curated  FULL_DATA_COLUMNS only (default)
+    FULL_EXPORT_COLUMNS=all      every column, list values joined to text
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_FORMAT = 'xlsx'
+DEFAULT_COLUMNS = 'curated'
+
+# Columns someone actually reads in the full dump, in sheet order. Raw Apify
+# duplicates (authorMeta_*, musicMeta_*) and list-valued hashtag/mention
+# fields are left out; anything missing from a frame is simply skipped.
+FULL_DATA_COLUMNS = [
+    'webVideoUrl', 'author', 'text', 'Market', 'AI_CATEGORY',
+    'createTimeISO', 'age_hours',
+    'playCount', 'shareCount', 'diggCount', 'commentCount',
+    'views_per_hour', 'shares_per_hour', 'likes_per_hour', 'momentum_score',
+    'status', 'acceleration_status',
+    'BUILD_NOW', 'TUTORIAL_TRIGGER', 'URGENCY', 'trigger_reason',
+    'music_name', 'artist', 'is_original', 'music_id',
+]
+
+FILE_EXTENSIONS = {
+    'xlsx': '.xlsx',
+    'csv': '.csv.gz',
+    'parquet': '.parquet',
+}
+
+
+def export_format() -> str:
+    fmt = os.environ.get('FULL_EXPORT_FORMAT', DEFAULT_FORMAT).strip().lower()
+    return fmt if fmt in FILE_EXTENSIONS else DEFAULT_FORMAT
+
+
+def export_columns_mode() -> str:
+    mode = os.environ.get('FULL_EXPORT_COLUMNS', DEFAULT_COLUMNS).strip().lower()
+    return mode if mode in ('curated', 'all') else DEFAULT_COLUMNS
+
+
+def _parquet_available() -> bool:
+    for module in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+# =============================================================================
+# PROJECTION
+# =============================================================================
+
+def _join_list(value):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return ', '.join(str(v) for v in value)
+    return value
+
+
+def project_frame(df: pd.DataFrame, mode: str = None) -> pd.DataFrame:
+    """Select the export columns and make every cell writable as a scalar.
+
+    List/array values become comma-joined text and tz-aware timestamps are
+    converted to naive UTC (xlsx has no time zones).
+    """
+    mode = export_columns_mode() if mode is None else mode
+    if mode == 'curated':
+        df = df[[c for c in FULL_DATA_COLUMNS if c in df.columns]]
+    out = df.copy()
+    for col in out.columns:
+        series = out[col]
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            out[col] = series.dt.tz_convert('UTC').dt.tz_localize(None)
+        elif series.dtype == object:
+            out[col] = series.map(_join_list)
+    return out
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+def _xlsx_value(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    # NaN, NaT and pd.NA (missing canonical columns from apify_schema) all become blanks
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def write_xlsx(df: pd.DataFrame, path: str) -> str:
+    """Stream rows through a write-only workbook (memory stays flat)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        ws.append([_xlsx_value(v) for v in row])
+    wb.save(path)
+    return path
+
+
+def write_csv_gz(df: pd.DataFrame, path: str) -> str:
+    df.to_csv(path, index=False, compression='gzip')
+    return path
+
+
+def write_parquet(df: pd.DataFrame, path: str) -> str:
+    df.to_parquet(path, index=False)
+    return path
+
+
+WRITERS = {
+    'xlsx': write_xlsx,
+    'csv': write_csv_gz,
+    'parquet': write_parquet,
+}
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+def resolve_format(fmt: str = None) -> str:
+    """FULL_EXPORT_FORMAT (or fmt), with parquet downgraded to csv when no engine is installed."""
+    fmt = export_format() if fmt is None else fmt
+    if fmt == 'parquet' and not _parquet_available():
+        print("    ⚠️ No Parquet engine installed - writing .csv.gz instead")
+        fmt = 'csv'
+    return fmt
+
+
+def export_full_data(df: pd.DataFrame, base_path: str, fmt: str = None, mode: str = None, scheduler=None) -> str:
+    """Write one market's full dump to base_path + the format's extension.
+
+    With a RenderScheduler the projected frame is queued for rendering
+    instead of written here. Returns the output path.
+    """
+    fmt = resolve_format(fmt)
+    path = base_path + FILE_EXTENSIONS[fmt]
+    frame = project_frame(df, mode)
+    if scheduler is not None:
+        scheduler.submit(path, WRITERS[fmt], frame, path)
+    else:
+        WRITERS[fmt](frame, path)
+    return path
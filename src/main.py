@@ -18,20 +18,85 @@ import json
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from apify_fetcher import fetch_all_data
-from daily_processor import process_data, load_yesterday_cache, save_today_cache, calculate_metrics
+from daily_processor import (process_data, load_yesterday_cache, load_two_days_cache,
+                             save_today_cache, build_enriched_frames, STANDARD_OUTPUTS)
 from discord_notify import send_discord_notification
-from v35_enhancements import integrate_with_daily_processor, generate_daily_briefing
+from v35_enhancements import integrate_with_daily_processor, generate_daily_briefing, ENHANCED_OUTPUTS
 from seasonal_calendar import get_seasonal_alerts, format_seasonal_for_discord, format_seasonal_for_summary, format_seasonal_for_enhanced
 from revenue_persistence import fetch_live_revenue, get_revenue_lookup, cache_revenue_locally, load_cached_revenue
 from revenue_model import estimate_competitor_revenue
+from render_scheduler import RenderScheduler
+from sheet_model import sheet_values
 import pandas as pd
 
 
-def run_v35_enhancements(us_data, uk_data, yesterday_us, yesterday_uk, output_dir, cache_dir, live_revenue_df=None):
+# =============================================================================
+# OUTPUT PROFILES
+# =============================================================================
+# OUTPUT_PROFILE picks which outputs a run builds. A profile maps output keys
+# to the tabs to build (None = every tab); outputs left out are skipped along
+# with the analysis only they need (audio tables, competitor intel, velocity,
+# revenue / prediction-log loads - see v35_enhancements.TAB_INPUTS).
+#
+#   build_top20, build_top100     BUILD_TODAY files (tabs: daily_processor.BUILD_TABS)
+#   full_us, full_uk              TikTok_Trend_System full-data dumps
+#   us_enhanced, uk_enhanced,
+#   combined_enhanced             *_ENHANCED files (tabs: v35_enhancements.ENHANCED_TABS)
+#   briefing                      daily briefing in SUMMARY_REPORT
+#   dashboard                     dashboard payload + Google Sheets sync (Steps 5b, 7)
+#
+# Only 'full' is the day's run of record. Any other profile writes into
+# {OUTPUT_DIR}/{profile}/ so its files never replace the day's reports, and
+# it leaves the day's state alone: no snapshot / streak / prediction-log /
+# competitor-history writes (Step 4), no Discord post (Step 5) and no Drive
+# upload (Step 6).
+
+ALL_OUTPUTS = STANDARD_OUTPUTS + ENHANCED_OUTPUTS + ('briefing', 'dashboard')
+
+OUTPUT_PROFILES = {
+    # The daily report set
+    'full': dict.fromkeys(ALL_OUTPUTS),
+    # Intraday refresh: what to build now, nothing revenue- or history-driven
+    # and no dashboard sync (its tabs are append-only)
+    'light': {
+        'build_top20': None,
+        'combined_enhanced': ('OPPORTUNITY_NOW', 'DATA_FEED'),
+    },
+    # Standard files only
+    'builds': dict.fromkeys(STANDARD_OUTPUTS),
+    # Revenue views, for re-running after revenue is entered
+    'revenue': {
+        'combined_enhanced': ('REVENUE_TRACKER', 'REVENUE_INSIGHTS', 'PAYMENTS', 'MONTHLY_REVENUE'),
+    },
+}
+
+
+def output_profile():
+    """The OUTPUT_PROFILE setting as (name, {output key: tabs or None})."""
+    name = os.environ.get('OUTPUT_PROFILE', 'full').strip().lower() or 'full'
+    if name not in OUTPUT_PROFILES:
+        print(f"  ⚠️ Unknown OUTPUT_PROFILE '{name}' - using 'full' "
+              f"(available: {', '.join(OUTPUT_PROFILES)})")
+        name = 'full'
+    return name, OUTPUT_PROFILES[name]
+
+
+def profile_output_dir(output_dir, profile_name):
+    """Where a profile writes: the day's reports for 'full', a subfolder otherwise."""
+    if profile_name == 'full':
+        return output_dir
+    return os.path.join(output_dir, profile_name)
+
+
+def run_v35_enhancements(enriched, yesterday_us, yesterday_uk, output_dir, cache_dir, live_revenue_df=None,
+                         two_days_us=None, two_days_uk=None, scheduler=None, context=None, outputs=None):
     """
     Run v3.5.0 enhanced analytics: velocity predictions, competitor analysis,
     variant allocation, and stop rules.
     
+    Consumes the enriched frames from build_enriched_frames() and the run's
+    AnalysisContext (built inside when None). With a RenderScheduler the
+    workbooks are queued on it rather than written.
     Returns dict of generated file paths, or empty dict on failure.
     """
     try:
@@ -43,40 +108,6 @@ def run_v35_enhancements(us_data, uk_data, yesterday_us, yesterday_uk, output_di
     
     print("\n[Step 3b] Running v3.5.0 Enhanced Analytics...")
     
-    # Convert raw data to DataFrames with calculated metrics
-    us_df = pd.DataFrame(us_data) if us_data else pd.DataFrame()
-    uk_df = pd.DataFrame(uk_data) if uk_data else pd.DataFrame()
-    
-    if len(us_df) > 0:
-        us_df = us_df.drop_duplicates(subset=['webVideoUrl'], keep='first')
-        us_df = calculate_metrics(us_df)
-        from daily_processor import get_author_name, detect_ai, calculate_status, calculate_build_now
-        us_df['author'] = us_df.apply(get_author_name, axis=1)
-        us_df['AI_CATEGORY'] = us_df.get('text', pd.Series([''])).apply(detect_ai)
-        us_df = calculate_status(us_df, yesterday_us)
-        us_df['BUILD_NOW'] = us_df.apply(calculate_build_now, axis=1)
-        uk_urls = set(pd.DataFrame(uk_data)['webVideoUrl']) if uk_data else set()
-        us_df['Market'] = us_df['webVideoUrl'].apply(
-            lambda u: '🌐 BOTH' if u in uk_urls else '🇺🇸 US ONLY'
-        )
-        if 'status' in us_df.columns and 'acceleration_status' not in us_df.columns:
-            us_df['acceleration_status'] = us_df['status']
-    
-    if len(uk_df) > 0:
-        uk_df = uk_df.drop_duplicates(subset=['webVideoUrl'], keep='first')
-        uk_df = calculate_metrics(uk_df)
-        from daily_processor import get_author_name, detect_ai, calculate_status, calculate_build_now
-        uk_df['author'] = uk_df.apply(get_author_name, axis=1)
-        uk_df['AI_CATEGORY'] = uk_df.get('text', pd.Series([''])).apply(detect_ai)
-        uk_df = calculate_status(uk_df, yesterday_uk)
-        uk_df['BUILD_NOW'] = uk_df.apply(calculate_build_now, axis=1)
-        us_urls = set(pd.DataFrame(us_data)['webVideoUrl']) if us_data else set()
-        uk_df['Market'] = uk_df['webVideoUrl'].apply(
-            lambda u: '🌐 BOTH' if u in us_urls else '🇬🇧 UK ONLY'
-        )
-        if 'status' in uk_df.columns and 'acceleration_status' not in uk_df.columns:
-            uk_df['acceleration_status'] = uk_df['status']
-    
     yesterday_us_df = None
     yesterday_uk_df = None
     if yesterday_us:
@@ -86,18 +117,23 @@ def run_v35_enhancements(us_data, uk_data, yesterday_us, yesterday_uk, output_di
     
     try:
         enhanced_files = integrate_with_daily_processor(
-            us_data=us_df,
-            uk_data=uk_df,
+            us_data=enriched['us'],
+            uk_data=enriched['uk'],
+            combined_data=enriched['combined'],
             yesterday_us=yesterday_us_df,
             yesterday_uk=yesterday_uk_df,
-            two_days_us=None,
-            two_days_uk=None,
+            two_days_us=two_days_us,
+            two_days_uk=two_days_uk,
             output_dir=output_dir,
-            live_revenue_df=live_revenue_df
+            live_revenue_df=live_revenue_df,
+            scheduler=scheduler,
+            context=context,
+            outputs=outputs
         )
         
         if enhanced_files:
-            print(f"  ✅ Generated {len(enhanced_files)} enhanced files:")
+            verb = "Queued" if scheduler is not None else "Generated"
+            print(f"  ✅ {verb} {len(enhanced_files)} enhanced files:")
             for key, path in enhanced_files.items():
                 print(f"    {key}: {os.path.basename(path)}")
         else:
@@ -113,32 +149,79 @@ def run_v35_enhancements(us_data, uk_data, yesterday_us, yesterday_uk, output_di
         return {}
 
 
-def generate_dashboard_payload(us_data, uk_data, yesterday_us, yesterday_uk, stats, output_dir, cache_dir):
+def build_run_context(enriched, yesterday_us, yesterday_uk, two_days_us, two_days_uk,
+                      output_dir, cache_dir, live_revenue_df=None, outputs=None):
+    """
+    Build the per-run AnalysisContext shared by the enhanced workbooks and the
+    daily briefing (revenue, prediction log, competitor history, seasonal
+    alerts, velocity predictions on the combined union).
+    outputs (the run's output profile) limits it to what those outputs need.
+    Returns None on failure; consumers then fall back to computing their own.
+    """
+    print("\n[Step 3a] Building shared analysis context...")
+    try:
+        from v35_enhancements import build_analysis_context, tab_inputs
+        needs = None
+        if outputs is not None:
+            needs = set().union(*(tab_inputs(outputs[key]) for key in ENHANCED_OUTPUTS if key in outputs))
+            if 'briefing' in outputs:
+                needs.add('predictions')
+            if 'dashboard' in outputs:
+                needs.add('backtest')
+        context = build_analysis_context(
+            enriched['combined'],
+            yesterday_us=pd.DataFrame(yesterday_us) if yesterday_us else None,
+            yesterday_uk=pd.DataFrame(yesterday_uk) if yesterday_uk else None,
+            two_days_us=two_days_us, two_days_uk=two_days_uk,
+            cache_dir=cache_dir, output_dir=output_dir,
+            live_revenue_df=live_revenue_df, needs=needs
+        )
+        print(f"  ✅ Velocity predictions: {len(context.predictions)} URLs "
+              f"({'with' if context.has_velocity else 'no'} history)")
+        return context
+    except Exception as e:
+        print(f"  ❌ Analysis context error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+# Tabs whose rendered rows are handed to update_dashboard.py as-is
+DASHBOARD_SHEET_TABS = ('OPPORTUNITY_NOW', 'COMPETITOR_VIEW', 'DATA_FEED')
+
+
+def generate_dashboard_payload(enriched, stats, output_dir, cache_dir, seasonal_alerts=None, sheet_models=None,
+                               model_summary=None):
     """
     Generate dashboard_payload.json for Google Sheets dashboard updates.
     This file is read by update_dashboard.py to push data to the live Sheet.
+    
+    sheet_models are the combined enhanced workbook's tabs (SheetModels);
+    their rows go out as payload['sheet_rows'] so the live Sheet gets
+    exactly what the workbook shows instead of a second derivation.
+    model_summary is today's prediction backtest (backtest.model_summary)
+    for the PREDICTION_LOG row.
     """
     from datetime import datetime
-    from daily_processor import (get_author_name, detect_ai, calculate_metrics,
-                                  calculate_status, calculate_build_now,
-                                  calculate_tutorial_trigger, YOUR_ACCOUNTS,
-                                  COMPETITOR_ACCOUNTS)
+    from daily_processor import YOUR_ACCOUNTS, COMPETITOR_ACCOUNTS
     
     print("\n[Step 5b] Generating dashboard payload...")
     
     payload = {
         'opportunity_matrix': [],
         'competitor_gaps': [],
-        'model_summary': {},
+        'model_summary': model_summary or {},
         'my_performance': [],
         'seasonal_alerts': [],
         'new_templates': [],
+        'sheet_rows': {},
     }
     
     try:
-        # Generate seasonal alerts for today
-        from datetime import date as date_cls
-        seasonal_alerts = get_seasonal_alerts(date_cls.today())
+        # Generate seasonal alerts for today (unless already computed this run)
+        if seasonal_alerts is None:
+            from datetime import date as date_cls
+            seasonal_alerts = get_seasonal_alerts(date_cls.today())
         payload['seasonal_alerts'] = seasonal_alerts
         if seasonal_alerts:
             print(f"  📅 {len(seasonal_alerts)} seasonal alerts active:")
@@ -146,23 +229,15 @@ def generate_dashboard_payload(us_data, uk_data, yesterday_us, yesterday_uk, sta
                 print(f"     {sa['priority']} {sa['emoji']} {sa['event']} — {sa['timing']}")
         
         # Build MY_PERFORMANCE data for dashboard
-        us_df = pd.DataFrame(us_data) if us_data else pd.DataFrame()
-        uk_df = pd.DataFrame(uk_data) if uk_data else pd.DataFrame()
-        
-        for df, market_label in [(us_df, 'US'), (uk_df, 'UK')]:
+        for df, market_label in [(enriched['us'], 'US'), (enriched['uk'], 'UK')]:
             if len(df) == 0:
                 continue
-            df = df.drop_duplicates(subset=['webVideoUrl'], keep='first')
-            df = calculate_metrics(df)
-            df['author'] = df.apply(get_author_name, axis=1)
-            df['AI_CATEGORY'] = df.get('text', pd.Series([''])).apply(detect_ai)
             
             # Find YOUR posts
             your_mask = df['author'].str.lower().isin([a.lower() for a in YOUR_ACCOUNTS])
             your_posts = df[your_mask]
             
             for _, row in your_posts.iterrows():
-                trigger, urgency, reason = calculate_tutorial_trigger(row)
                 payload['my_performance'].append({
                     'Account': str(row.get('author', '')),
                     'Trend': str(row.get('text', ''))[:60],
@@ -174,20 +249,21 @@ def generate_dashboard_payload(us_data, uk_data, yesterday_us, yesterday_uk, sta
                     'Shares/h': round(row.get('shares_per_hour', 0), 1),
                     'BUILD_NOW': str(row.get('BUILD_NOW', '')),
                     'TikTok URL': str(row.get('webVideoUrl', '')),
-                    'TUTORIAL_TRIGGER': trigger,
-                    'URGENCY': urgency,
-                    'Trigger Reason': reason,
+                    'TUTORIAL_TRIGGER': str(row.get('TUTORIAL_TRIGGER', '')),
+                    'URGENCY': str(row.get('URGENCY', '')),
+                    'Trigger Reason': str(row.get('trigger_reason', '')),
                     'AI_CATEGORY': str(row.get('AI_CATEGORY', '')),
                 })
             
             # Find COMPETITOR posts for gap analysis
             comp_mask = df['author'].str.lower().isin([a.lower() for a in COMPETITOR_ACCOUNTS])
             comp_posts = df[comp_mask]
+            your_urls = set(your_posts['webVideoUrl'])
             
             for _, row in comp_posts.iterrows():
                 # Check if you also posted this trend (by URL match)
                 url = row.get('webVideoUrl', '')
-                you_also = url in set(your_posts.get('webVideoUrl', []))
+                you_also = url in your_urls
                 
                 payload['competitor_gaps'].append({
                     'competitor': str(row.get('author', '')),
@@ -206,6 +282,10 @@ def generate_dashboard_payload(us_data, uk_data, yesterday_us, yesterday_uk, sta
         # New templates = YOUR posts that could be added to REVENUE_TRACKER
         payload['new_templates'] = payload['my_performance']
         
+        for tab in DASHBOARD_SHEET_TABS:
+            if sheet_models and tab in sheet_models:
+                payload['sheet_rows'][tab] = sheet_values(sheet_models[tab])
+        
         # Save payload
         payload_path = os.path.join(cache_dir, 'dashboard_payload.json')
         with open(payload_path, 'w') as f:
@@ -213,6 +293,8 @@ def generate_dashboard_payload(us_data, uk_data, yesterday_us, yesterday_uk, sta
         
         print(f"  ✅ Dashboard payload saved: {len(payload['my_performance'])} MY_PERFORMANCE rows")
         print(f"     {len(payload['competitor_gaps'])} competitor gap entries")
+        if payload['sheet_rows']:
+            print(f"     Rendered rows: {', '.join(f'{t} {len(r)}' for t, r in payload['sheet_rows'].items())}")
         
     except Exception as e:
         print(f"  ❌ Dashboard payload error: {e}")
@@ -292,11 +374,16 @@ def main():
     output_dir = os.environ.get('OUTPUT_DIR', 'output')
     cache_dir = os.environ.get('CACHE_DIR', 'data')
     
+    profile_name, outputs = output_profile()
+    daily_run = profile_name == 'full'
+    output_dir = profile_output_dir(output_dir, profile_name)
+    
     os.makedirs(output_dir, exist_ok=True)
     os.makedirs(cache_dir, exist_ok=True)
     
     print(f"\nOutput directory: {output_dir}")
     print(f"Cache directory: {cache_dir}")
+    print(f"Output profile: {profile_name} ({', '.join(outputs)})")
     
     # Step 1: Fetch data from Apify
     print("\n[Step 1] Fetching data from Apify...")
@@ -320,6 +407,8 @@ def main():
     else:
         print("  No cache found - all statuses will be NEW")
     
+    two_days_us, two_days_uk = load_two_days_cache(cache_dir)
+    
     # Step 2b: Fetch live revenue from Google Sheet (revenue persistence)
     print("\n[Step 2b] Fetching live revenue data...")
     live_revenue_df = fetch_live_revenue()
@@ -327,6 +416,13 @@ def main():
         live_revenue_df = load_cached_revenue(cache_dir)
     revenue_lookup = get_revenue_lookup(live_revenue_df)
     
+    # Step 2c: Enrich each market once — every later step reads these frames
+    print("\n[Step 2c] Enriching market data...")
+    enriched = build_enriched_frames(us_data, uk_data, yesterday_us, yesterday_uk)
+    
+    # Workbooks from Steps 3 and 3b are queued here and rendered together in 3d
+    scheduler = RenderScheduler()
+    
     # Step 3: Process data (standard v3.3.0 files)
     print("\n[Step 3] Processing data (standard files)...")
     stats = process_data(
@@ -334,136 +430,135 @@ def main():
         us_music, uk_music,
         yesterday_us, yesterday_uk,
         output_dir, cache_dir,
-        revenue_lookup=revenue_lookup
+        revenue_lookup=revenue_lookup,
+        enriched=enriched,
+        scheduler=scheduler,
+        outputs={k: v for k, v in outputs.items() if k in STANDARD_OUTPUTS}
     )
     
-    # Step 3b: Run v3.5.0 enhancements (non-blocking)
-    enhanced_files = run_v35_enhancements(
-        us_data, uk_data,
-        yesterday_us, yesterday_uk,
-        output_dir, cache_dir,
-        live_revenue_df=live_revenue_df
-    )
+    # Step 3a: Market-independent analysis, computed once for 3b and 3c
+    wants_enhanced = any(key in outputs for key in ENHANCED_OUTPUTS)
+    context = None
+    if wants_enhanced or 'briefing' in outputs:
+        context = build_run_context(
+            enriched, yesterday_us, yesterday_uk, two_days_us, two_days_uk,
+            output_dir, cache_dir, live_revenue_df=live_revenue_df, outputs=outputs
+        )
     
-    if enhanced_files:
-        stats['enhanced_files'] = len(enhanced_files)
+    # Step 3b: Run v3.5.0 enhancements (non-blocking)
+    enhanced_files = {}
+    if wants_enhanced:
+        enhanced_files = run_v35_enhancements(
+            enriched,
+            yesterday_us, yesterday_uk,
+            output_dir, cache_dir,
+            live_revenue_df=live_revenue_df,
+            two_days_us=two_days_us, two_days_uk=two_days_uk,
+            scheduler=scheduler,
+            context=context,
+            outputs=outputs
+        )
     
     # Step 3c: Generate daily briefing and append to SUMMARY_REPORT
     print("\n[Step 3c] Generating daily briefing...")
-    try:
-        combined_df = pd.concat(
-            [df for df in [
-                pd.DataFrame(us_data) if us_data else pd.DataFrame(),
-                pd.DataFrame(uk_data) if uk_data else pd.DataFrame()
-            ] if len(df) > 0],
-            ignore_index=True
-        )
+    if 'briefing' not in outputs:
+        print("  Skipping briefing (not in output profile)")
+    else:
+        try:
+            combined_df = enriched['combined']
         
-        if len(combined_df) > 0:
-            combined_df = combined_df.drop_duplicates(subset=['webVideoUrl'], keep='first')
-            combined_df = calculate_metrics(combined_df)
-            from daily_processor import get_author_name, detect_ai, calculate_status, calculate_build_now
-            combined_df['author'] = combined_df.apply(get_author_name, axis=1)
-            combined_df['AI_CATEGORY'] = combined_df.get('text', pd.Series([''])).apply(detect_ai)
-            
-            us_urls = set(pd.DataFrame(us_data)['webVideoUrl']) if us_data else set()
-            uk_urls = set(pd.DataFrame(uk_data)['webVideoUrl']) if uk_data else set()
-            both_urls = us_urls & uk_urls
-            combined_df['Market'] = combined_df['webVideoUrl'].apply(
-                lambda u: '🌐 BOTH' if u in both_urls else '🇺🇸/🇬🇧 SINGLE'
-            )
+            if len(combined_df) > 0:
+                combined_yesterday = None
+                if yesterday_us and yesterday_uk:
+                    combined_yesterday = yesterday_us + yesterday_uk
+                elif yesterday_us:
+                    combined_yesterday = yesterday_us
+                elif yesterday_uk:
+                    combined_yesterday = yesterday_uk
             
-            combined_yesterday = None
-            if yesterday_us and yesterday_uk:
-                combined_yesterday = yesterday_us + yesterday_uk
-            elif yesterday_us:
-                combined_yesterday = yesterday_us
-            elif yesterday_uk:
-                combined_yesterday = yesterday_uk
-            combined_df = calculate_status(combined_df, combined_yesterday)
-            if 'status' in combined_df.columns:
-                combined_df['acceleration_status'] = combined_df['status']
+                yesterday_combined_df = None
+                if combined_yesterday:
+                    yesterday_combined_df = pd.DataFrame(combined_yesterday)
             
-            yesterday_combined_df = None
-            if combined_yesterday:
-                yesterday_combined_df = pd.DataFrame(combined_yesterday)
+                streak_cache = os.path.join(cache_dir, 'velocity_streak_cache.json')
             
-            cache_dir_path = os.environ.get('CACHE_DIR', 'data')
-            streak_cache = os.path.join(cache_dir_path, 'velocity_streak_cache.json')
-            
-            briefing_text = generate_daily_briefing(
-                combined_df, yesterday_combined_df,
-                output_dir, cache_path=streak_cache
-            )
+                briefing_text = generate_daily_briefing(
+                    combined_df, yesterday_combined_df,
+                    output_dir, cache_path=streak_cache,
+                    context=context
+                )
             
-            from datetime import datetime
-            today = datetime.now().strftime('%Y-%m-%d')
-            summary_path = f"{output_dir}/SUMMARY_REPORT_{today}.txt"
+                from datetime import datetime
+                today = datetime.now().strftime('%Y-%m-%d')
+                summary_path = f"{output_dir}/SUMMARY_REPORT_{today}.txt"
             
-            with open(summary_path, 'a') as f:
-                f.write("\n\n")
-                f.write(briefing_text)
+                with open(summary_path, 'a') as f:
+                    f.write("\n\n")
+                    f.write(briefing_text)
             
-            print("  ✅ Daily briefing appended to SUMMARY_REPORT")
-        else:
-            print("  ⚠️ No data available for briefing")
-    except Exception as e:
-        print(f"  ❌ Briefing generation error: {e}")
-        import traceback
-        traceback.print_exc()
-        print("  Continuing without briefing.")
+                print("  ✅ Daily briefing appended to SUMMARY_REPORT")
+            else:
+                print("  ⚠️ No data available for briefing")
+        except Exception as e:
+            print(f"  ❌ Briefing generation error: {e}")
+            import traceback
+            traceback.print_exc()
+            print("  Continuing without briefing.")
     
-    # Step 4: Save today's cache for tomorrow
-    print("\n[Step 4] Saving cache for tomorrow...")
-    us_df = pd.DataFrame(us_data) if us_data else pd.DataFrame()
-    uk_df = pd.DataFrame(uk_data) if uk_data else pd.DataFrame()
+    # Step 3d: Render every queued workbook concurrently
+    print("\n[Step 3d] Rendering output files...")
+    scheduler.run()
+    enhanced_files = {k: v for k, v in enhanced_files.items() if v not in scheduler.failed}
     
-    if len(us_df) > 0:
-        us_df = us_df.drop_duplicates(subset=['webVideoUrl'], keep='first')
-        us_df = calculate_metrics(us_df)
+    if enhanced_files:
+        stats['enhanced_files'] = len(enhanced_files)
     
-    if len(uk_df) > 0:
-        uk_df = uk_df.drop_duplicates(subset=['webVideoUrl'], keep='first')
-        uk_df = calculate_metrics(uk_df)
+    # Step 4: Save today's cache for tomorrow (the daily run owns the day's state)
+    print("\n[Step 4] Saving cache for tomorrow...")
+    if daily_run:
+        save_today_cache(enriched['us'], enriched['uk'], cache_dir,
+                         predictions=context.predictions if context is not None else None)
+    else:
+        print(f"  Skipping snapshot and run state ('{profile_name}' profile)")
     
-    save_today_cache(us_df, uk_df, cache_dir)
+    # Velocity streaks and today's backtest were computed once in Step 3a; written once, now
+    if daily_run and context is not None:
+        try:
+            context.commit()
+            if context.streaks is not None:
+                print(f"  ✅ Velocity streaks saved ({len(context.streaks.entries)} URLs)")
+            if context.prediction_pairs is not None and len(context.prediction_pairs) > 0:
+                print(f"  ✅ Prediction log appended ({len(context.prediction_pairs)} scored URLs)")
+        except Exception as e:
+            print(f"  ⚠️ Could not save run state: {e}")
+            import traceback
+            traceback.print_exc()
     
     # Step 4b: Cache revenue locally as backup
     if live_revenue_df is not None:
         cache_revenue_locally(live_revenue_df, cache_dir)
     
     # Step 4c: Save competitor history for 7-day intel
-    try:
-        from competitor_intel_patch import save_competitor_history
-        # Need full data with author column for competitor detection
-        combined_for_comp = pd.concat([df for df in [us_df, uk_df] if len(df) > 0], ignore_index=True)
-        if len(combined_for_comp) > 0:
-            combined_for_comp = combined_for_comp.drop_duplicates(subset=['webVideoUrl'], keep='first')
-            from daily_processor import get_author_name, detect_ai
-            if 'author' not in combined_for_comp.columns:
-                combined_for_comp['author'] = combined_for_comp.apply(get_author_name, axis=1)
-            if 'AI_CATEGORY' not in combined_for_comp.columns:
-                combined_for_comp['AI_CATEGORY'] = combined_for_comp.get('text', pd.Series([''])).apply(detect_ai)
-            if 'Market' not in combined_for_comp.columns:
-                us_urls_set = set(us_df['webVideoUrl']) if len(us_df) > 0 else set()
-                uk_urls_set = set(uk_df['webVideoUrl']) if len(uk_df) > 0 else set()
-                both_urls_set = us_urls_set & uk_urls_set
-                combined_for_comp['Market'] = combined_for_comp['webVideoUrl'].apply(
-                    lambda u: '🌐 BOTH' if u in both_urls_set else ('🇺🇸 US ONLY' if u in us_urls_set else '🇬🇧 UK ONLY')
-                )
-            save_competitor_history(combined_for_comp, cache_dir)
-    except Exception as e:
-        print(f"  ⚠️ Could not save competitor history: {e}")
-        import traceback
-        traceback.print_exc()
+    if daily_run:
+        try:
+            from competitor_intel_patch import save_competitor_history
+            if len(enriched['combined']) > 0:
+                save_competitor_history(enriched['combined'], cache_dir)
+        except Exception as e:
+            print(f"  ⚠️ Could not save competitor history: {e}")
+            import traceback
+            traceback.print_exc()
     
     # Step 5: Send Discord notification (with seasonal alerts)
     print("\n[Step 5] Sending Discord notification...")
-    seasonal_alerts = get_seasonal_alerts()
+    seasonal_alerts = context.seasonal_alerts if context is not None else get_seasonal_alerts()
     if seasonal_alerts:
         stats['seasonal_alerts'] = seasonal_alerts
         stats['seasonal_discord_fields'] = format_seasonal_for_discord(seasonal_alerts)
-    send_discord_notification(stats)
+    if daily_run:
+        send_discord_notification(stats)
+    else:
+        print(f"  Skipping Discord notification ('{profile_name}' profile)")
     
     # Append seasonal info to SUMMARY_REPORT if it exists
     summary_files = [f for f in os.listdir(output_dir) if f.startswith('SUMMARY_REPORT')] if os.path.exists(output_dir) else []
@@ -478,17 +573,33 @@ def main():
             print(f"  ⚠️ Could not append seasonal to summary: {e}")
     
     # Step 5b: Generate dashboard payload (NEW v3.6.0)
-    generate_dashboard_payload(us_data, uk_data, yesterday_us, yesterday_uk, stats, output_dir, cache_dir)
+    if 'dashboard' in outputs:
+        combined_sheets = model_summary = None
+        if context is not None:
+            if 'combined_enhanced' in enhanced_files:
+                combined_sheets = context.sheet_models.get(enhanced_files['combined_enhanced'])
+            from backtest import model_summary as backtest_summary
+            model_summary = backtest_summary(context.accuracy_for())
+        generate_dashboard_payload(enriched, stats, output_dir, cache_dir, seasonal_alerts=seasonal_alerts,
+                                   sheet_models=combined_sheets, model_summary=model_summary)
     
     # Step 6: Upload to Google Drive (NEW v3.6.0)
     print("\n[Step 6] Uploading to Google Drive...")
-    drive_url = upload_to_google_drive(output_dir)
+    drive_url = None
+    if daily_run:
+        drive_url = upload_to_google_drive(output_dir)
+    else:
+        print(f"  Skipping Drive upload ('{profile_name}' profile files stay in {output_dir})")
     if drive_url:
         stats['drive_url'] = drive_url
     
     # Step 7: Update Google Sheets Dashboard (NEW v3.6.0)
     print("\n[Step 7] Updating Google Sheets dashboard...")
-    dashboard_updated = update_google_dashboard(cache_dir)
+    dashboard_updated = False
+    if 'dashboard' in outputs:
+        dashboard_updated = update_google_dashboard(cache_dir)
+    else:
+        print("  Skipping dashboard update (not in output profile)")
     
     # Done
     print("\n" + "=" * 50)
@@ -11,41 +11,23 @@ import json
 import requests
 from datetime import datetime, timezone
 from typing import Optional
-import re
+
+from apify_fetcher import fetch_tasks, replay_enabled, resolve_runs, run_succeeded
+from apify_schema import normalize_records
+from ai_classifier import is_ai_text
+from rules_engine import (POLLER_ALERT_RULES, POLLER_ENTRY_RULES, POLLER_PRIORITY_RULES,
+                          POLLER_STOP_RULES)
 
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 
-# Entry Criteria (to become a candidate)
-ENTRY_MAX_AGE_HOURS = 48
-ENTRY_MIN_SHARES_PER_HOUR = 6
-ENTRY_MIN_VIEWS_PER_HOUR = 150
-
-# Alert Criteria (triggers Discord notification)
-ALERT_MAX_AGE_HOURS = 36
-ALERT_MIN_SHARES_PER_HOUR = 8
-ALERT_MIN_VIEWS_PER_HOUR = 200
-ALERT_MIN_DELTA_SHARES = 4
-
-# Stop Tracking Criteria
-STOP_AGE_HOURS = 60
-STOP_CONSECUTIVE_NEGATIVE_DELTAS = 2
+# Entry / alert / stop / priority thresholds live in rules_engine.py
+# (POLLER_*_RULES)
 
 # System Limits
 MAX_CANDIDATES = 8
 
-# Alert Priority Thresholds
-URGENT_MOMENTUM = 3000
-URGENT_SHARES_PER_HOUR = 100
-HIGH_MOMENTUM = 2000
-HIGH_SHARES_PER_HOUR = 60
-
-# Discord Colors
-COLOR_URGENT = 16711680   # Red
-COLOR_HIGH = 16744192     # Orange
-COLOR_WATCH = 16776960    # Yellow
-
 # Your Accounts (for identification)
 YOUR_ACCOUNTS = [
     'capcuttemplates833',
@@ -67,16 +49,6 @@ COMPETITOR_ACCOUNTS = [
     'capcut.trends.uk1'
 ]
 
-# AI Detection
-AI_KEYWORDS = [
-    'artificial intelligence', 'capcut ai', 'capcutai', 'ai filter', 'ai effect',
-    'ai generated', 'ai video', 'ai photo', 'ai template', 'aifilter', 'aieffect',
-    'ki filter', 'ki effect', 'ki video', 'ki foto', 'ki vorlage',
-    'ia filter', 'ia effect', 'ia filtro', 'ia efecto', 'ia video'
-]
-AI_EXCLUSIONS = ['aicover', 'aivoice', 'aiart', 'airdrop', 'air', 'hair', 'fair', 'chair', 'stairs']
-AI_STANDALONE = ['ai', 'ki', 'ia']
-
 # File paths
 CANDIDATES_FILE = 'data/micro_candidates.json'
 
@@ -120,26 +92,33 @@ def save_candidates(data: dict):
     print(f"\u2705 Saved {len(data['candidates'])} candidates to {CANDIDATES_FILE}")
 
 
-def calculate_age_hours(create_time_iso: str) -> float:
-    """Calculate age in hours from ISO timestamp."""
+def calculate_age_hours(create_time) -> float:
+    """Calculate age in hours from an aware datetime or ISO timestamp."""
     try:
-        # Handle various timestamp formats
-        if create_time_iso.endswith('Z'):
-            create_time_iso = create_time_iso[:-1] + '+00:00'
-        create_time = datetime.fromisoformat(create_time_iso)
-        if create_time.tzinfo is None:
-            create_time = create_time.replace(tzinfo=timezone.utc)
+        if isinstance(create_time, datetime):
+            created = create_time
+        else:
+            # Handle various timestamp formats
+            create_time_iso = str(create_time)
+            if create_time_iso.endswith('Z'):
+                create_time_iso = create_time_iso[:-1] + '+00:00'
+            created = datetime.fromisoformat(create_time_iso)
+        if created.tzinfo is None:
+            created = created.replace(tzinfo=timezone.utc)
         now = datetime.now(timezone.utc)
-        age_seconds = (now - create_time).total_seconds()
+        age_seconds = (now - created).total_seconds()
         return max(age_seconds / 3600, 0.1)  # Minimum 0.1 to avoid division by zero
     except Exception as e:
-        print(f"\u26a0\ufe0f Error parsing timestamp {create_time_iso}: {e}")
+        print(f"\u26a0\ufe0f Error parsing timestamp {create_time}: {e}")
         return 999  # Return high value to exclude
 
 
 def calculate_metrics(video: dict) -> dict:
-    """Calculate all metrics for a video."""
-    age_hours = calculate_age_hours(video.get('createTimeISO', ''))
+    """Calculate all metrics for a video (canonical fields from apify_schema)."""
+    created = video.get('createTime_parsed')
+    if created is None:
+        created = video.get('createTimeISO', '')
+    age_hours = calculate_age_hours(created)
 
     share_count = video.get('shareCount', 0) or 0
     digg_count = video.get('diggCount', 0) or 0
@@ -161,32 +140,14 @@ def calculate_metrics(video: dict) -> dict:
 
 
 def detect_ai(text: str) -> bool:
-    """Detect if video is AI-related."""
-    if not text:
-        return False
-    text_lower = text.lower()
-
-    # Check explicit keywords
-    for kw in AI_KEYWORDS:
-        if kw in text_lower:
-            return True
-
-    # Check standalone terms with word boundaries
-    for term in AI_STANDALONE:
-        if re.search(rf'\b{term}\b', text_lower):
-            return True
-
-    return False
+    """Detect if video is AI-related (shared rules in ai_classifier)."""
+    return is_ai_text(text)
 
 
 def get_priority(momentum: int, shares_per_hour: float) -> tuple:
     """Determine alert priority and color."""
-    if momentum >= URGENT_MOMENTUM or shares_per_hour >= URGENT_SHARES_PER_HOUR:
-        return '\U0001f525 URGENT', COLOR_URGENT
-    elif momentum >= HIGH_MOMENTUM or shares_per_hour >= HIGH_SHARES_PER_HOUR:
-        return '\u26a1 HIGH', COLOR_HIGH
-    else:
-        return '\U0001f7e1 WATCH', COLOR_WATCH
+    out = POLLER_PRIORITY_RULES.evaluate({'momentum': momentum, 'shares_per_hour': shares_per_hour})
+    return out['priority'], out['color']
 
 
 def truncate_text(text: str, max_length: int = 80) -> str:
@@ -199,59 +160,8 @@ def truncate_text(text: str, max_length: int = 80) -> str:
 
 
 def get_author_name(video: dict) -> str:
-    """Extract author name from video data, handling nested structures."""
-    # Try various field names
-    for field in ['authorMeta_name', 'authorMeta_uniqueId', 'author_name', 'username', 'creator']:
-        if field in video and video[field]:
-            return str(video[field])
-
-    # Try nested authorMeta
-    author_meta = video.get('authorMeta', {})
-    if isinstance(author_meta, dict):
-        for field in ['name', 'uniqueId', 'nickname']:
-            if field in author_meta and author_meta[field]:
-                return str(author_meta[field])
-
-    return 'Unknown'
-
-
-# =============================================================================
-# APIFY API FUNCTIONS
-# =============================================================================
-
-def fetch_apify_data(task_id: str, api_token: str) -> list:
-    """Fetch latest data from Apify task."""
-    url = f"https://api.apify.com/v2/actor-tasks/{task_id}/runs/last/dataset/items"
-    headers = {"Authorization": f"Bearer {api_token}"}
-
-    print(f"\U0001f4e1 Fetching data from Apify task: {task_id}")
-
-    try:
-        response = requests.get(url, headers=headers, timeout=60)
-        response.raise_for_status()
-        data = response.json()
-        print(f"\u2705 Received {len(data)} videos from Apify")
-        return data
-    except requests.exceptions.RequestException as e:
-        print(f"\u274c Apify API error: {e}")
-        return []
-
-
-def flatten_dict(d: dict, parent_key: str = '', sep: str = '_') -> dict:
-    """Flatten nested dictionary."""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
-
-def flatten_apify_data(data: list) -> list:
-    """Flatten all records in Apify data."""
-    return [flatten_dict(record) if isinstance(record, dict) else record for record in data]
+    """Return the canonical author resolved by apify_schema.normalize_records()."""
+    return str(video.get('author') or 'Unknown')
 
 
 # =============================================================================
@@ -327,36 +237,24 @@ def send_summary_notification(webhook_url: str, new_candidates: int, alerts_sent
 
 def meets_entry_criteria(metrics: dict) -> bool:
     """Check if video meets entry criteria to become a candidate."""
-    return (
-        metrics['age_hours'] <= ENTRY_MAX_AGE_HOURS and
-        metrics['shares_per_hour'] >= ENTRY_MIN_SHARES_PER_HOUR and
-        metrics['views_per_hour'] >= ENTRY_MIN_VIEWS_PER_HOUR
-    )
+    return POLLER_ENTRY_RULES.evaluate(metrics)['enter']
 
 
 def meets_alert_criteria(metrics: dict, delta: Optional[float]) -> bool:
-    """Check if candidate meets alert criteria."""
-    if delta is None:
-        return False
-    return (
-        metrics['age_hours'] <= ALERT_MAX_AGE_HOURS and
-        metrics['shares_per_hour'] >= ALERT_MIN_SHARES_PER_HOUR and
-        metrics['views_per_hour'] >= ALERT_MIN_VIEWS_PER_HOUR and
-        delta >= ALERT_MIN_DELTA_SHARES
-    )
+    """Check if candidate meets alert criteria (never on the first check)."""
+    return POLLER_ALERT_RULES.evaluate(dict(metrics, delta=delta))['alert']
 
 
-def should_stop_tracking(candidate: dict, metrics: dict) -> bool:
-    """Check if candidate should stop being tracked."""
-    # Age exceeded
-    if metrics['age_hours'] > STOP_AGE_HOURS:
-        return True
+def stop_tracking_reason(candidate: dict, metrics: dict) -> str:
+    """Why a candidate should stop being tracked ('' to keep tracking)."""
+    return POLLER_STOP_RULES.evaluate(dict(
+        metrics, consecutive_negative_deltas=candidate.get('consecutive_negative_deltas', 0)
+    ))['reason']
 
-    # Too many consecutive negative deltas
-    if candidate.get('consecutive_negative_deltas', 0) >= STOP_CONSECUTIVE_NEGATIVE_DELTAS:
-        return True
 
-    return False
+def should_stop_tracking(candidate: dict, metrics: dict) -> bool:
+    """Check if candidate should stop being tracked."""
+    return bool(stop_tracking_reason(candidate, metrics))
 
 
 def detect_market(url: str, us_urls: set, uk_urls: set) -> str:
@@ -373,12 +271,16 @@ def detect_market(url: str, us_urls: set, uk_urls: set) -> str:
     return "Unknown"
 
 
-def process_polling_run(us_data: list, uk_data: list, webhook_url: str) -> dict:
-    """Main polling logic - process data and update candidates."""
+def process_polling_run(us_data: list, uk_data: list, webhook_url: str, run_ids: dict = None) -> dict:
+    """Main polling logic - process data and update candidates.
+
+    run_ids ({'US': ..., 'UK': ...}) is stored in the state file so the next
+    poll can skip Apify runs it has already processed.
+    """
 
-    # Flatten nested data
-    us_data = flatten_apify_data(us_data)
-    uk_data = flatten_apify_data(uk_data)
+    # fetch_tasks already flattened each page; resolve the field schema once per dataset
+    us_data = normalize_records(us_data)
+    uk_data = normalize_records(uk_data)
 
     # Load existing candidates
     state = load_candidates()
@@ -447,8 +349,8 @@ def process_polling_run(us_data: list, uk_data: list, webhook_url: str) -> dict:
             delta = metrics['shares_per_hour'] - last_shares_per_hour
 
         # Check if should stop tracking
-        if should_stop_tracking(candidate, metrics):
-            reason = "age exceeded" if metrics['age_hours'] > STOP_AGE_HOURS else "declining"
+        reason = stop_tracking_reason(candidate, metrics)
+        if reason:
             print(f"\U0001f6d1 Stopped tracking ({reason}): {truncate_text(candidate.get('text', ''), 30)}")
             removed_count += 1
             continue
@@ -536,6 +438,8 @@ def process_polling_run(us_data: list, uk_data: list, webhook_url: str) -> dict:
     # STEP 3: Save updated state
     # -------------------------------------------------------------------------
     state['candidates'] = updated_candidates
+    if run_ids:
+        state['last_run_ids'] = run_ids
     save_candidates(state)
 
     # Send summary notification (only if something happened)
@@ -571,7 +475,7 @@ def main():
     apify_token = get_env_var('APIFY_TOKEN')
     discord_webhook = get_env_var('DISCORD_WEBHOOK')
 
-    if not apify_token:
+    if not apify_token and not replay_enabled():
         print("\u274c APIFY_TOKEN not set")
         return 1
 
@@ -591,22 +495,28 @@ def main():
     print(f"\U0001f4cb US Task ID: {us_task_id or 'Not set'}")
     print(f"\U0001f4cb UK Task ID: {uk_task_id or 'Not set'}")
 
-    # Fetch data from Apify
-    us_data = []
-    uk_data = []
-
-    if us_task_id:
-        us_data = fetch_apify_data(us_task_id, apify_token)
-
-    if uk_task_id:
-        uk_data = fetch_apify_data(uk_task_id, apify_token)
+    # Resolve the latest run IDs first: nothing to do if both were already polled
+    tasks = {'US': us_task_id, 'UK': uk_task_id}
+    runs = resolve_runs(tasks, apify_token)
+    run_ids = {label: run['id'] for label, run in runs.items() if run_succeeded(run)}
+    last_run_ids = load_candidates().get('last_run_ids') or {}
+    if (not replay_enabled() and run_ids and len(run_ids) == len(runs)
+            and all(last_run_ids.get(k) == v for k, v in run_ids.items())):
+        print(f"\u23ed\ufe0f No new Apify runs since last poll ({', '.join(f'{k} {v}' for k, v in run_ids.items())}) - skipping")
+        return 0
+
+    # Fetch data from Apify (both markets concurrently, shared session)
+    print("\U0001f4e1 Fetching data from Apify...")
+    fetched = fetch_tasks(tasks, apify_token, runs=runs)
+    us_data = fetched.get('US') or []
+    uk_data = fetched.get('UK') or []
 
     if not us_data and not uk_data:
         print("\u274c No data received from Apify")
         return 1
 
     # Process the data
-    results = process_polling_run(us_data, uk_data, discord_webhook)
+    results = process_polling_run(us_data, uk_data, discord_webhook, run_ids=run_ids)
 
     print("\n" + "=" * 60)
     print("\U0001f4ca POLLING COMPLETE")
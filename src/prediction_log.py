@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+PREDICTION LOG STORE
+Append-only history of the daily prediction backtest (backtest.py), kept
+under CACHE_DIR instead of being parsed back out of the last dashboard
+workbook:
+
+    {CACHE_DIR}/prediction_log/summaries.jsonl    one JSON score per line
+    {CACHE_DIR}/prediction_log/summaries.idx      date offset length per line
+    {CACHE_DIR}/prediction_log/records/2026-02-20.npz
+                                                  that day's scored URLs
+
+A day's summary is appended once per run and never rewritten; a re-run of
+the same day appends again and the later line wins. Reads go through the
+small index, so fetching a date window seeks straight to its lines and the
+cost does not grow with the length of the log. The first time the log is
+used, the PREDICTION_LOG rows of an existing dashboard workbook are
+imported so history carries over.
+"""
+
+import json
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import backtest
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+LOG_SUBDIR = 'prediction_log'
+SUMMARY_FILE = 'summaries.jsonl'
+INDEX_FILE = 'summaries.idx'
+RECORDS_SUBDIR = 'records'
+
+# Days of history shown in the PREDICTION_LOG tab (the DASHBOARD KPIs read rows 2-100)
+DEFAULT_WINDOW_DAYS = 60
+
+RECORD_COLUMNS = ['webVideoUrl', 'momentum_then', 'predicted_24h', 'action_window', 'momentum_now']
+
+
+def log_dir(cache_dir: str) -> str:
+    return os.path.join(cache_dir, LOG_SUBDIR)
+
+
+def window_days() -> int:
+    try:
+        return int(os.environ.get('PREDICTION_LOG_DAYS', DEFAULT_WINDOW_DAYS))
+    except ValueError:
+        return DEFAULT_WINDOW_DAYS
+
+
+def _as_date(day) -> date:
+    return pd.Timestamp(day).date()
+
+
+def _jsonable(value):
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+# =============================================================================
+# WRITE
+# =============================================================================
+
+def append_summary(cache_dir: str, score: dict) -> None:
+    """Append one day's score (a backtest.score_pairs() row) to the log."""
+    os.makedirs(log_dir(cache_dir), exist_ok=True)
+    day = _as_date(score['date']).isoformat()
+    entry = {col: _jsonable(score.get(col)) for col in backtest.SCORE_COLUMNS}
+    entry['date'] = day
+    line = (json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+    with open(os.path.join(log_dir(cache_dir), SUMMARY_FILE), 'ab') as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(line)
+    # Index last: a line without an index entry is never read
+    with open(os.path.join(log_dir(cache_dir), INDEX_FILE), 'a') as f:
+        f.write(f"{day} {offset} {len(line)}\n")
+
+
+def save_records(cache_dir: str, day, pairs: pd.DataFrame) -> str:
+    """Write one outcome day's scored URLs (pair_outcomes rows); replaces that day's file."""
+    path = os.path.join(log_dir(cache_dir), RECORDS_SUBDIR, f"{_as_date(day).isoformat()}.npz")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            webVideoUrl=pairs['webVideoUrl'].astype(str).to_numpy(dtype=str),
+            action_window=pairs['action_window'].astype(str).to_numpy(dtype=str),
+            **{col: pairs[col].to_numpy(dtype='float64')
+               for col in ('momentum_then', 'predicted_24h', 'momentum_now')},
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def append_day(cache_dir: str, pairs: pd.DataFrame) -> int:
+    """Log the scores and records of every outcome day in pairs. Returns days logged."""
+    if pairs is None or len(pairs) == 0:
+        return 0
+    scores = backtest.score_pairs(pairs)
+    for score, (day, records) in zip(scores.to_dict('records'), pairs.groupby('date', sort=True)):
+        save_records(cache_dir, day, records)
+        append_summary(cache_dir, score)
+    return len(scores)
+
+
+# =============================================================================
+# READ
+# =============================================================================
+
+def _read_index(cache_dir: str) -> list:
+    """[(date ISO, offset, length)] sorted by date (stable: later lines last)."""
+    path = os.path.join(log_dir(cache_dir), INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3:
+                entries.append((parts[0], int(parts[1]), int(parts[2])))
+    entries.sort(key=lambda e: e[0])
+    return entries
+
+
+def has_log(cache_dir: str) -> bool:
+    return os.path.exists(os.path.join(log_dir(cache_dir), INDEX_FILE))
+
+
+def read_summaries(cache_dir: str, start=None, end=None) -> pd.DataFrame:
+    """Logged scores dated start..end (inclusive, None = open), one row per date.
+
+    Columns are backtest.SCORE_COLUMNS; date is an ISO string.
+    """
+    index = _read_index(cache_dir)
+    keys = [e[0] for e in index]
+    lo = bisect_left(keys, _as_date(start).isoformat()) if start is not None else 0
+    hi = bisect_right(keys, _as_date(end).isoformat()) if end is not None else len(keys)
+
+    latest = {}
+    if lo < hi:
+        with open(os.path.join(log_dir(cache_dir), SUMMARY_FILE), 'rb') as f:
+            for day, offset, length in index[lo:hi]:
+                f.seek(offset)
+                try:
+                    latest[day] = json.loads(f.read(length).decode('utf-8'))
+                except ValueError:
+                    continue
+    rows = [latest[day] for day in sorted(latest)]
+    return pd.DataFrame(rows, columns=backtest.SCORE_COLUMNS)
+
+
+def read_records(cache_dir: str, start=None, end=None) -> pd.DataFrame:
+    """Logged scored URLs for outcome dates start..end, stacked with a date column."""
+    folder = os.path.join(log_dir(cache_dir), RECORDS_SUBDIR)
+    start = _as_date(start) if start is not None else date.min
+    end = _as_date(end) if end is not None else date.max
+    frames = []
+    names = sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+    for name in names:
+        if not name.endswith('.npz'):
+            continue
+        try:
+            day = date.fromisoformat(name[:-4])
+        except ValueError:
+            continue
+        if start <= day <= end:
+            with np.load(os.path.join(folder, name), allow_pickle=False) as data:
+                frame = pd.DataFrame({col: data[col] for col in RECORD_COLUMNS})
+            frame.insert(0, 'date', day)
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['date'] + RECORD_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_window(cache_dir: str, today=None, days: int = None) -> pd.DataFrame:
+    """The scores shown in PREDICTION_LOG before today's row: the last `days` days up to yesterday."""
+    today = _as_date(today) if today is not None else datetime.now(timezone.utc).date()
+    days = window_days() if days is None else days
+    return read_summaries(cache_dir, start=today - timedelta(days=days), end=today - timedelta(days=1))
+
+
+# =============================================================================
+# LEGACY IMPORT / BACKFILL
+# =============================================================================
+
+def import_legacy(cache_dir: str, legacy: pd.DataFrame) -> int:
+    """Seed an empty log from a dashboard's PREDICTION_LOG rows (10 columns, sheet order).
+
+    Direction accuracy is stored in the sheet as a fraction and in the log
+    as a percentage. Rows without a readable date are skipped. Returns rows
+    imported.
+    """
+    if has_log(cache_dir) or legacy is None or len(legacy) == 0:
+        return 0
+    os.makedirs(log_dir(cache_dir), exist_ok=True)
+    imported = 0
+    for values in legacy.itertuples(index=False):
+        values = list(values) + [None] * (len(backtest.SCORE_COLUMNS) - len(values))
+        score = dict(zip(backtest.SCORE_COLUMNS, values))
+        try:
+            score['date'] = _as_date(score['date'])
+        except (ValueError, TypeError):
+            continue
+        accuracy = pd.to_numeric(pd.Series([score['direction_accuracy_pct']]), errors='coerce').iloc[0]
+        score['direction_accuracy_pct'] = None if pd.isna(accuracy) else round(float(accuracy) * 100, 1)
+        append_summary(cache_dir, score)
+        imported += 1
+    # An empty index still marks the log as started
+    open(os.path.join(log_dir(cache_dir), INDEX_FILE), 'a').close()
+    return imported
+
+
+def backfill(cache_dir: str, start=None, end=None) -> int:
+    """Score stored snapshot history (backtest.py) and log days the log does not have yet."""
+    logged = {e[0] for e in _read_index(cache_dir)}
+    load_start = _as_date(start) - timedelta(days=1) if start is not None else None
+    pairs = backtest.pair_outcomes(backtest.load_prediction_history(cache_dir, start=load_start, end=end))
+    if len(pairs) == 0:
+        return 0
+    missing = ~pd.Series([d.isoformat() for d in pairs['date']]).isin(logged).to_numpy()
+    if start is not None:
+        missing &= (pairs['date'] >= _as_date(start)).to_numpy()
+    return append_day(cache_dir, pairs[missing])
+
+
+if __name__ == '__main__':
+    cache_dir = os.environ.get('CACHE_DIR', 'data')
+    start = sys.argv[1] if len(sys.argv) > 1 else None
+    end = sys.argv[2] if len(sys.argv) > 2 else None
+    added = backfill(cache_dir, start=start, end=end)
+    print(f"Logged {added} new days to {log_dir(cache_dir)}")
+    summaries = read_summaries(cache_dir, start=start, end=end)
+    if len(summaries):
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(summaries.to_string(index=False))
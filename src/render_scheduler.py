@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+OUTPUT RENDER SCHEDULER
+Collects workbook render jobs (BUILD_TODAY_TOP20/TOP100, the full-data dumps
+and the three *_ENHANCED workbooks) and runs them together at the end of
+Step 3, so output wall-clock time is the slowest workbook rather than the
+sum of all of them.
+
+Each job is a top-level function plus already-prepared, picklable arguments
+(DataFrames, sheet models, plain dicts). All analysis that reads or writes
+state (streak cache, competitor history, revenue) happens in the submitting
+process; render jobs only turn prepared data into a file.
+
+    RENDER_WORKERS   processes used to render (default: one per job, capped
+                     at the CPU count); 1 renders in-process, in order.
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+def render_workers(job_count: int) -> int:
+    default = min(job_count, os.cpu_count() or 1)
+    try:
+        workers = int(os.environ.get('RENDER_WORKERS', default))
+    except ValueError:
+        workers = default
+    return max(1, min(workers, job_count))
+
+
+def _timed_call(func, args, kwargs):
+    """Run one job; returns (seconds, error text or None). Never raises."""
+    start = time.perf_counter()
+    try:
+        func(*args, **kwargs)
+        return time.perf_counter() - start, None
+    except Exception:
+        return time.perf_counter() - start, traceback.format_exc()
+
+
+# =============================================================================
+# SCHEDULER
+# =============================================================================
+
+class RenderScheduler:
+    """Queue of render jobs keyed by output path.
+
+    submit() only records the job; run() renders everything queued so far
+    and reports per-file timings. Paths whose job raised end up in .failed.
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers
+        self.jobs = []
+        self.timings = {}
+        self.failed = set()
+
+    def submit(self, path: str, func, *args, **kwargs) -> str:
+        self.jobs.append((path, func, args, kwargs))
+        return path
+
+    def run(self) -> dict:
+        """Render every queued job. Returns {path: seconds} for successful files."""
+        jobs, self.jobs = self.jobs, []
+        if not jobs:
+            return {}
+
+        workers = self.workers if self.workers is not None else render_workers(len(jobs))
+        workers = max(1, min(workers, len(jobs)))
+        start = time.perf_counter()
+
+        results = None
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_timed_call, func, args, kwargs)
+                               for _, func, args, kwargs in jobs]
+                    results = [f.result() for f in futures]
+            except Exception as e:
+                # Broken pool / unpicklable payload: fall back to in-process
+                print(f"  ⚠️ Render pool unavailable ({e}) - rendering sequentially")
+                workers = 1
+                results = None
+        if results is None:
+            results = [_timed_call(func, args, kwargs) for _, func, args, kwargs in jobs]
+
+        rendered = {}
+        for (path, _, _, _), (seconds, error) in zip(jobs, results):
+            name = os.path.basename(path)
+            if error is None:
+                rendered[path] = seconds
+                self.timings[path] = seconds
+                print(f"    ✅ {name}: {seconds:.2f}s")
+            else:
+                self.failed.add(path)
+                print(f"    ❌ {name}: failed after {seconds:.2f}s")
+                print(error)
+
+        elapsed = time.perf_counter() - start
+        print(f"  Rendered {len(rendered)}/{len(jobs)} files in {elapsed:.2f}s "
+              f"({workers} worker{'s' if workers != 1 else ''})")
+        return rendered
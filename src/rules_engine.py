@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+DECISION RULES ENGINE
+Every threshold the pipeline acts on lives in one declarative table below:
+tutorial triggers / urgency, BUILD_NOW, velocity action windows, variant
+allocation, stop-building rules and the micro-poller's entry / alert /
+priority / stop rules.
+
+A RuleSet is an ordered list of Rules; the first rule whose clauses all hold
+wins, otherwise the RuleSet default applies. Each clause is
+(field, op, value) with op one of >=, >, <=, <, ==, !=, in.
+
+The same table is compiled two ways:
+  RuleSet.apply(df)      pandas path: one boolean mask per rule, np.select
+                         picks the first match for every row at once
+  RuleSet.evaluate(row)  scalar path for the pandas-free micro-poller
+
+Emoji labels ('🚀 SPIKING', '🟠 6-12H', ...) are reduced to plain codes
+('SPIKING', '6-12H') once per distinct label and cached, so rules compare
+codes instead of re-stripping strings on every row.
+
+Output values may be templates such as 'Momentum {momentum_score:int}';
+supported specs are int, round1 and plain str.
+"""
+
+import operator
+import re
+from dataclasses import dataclass, field
+from string import Formatter
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # micro-poller environment
+    np = None
+    pd = None
+
+
+# =============================================================================
+# LABEL CODES
+# =============================================================================
+
+_EMOJI_PREFIX_RE = re.compile(r'^[^\x00-\x7F]+\s*')
+_CODE_CACHE = {}
+
+
+def label_code(label) -> str:
+    """'🟠 6-12H' -> '6-12H'. Empty string for None/NaN."""
+    if label is None or (isinstance(label, float) and label != label):
+        return ''
+    code = _CODE_CACHE.get(label)
+    if code is None:
+        code = _EMOJI_PREFIX_RE.sub('', str(label)).strip().upper()
+        _CODE_CACHE[label] = code
+    return code
+
+
+def label_codes(labels):
+    """Vectorized label_code(): strips each distinct label once."""
+    mapping = {label: label_code(label) for label in labels.dropna().unique()}
+    return labels.map(mapping).fillna('')
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+_OPS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    '==': operator.eq,
+    '!=': operator.ne,
+    'in': lambda value, options: value in options,
+}
+
+_FORMATS = {
+    '': str,
+    'int': lambda v: str(int(v)),
+    'round1': lambda v: str(round(float(v), 1)),
+}
+
+
+def _compile_template(value):
+    """Split 'Shares/h {shares_per_hour:round1}' into (literal, field, spec) parts.
+
+    Returns None for values that are not templates.
+    """
+    if not isinstance(value, str) or '{' not in value:
+        return None
+    parts = []
+    for literal, name, spec, _ in Formatter().parse(value):
+        if spec not in ('', None) and spec not in _FORMATS:
+            raise ValueError(f"Unknown template spec '{spec}' in {value!r}")
+        parts.append((literal, name, spec or ''))
+    return parts
+
+
+def _render(parts, row) -> str:
+    out = []
+    for literal, name, spec in parts:
+        out.append(literal)
+        if name is not None:
+            out.append(_FORMATS[spec](row[name]))
+    return ''.join(out)
+
+
+@dataclass
+class Rule:
+    """All clauses must hold; `then` maps output name -> value (or template)."""
+    when: list
+    then: dict
+
+
+@dataclass
+class RuleSet:
+    """Ordered first-match rule table.
+
+    default  output values when no rule matches (also fixes the output names)
+    fill     field -> value substituted for missing / None / NaN inputs
+    codes    derived field -> label field it is coded from (see label_code)
+    """
+    name: str
+    rules: list
+    default: dict
+    fill: dict = field(default_factory=dict)
+    codes: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        for rule in self.rules:
+            for fld, op, _ in rule.when:
+                if op not in _OPS:
+                    raise ValueError(f"{self.name}: unknown operator '{op}' on {fld}")
+            unknown = set(rule.then) - set(self.default)
+            if unknown:
+                raise ValueError(f"{self.name}: outputs {sorted(unknown)} missing from default")
+        self._scalar = [
+            (tuple((fld, _OPS[op], value) for fld, op, value in rule.when),
+             {key: (value, _compile_template(value)) for key, value in rule.then.items()})
+            for rule in self.rules
+        ]
+
+    # -------------------------------------------------------------------------
+    # Scalar path
+    # -------------------------------------------------------------------------
+
+    def _value(self, row, fld):
+        source = self.codes.get(fld)
+        if source is not None:
+            return label_code(row.get(source))
+        value = row.get(fld)
+        if value is None or (isinstance(value, float) and value != value):
+            return self.fill.get(fld)
+        return value
+
+    def evaluate(self, row) -> dict:
+        """First-match outputs for one dict / Series row."""
+        values = {}
+        for clauses, then in self._scalar:
+            matched = True
+            for fld, op, target in clauses:
+                if fld not in values:
+                    values[fld] = self._value(row, fld)
+                value = values[fld]
+                if value is None or not op(value, target):
+                    matched = False
+                    break
+            if matched:
+                out = dict(self.default)
+                for key, (value, parts) in then.items():
+                    out[key] = value if parts is None else _render(parts, _RowView(self, row, values))
+                return out
+        return dict(self.default)
+
+    # -------------------------------------------------------------------------
+    # Vectorized path
+    # -------------------------------------------------------------------------
+
+    def _column(self, df, fld):
+        source = self.codes.get(fld)
+        if source is not None:
+            if source not in df.columns:
+                return pd.Series('', index=df.index)
+            return label_codes(df[source])
+        if fld not in df.columns:
+            return pd.Series(self.fill.get(fld, np.nan), index=df.index)
+        col = df[fld]
+        if fld in self.fill:
+            col = col.fillna(self.fill[fld])
+        return col
+
+    def _mask(self, rule, df, columns):
+        mask = np.ones(len(df), dtype=bool)
+        for fld, op, value in rule.when:
+            if fld not in columns:
+                columns[fld] = self._column(df, fld)
+            col = columns[fld]
+            if op == 'in':
+                hit = col.isin(list(value))
+            else:
+                hit = _OPS[op](col, value)
+            mask &= hit.fillna(False).to_numpy(dtype=bool)
+        return mask
+
+    def apply(self, df):
+        """First-match outputs for every row of df, as a DataFrame on df.index."""
+        n = len(df)
+        columns = {}
+        if self.rules and n:
+            masks = [self._mask(rule, df, columns) for rule in self.rules]
+            choice = np.select(masks, np.arange(len(self.rules)), default=-1)
+        else:
+            choice = np.full(n, -1)
+
+        out = {}
+        for key, default in self.default.items():
+            values = np.empty(n, dtype=object)
+            values[:] = [default] * n
+            for idx, (_, then) in enumerate(self._scalar):
+                if key not in then:
+                    continue
+                hit = choice == idx
+                if not hit.any():
+                    continue
+                value, parts = then[key]
+                if parts is None:
+                    values[hit] = [value] * int(hit.sum())
+                else:
+                    names = list(dict.fromkeys(name for _, name, _ in parts if name))
+                    matched = df.loc[hit, names]
+                    values[hit] = [
+                        _render(parts, row)
+                        for row in matched.to_dict('records')
+                    ]
+            out[key] = values
+        return pd.DataFrame(out, index=df.index).infer_objects()
+
+
+class _RowView:
+    """Template lookup that prefers the already-resolved (filled) values."""
+
+    def __init__(self, ruleset, row, values):
+        self._ruleset = ruleset
+        self._row = row
+        self._values = values
+
+    def __getitem__(self, key):
+        if key in self._values:
+            return self._values[key]
+        return self._ruleset._value(self._row, key)
+
+
+# =============================================================================
+# RULE TABLES — DAILY PIPELINE
+# =============================================================================
+
+BUILD_NOW_RULES = RuleSet(
+    name='build_now',
+    rules=[
+        Rule(when=[('age_hours', '<=', 72), ('shares_per_hour', '>=', 5), ('views_per_hour', '>=', 1000)],
+             then={'BUILD_NOW': 'BUILD NOW'}),
+    ],
+    default={'BUILD_NOW': 'NO'},
+)
+
+_MAKE_NOW, _WATCH = '🔴 MAKE_NOW', '🟡 WATCH'
+_URGENT, _HIGH = '🔥 URGENT', '⚡ HIGH'
+
+TUTORIAL_TRIGGER_RULES = RuleSet(
+    name='tutorial_trigger',
+    rules=[
+        Rule(when=[('momentum_score', '>=', 3000)],
+             then={'TUTORIAL_TRIGGER': _MAKE_NOW, 'URGENCY': _URGENT,
+                   'trigger_reason': 'Momentum {momentum_score:int} ≥ 3,000'}),
+        Rule(when=[('shares_per_hour', '>=', 100)],
+             then={'TUTORIAL_TRIGGER': _MAKE_NOW, 'URGENCY': _URGENT,
+                   'trigger_reason': 'Shares/h {shares_per_hour:round1} ≥ 100'}),
+        Rule(when=[('status_code', '==', 'SPIKING'), ('momentum_score', '>=', 2000)],
+             then={'TUTORIAL_TRIGGER': _MAKE_NOW, 'URGENCY': _URGENT,
+                   'trigger_reason': 'SPIKING + Momentum {momentum_score:int}'}),
+        Rule(when=[('momentum_score', '>=', 2000)],
+             then={'TUTORIAL_TRIGGER': _MAKE_NOW, 'URGENCY': _HIGH,
+                   'trigger_reason': 'Momentum {momentum_score:int} ≥ 2,000'}),
+        Rule(when=[('shares_per_hour', '>=', 60)],
+             then={'TUTORIAL_TRIGGER': _MAKE_NOW, 'URGENCY': _HIGH,
+                   'trigger_reason': 'Shares/h {shares_per_hour:round1} ≥ 60'}),
+        Rule(when=[('status_code', '==', 'SPIKING'), ('momentum_score', '>=', 1500)],
+             then={'TUTORIAL_TRIGGER': _MAKE_NOW, 'URGENCY': _HIGH,
+                   'trigger_reason': 'SPIKING + Momentum {momentum_score:int}'}),
+        Rule(when=[('momentum_score', '>=', 1000)],
+             then={'TUTORIAL_TRIGGER': _WATCH, 'URGENCY': _WATCH,
+                   'trigger_reason': 'Momentum {momentum_score:int} ≥ 1,000'}),
+        Rule(when=[('shares_per_hour', '>=', 25)],
+             then={'TUTORIAL_TRIGGER': _WATCH, 'URGENCY': _WATCH,
+                   'trigger_reason': 'Shares/h {shares_per_hour:round1} ≥ 25'}),
+        Rule(when=[('status_code', '==', 'RISING'), ('momentum_score', '>=', 800)],
+             then={'TUTORIAL_TRIGGER': _WATCH, 'URGENCY': _WATCH,
+                   'trigger_reason': 'RISING + Momentum {momentum_score:int}'}),
+        Rule(when=[('BUILD_NOW', '==', 'BUILD NOW')],
+             then={'TUTORIAL_TRIGGER': _WATCH, 'URGENCY': _WATCH,
+                   'trigger_reason': 'BUILD_NOW active'}),
+    ],
+    default={'TUTORIAL_TRIGGER': 'NONE', 'URGENCY': '', 'trigger_reason': ''},
+    codes={'status_code': 'status'},
+)
+
+# has_velocity_data: a real yesterday snapshot exists and momentum moved
+ACTION_WINDOW_RULES = RuleSet(
+    name='action_window',
+    rules=[
+        # Too old - 72h window closing
+        Rule(when=[('age_hours', '>', 60)], then={'action_window': '⚠️ WINDOW CLOSING'}),
+        # Real velocity data
+        Rule(when=[('has_velocity_data', '==', True), ('velocity', '>=', 200), ('momentum_score', '>=', 1000)],
+             then={'action_window': '🔴 ACT NOW'}),
+        Rule(when=[('has_velocity_data', '==', True), ('velocity', '>=', 100), ('momentum_score', '>=', 500)],
+             then={'action_window': '🟠 6-12H'}),
+        Rule(when=[('has_velocity_data', '==', True), ('velocity', '>=', 50), ('predicted_24h', '>=', 2000)],
+             then={'action_window': '🟡 12-24H'}),
+        Rule(when=[('has_velocity_data', '==', True), ('velocity', '<=', 0), ('momentum_score', '>=', 2000)],
+             then={'action_window': '⚠️ PEAKED'}),
+        Rule(when=[('has_velocity_data', '==', True), ('velocity', '<=', 0)],
+             then={'action_window': '❌ TOO LATE'}),
+        Rule(when=[('has_velocity_data', '==', True)], then={'action_window': '🟢 MONITOR'}),
+        # No velocity data — classify on momentum + age alone
+        Rule(when=[('momentum_score', '>=', 3000), ('age_hours', '<=', 24)], then={'action_window': '🔴 ACT NOW'}),
+        Rule(when=[('momentum_score', '>=', 2000), ('age_hours', '<=', 36)], then={'action_window': '🟠 6-12H'}),
+        Rule(when=[('momentum_score', '>=', 1000), ('age_hours', '<=', 48)], then={'action_window': '🟡 12-24H'}),
+        Rule(when=[('momentum_score', '>=', 500)], then={'action_window': '🟢 MONITOR'}),
+    ],
+    default={'action_window': '❌ TOO LATE'},
+)
+
+_HARD_STOP_WINDOWS = ('PEAKED', 'TOO LATE', 'WINDOW CLOSING')
+_FALLING = ('DECLINING', 'CRASHING')
+
+RECOMMENDED_VARIANTS_RULES = RuleSet(
+    name='recommended_variants',
+    rules=[
+        # Hard stop zones
+        Rule(when=[('action_code', 'in', _HARD_STOP_WINDOWS)], then={'recommended_variants': 0}),
+        Rule(when=[('trajectory_code', 'in', _FALLING)], then={'recommended_variants': 0}),
+        Rule(when=[('age_hours', '>=', 72)], then={'recommended_variants': 0}),
+        # Last-chance tier (60-72h): exceptional only
+        Rule(when=[('age_hours', '>=', 60), ('action_code', 'in', ('ACT NOW', '6-12H')),
+                   ('trajectory_code', 'in', ('EXPLOSIVE', 'STRONG')), ('momentum_score', '>=', 5000)],
+             then={'recommended_variants': 1}),
+        Rule(when=[('age_hours', '>=', 60)], then={'recommended_variants': 0}),
+        # Normal allocation
+        Rule(when=[('action_code', '==', 'ACT NOW'), ('trajectory_code', '==', 'EXPLOSIVE'), ('age_hours', '<=', 24)],
+             then={'recommended_variants': 7}),
+        Rule(when=[('action_code', '==', 'ACT NOW'), ('trajectory_code', 'in', ('EXPLOSIVE', 'STRONG'))],
+             then={'recommended_variants': 5}),
+        Rule(when=[('action_code', '==', 'ACT NOW'), ('trajectory_code', '==', 'MODERATE')],
+             then={'recommended_variants': 3}),
+        Rule(when=[('action_code', '==', '6-12H'), ('trajectory_code', '==', 'EXPLOSIVE')],
+             then={'recommended_variants': 5}),
+        Rule(when=[('action_code', '==', '6-12H'), ('trajectory_code', 'in', ('STRONG', 'MODERATE'))],
+             then={'recommended_variants': 3}),
+        Rule(when=[('action_code', '==', '12-24H'), ('trajectory_code', '==', 'STRONG')],
+             then={'recommended_variants': 3}),
+        Rule(when=[('action_code', '==', '12-24H'), ('trajectory_code', '==', 'MODERATE')],
+             then={'recommended_variants': 2}),
+        Rule(when=[('action_code', '==', '12-24H'), ('trajectory_code', '==', 'FLAT')],
+             then={'recommended_variants': 1}),
+    ],
+    default={'recommended_variants': 0},
+    fill={'age_hours': 999999.0, 'momentum_score': 0.0},
+    codes={'action_code': 'action_window', 'trajectory_code': 'trajectory'},
+)
+
+STOP_BUILDING_RULES = RuleSet(
+    name='stop_building',
+    rules=[
+        Rule(when=[('trajectory_code', 'in', _FALLING)],
+             then={'stop_building': True, 'stop_reason': 'DECLINING_TRAJECTORY'}),
+        Rule(when=[('action_code', 'in', ('PEAKED', 'TOO LATE'))],
+             then={'stop_building': True, 'stop_reason': 'WINDOW_OVER'}),
+        Rule(when=[('age_hours', '>=', 72)],
+             then={'stop_building': True, 'stop_reason': 'AGE_OVER_72H'}),
+        Rule(when=[('velocity_nonpos_streak', '>=', 2)],
+             then={'stop_building': True, 'stop_reason': 'VELOCITY_NONPOS_2_RUNS'}),
+    ],
+    default={'stop_building': False, 'stop_reason': ''},
+    fill={'age_hours': 999999.0, 'velocity_nonpos_streak': 0},
+    codes={'action_code': 'action_window', 'trajectory_code': 'trajectory'},
+)
+
+
+# =============================================================================
+# RULE TABLES — MICRO-POLLER
+# =============================================================================
+
+# Entry criteria (to become a candidate)
+POLLER_ENTRY_RULES = RuleSet(
+    name='poller_entry',
+    rules=[
+        Rule(when=[('age_hours', '<=', 48), ('shares_per_hour', '>=', 6), ('views_per_hour', '>=', 150)],
+             then={'enter': True}),
+    ],
+    default={'enter': False},
+)
+
+# Alert criteria (triggers Discord notification); needs a previous check
+POLLER_ALERT_RULES = RuleSet(
+    name='poller_alert',
+    rules=[
+        Rule(when=[('age_hours', '<=', 36), ('shares_per_hour', '>=', 8), ('views_per_hour', '>=', 200),
+                   ('delta', '>=', 4)],
+             then={'alert': True}),
+    ],
+    default={'alert': False},
+)
+
+POLLER_STOP_RULES = RuleSet(
+    name='poller_stop',
+    rules=[
+        Rule(when=[('age_hours', '>', 60)], then={'stop': True, 'reason': 'age exceeded'}),
+        Rule(when=[('consecutive_negative_deltas', '>=', 2)], then={'stop': True, 'reason': 'declining'}),
+    ],
+    default={'stop': False, 'reason': ''},
+    fill={'consecutive_negative_deltas': 0},
+)
+
+# Discord colors: red / orange / yellow
+POLLER_PRIORITY_RULES = RuleSet(
+    name='poller_priority',
+    rules=[
+        Rule(when=[('momentum', '>=', 3000)], then={'priority': '🔥 URGENT', 'color': 16711680}),
+        Rule(when=[('shares_per_hour', '>=', 100)], then={'priority': '🔥 URGENT', 'color': 16711680}),
+        Rule(when=[('momentum', '>=', 2000)], then={'priority': '⚡ HIGH', 'color': 16744192}),
+        Rule(when=[('shares_per_hour', '>=', 60)], then={'priority': '⚡ HIGH', 'color': 16744192}),
+    ],
+    default={'priority': '🟡 WATCH', 'color': 16776960},
+)
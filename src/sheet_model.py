@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+SHEET MODEL + OUTPUT SINKS
+Table-shaped tabs (BUILD_TODAY sheets, OPPORTUNITY_NOW, COMPETITOR_VIEW,
+PREDICTION_LOG, DATA_FEED, PAYMENTS) are computed once per run into a
+SheetModel: a header, rows of plain values / Styled cells, and named
+style IDs from workbook_styles. Colours that follow a column's value
+(status, market, trigger, account) are CellRules: one conditional format
+per rule over the whole body instead of a fill stamped on every cell.
+Sinks then render the same models to any number of destinations:
+
+    xlsx     openpyxl write-only workbook (or fill_worksheet() into a tab
+             of a regular workbook next to layout-driven tabs)
+    csv      one zip with a CSV per sheet (.csv.zip)
+    html     static page, one table per sheet, styles as CSS classes
+    sheets   Google Sheets values batch (JSON) - the same rows
+             update_dashboard.py appends to the live dashboard
+
+    SHEET_EXPORT_SINKS   extra sinks written next to every model-based
+                         workbook, e.g. "csv,html" (default: none)
+
+Models hold only plain data so sink jobs can run in the render pool.
+"""
+
+import csv
+import html
+import io
+import json
+import os
+import zipfile
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.cell.cell import WriteOnlyCell
+from openpyxl.formatting.rule import Rule
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from workbook_styles import STYLE_SPECS, differential_style, styles_for
+
+
+# =============================================================================
+# MODEL
+# =============================================================================
+
+class Styled:
+    """A cell value with an optional named style ID and hyperlink target."""
+    __slots__ = ('value', 'style', 'link')
+
+    def __init__(self, value=None, style_id=None, link=None):
+        self.value = value
+        self.style = style_id
+        self.link = link
+
+
+@dataclass(frozen=True)
+class CellRule:
+    """Conditional style for the body rows of a sheet.
+
+    Rows whose `key` column holds one of `values` get style_id on `columns`
+    (a column letter or span, e.g. 'C' or 'A:J'); without a key every body
+    row does. Where rules overlap the earlier one wins.
+    """
+    style_id: str
+    columns: str
+    key: Optional[str] = None
+    values: tuple = ()
+
+    def span(self):
+        """(first, last) 1-based column indexes the rule styles."""
+        first, _, last = self.columns.partition(':')
+        return column_index_from_string(first), column_index_from_string(last or first)
+
+    def matches(self, row) -> bool:
+        if self.key is None:
+            return True
+        ci = column_index_from_string(self.key) - 1
+        return ci < len(row) and plain_value(row[ci]) in self.values
+
+    def formula(self, first_row: int) -> str:
+        """Excel condition, relative to the top-left cell of the range."""
+        if self.key is None:
+            return 'TRUE'
+        tests = [f'${self.key}{first_row}="{str(v).replace(chr(34), chr(34) * 2)}"' for v in self.values]
+        return tests[0] if len(tests) == 1 else f"OR({','.join(tests)})"
+
+
+@dataclass
+class SheetModel:
+    """One tab: optional header row, then rows of values or Styled cells.
+
+    note is written in A2 when there are no rows (e.g. "No revenue data").
+    rules are CellRules over the body rows, highest priority first.
+    """
+    name: str
+    header: Optional[List[str]] = None
+    rows: List[list] = field(default_factory=list)
+    header_style: Optional[str] = None
+    widths: Dict[str, float] = field(default_factory=dict)
+    freeze: Optional[str] = None
+    note: Optional[str] = None
+    note_style: Optional[str] = None
+    rules: List[CellRule] = field(default_factory=list)
+
+    def renamed(self, name: str, limit: int = None) -> 'SheetModel':
+        """Same content under another tab name, optionally only the first rows (shares row lists)."""
+        rows = self.rows if limit is None else self.rows[:limit]
+        return replace(self, name=name, rows=rows)
+
+
+def plain_value(value):
+    """Styled/numpy/NaN -> a plain JSON- and CSV-friendly value."""
+    if isinstance(value, Styled):
+        value = value.value
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return ''
+    return '' if value is None else value
+
+
+def sheet_values(model: SheetModel, header: bool = False) -> List[list]:
+    """Rows (optionally led by the header) as plain values."""
+    rows = [[plain_value(v) for v in row] for row in model.rows]
+    if header and model.header:
+        rows.insert(0, list(model.header))
+    return rows
+
+
+# =============================================================================
+# XLSX SINKS
+# =============================================================================
+
+def add_rules(ws, model: SheetModel):
+    """Register the model's CellRules as conditional formats on ws's body rows."""
+    if not model.rules or not model.rows:
+        return
+    first_row = 2 if model.header else 1
+    last_row = first_row + len(model.rows) - 1
+    for rule in model.rules:
+        first, last = rule.span()
+        cells = f"{get_column_letter(first)}{first_row}:{get_column_letter(last)}{last_row}"
+        ws.conditional_formatting.add(cells, Rule(type='expression', formula=[rule.formula(first_row)],
+                                                  dxf=differential_style(rule.style_id)))
+
+
+def fill_worksheet(ws, model: SheetModel):
+    """Render a model into an (empty) worksheet of a regular workbook."""
+    st = styles_for(ws)
+    row_idx = 1
+    if model.header:
+        for ci, h in enumerate(model.header, 1):
+            c = ws.cell(row=1, column=ci, value=h)
+            if model.header_style:
+                st.apply(c, model.header_style)
+        row_idx = 2
+    for ri, row in enumerate(model.rows, row_idx):
+        for ci, v in enumerate(row, 1):
+            if isinstance(v, Styled):
+                c = ws.cell(row=ri, column=ci, value=v.value)
+                if v.style is not None:
+                    st.apply(c, v.style)
+                if v.link:
+                    c.hyperlink = v.link
+            elif v is not None:
+                ws.cell(row=ri, column=ci, value=v)
+    if not model.rows and model.note:
+        c = ws.cell(row=row_idx, column=1, value=model.note)
+        if model.note_style:
+            st.apply(c, model.note_style)
+    add_rules(ws, model)
+    if model.freeze:
+        ws.freeze_panes = model.freeze
+    for col, width in model.widths.items():
+        ws.column_dimensions[col].width = width
+
+
+def append_rows(ws, rows):
+    """Append rows to a write-only worksheet; Styled entries become WriteOnlyCells."""
+    st = styles_for(ws)
+    for row in rows:
+        out = []
+        for v in row:
+            if isinstance(v, Styled):
+                cell = WriteOnlyCell(ws, value=v.value)
+                if v.style is not None:
+                    st.apply(cell, v.style)
+                if v.link:
+                    cell.hyperlink = v.link
+                out.append(cell)
+            else:
+                out.append(v)
+        ws.append(out)
+
+
+def write_xlsx(models: List[SheetModel], path: str) -> str:
+    """Stream every model into its own tab of a write-only workbook."""
+    wb = Workbook(write_only=True)
+    for model in models:
+        ws = wb.create_sheet(model.name)
+        if model.freeze:
+            ws.freeze_panes = model.freeze
+        for col, width in model.widths.items():
+            ws.column_dimensions[col].width = width
+        if model.header:
+            append_rows(ws, [[Styled(h, model.header_style) for h in model.header]])
+        append_rows(ws, model.rows)
+        if not model.rows and model.note:
+            append_rows(ws, [[Styled(model.note, model.note_style)]])
+        add_rules(ws, model)
+    wb.save(path)
+    return path
+
+
+# =============================================================================
+# TEXT SINKS
+# =============================================================================
+
+def write_csv_zip(models: List[SheetModel], path: str) -> str:
+    """One <SHEET>.csv per model inside a single zip archive."""
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for model in models:
+            buf = io.StringIO()
+            csv.writer(buf).writerows(sheet_values(model, header=True))
+            zf.writestr(f"{model.name}.csv", buf.getvalue())
+    return path
+
+
+def _css_class(style_id):
+    return 's-' + style_id.replace('.', '-')
+
+
+def _css_rule(style_id):
+    spec = STYLE_SPECS.get(style_id)
+    if spec is None:
+        return ''
+    props = []
+    fill, font = spec['fill'], spec['font']
+    if fill is not None and fill.fill_type == 'solid' and fill.fgColor.rgb:
+        props.append(f"background:#{str(fill.fgColor.rgb)[-6:]}")
+    if font is not None:
+        if font.b:
+            props.append('font-weight:bold')
+        if font.i:
+            props.append('font-style:italic')
+        if font.color is not None and isinstance(font.color.rgb, str):
+            props.append(f"color:#{font.color.rgb[-6:]}")
+        if font.sz:
+            props.append(f"font-size:{font.sz}pt")
+    return f".{_css_class(style_id)}{{{';'.join(props)}}}" if props else ''
+
+
+def _html_cell(v, tag='td', rule_style=None):
+    style_ids = [s for s in (v.style if isinstance(v, Styled) else None, rule_style) if s]
+    text = html.escape(str(plain_value(v)))
+    link = v.link if isinstance(v, Styled) else None
+    if link:
+        text = f'<a href="{html.escape(link, quote=True)}">{text}</a>'
+    cls = f' class="{" ".join(_css_class(s) for s in style_ids)}"' if style_ids else ''
+    return f"<{tag}{cls}>{text}</{tag}>"
+
+
+def _rule_styles(rules, row) -> dict:
+    """{column index: style_id} from the first CellRule covering each cell."""
+    styles = {}
+    for rule in rules:
+        if rule.matches(row):
+            first, last = rule.span()
+            for ci in range(first - 1, last):
+                styles.setdefault(ci, rule.style_id)
+    return styles
+
+
+def write_html(models: List[SheetModel], path: str) -> str:
+    """Static single-page report: one <table> per model."""
+    title = os.path.basename(path).split('.')[0]
+    used, rule_used = set(), set()
+    body = []
+    for model in models:
+        body.append(f'<h2 id="{html.escape(model.name)}">{html.escape(model.name)}</h2>')
+        body.append('<table>')
+        if model.header:
+            if model.header_style:
+                used.add(model.header_style)
+            body.append('<tr>' + ''.join(_html_cell(Styled(h, model.header_style), 'th')
+                                         for h in model.header) + '</tr>')
+        for row in model.rows:
+            used.update(v.style for v in row if isinstance(v, Styled) and v.style)
+            styles = _rule_styles(model.rules, row)
+            rule_used.update(styles.values())
+            body.append('<tr>' + ''.join(_html_cell(v, rule_style=styles.get(ci))
+                                         for ci, v in enumerate(row)) + '</tr>')
+        if not model.rows and model.note:
+            body.append(f'<tr><td>{html.escape(model.note)}</td></tr>')
+        body.append('</table>')
+
+    # Rule classes come last so they win over a cell's own style, as in Excel
+    css = '\n'.join(filter(None, [_css_rule(s) for s in sorted(used - rule_used)]
+                            + [_css_rule(s) for s in sorted(rule_used)]))
+    nav = ' | '.join(f'<a href="#{html.escape(m.name)}">{html.escape(m.name)}</a>' for m in models)
+    page = (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+        f'<title>{html.escape(title)}</title>\n<style>\n'
+        'body{font-family:Calibri,Arial,sans-serif;font-size:11pt}\n'
+        'table{border-collapse:collapse;margin-bottom:2em}\n'
+        'th,td{border:1px solid #ccc;padding:2px 6px;white-space:nowrap}\n'
+        f'{css}\n</style></head><body>\n<h1>{html.escape(title)}</h1>\n<p>{nav}</p>\n'
+        + '\n'.join(body) + '\n</body></html>\n'
+    )
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return path
+
+
+def sheets_batch(models: List[SheetModel]) -> List[dict]:
+    """Google Sheets values batch: one {'range', 'values'} entry per tab."""
+    return [{'range': f"'{m.name}'!A1", 'values': sheet_values(m, header=True)} for m in models]
+
+
+def write_sheets_json(models: List[SheetModel], path: str) -> str:
+    """Body for spreadsheets.values.batchUpdate (valueInputOption USER_ENTERED)."""
+    with open(path, 'w') as f:
+        json.dump({'valueInputOption': 'USER_ENTERED', 'data': sheets_batch(models)}, f, default=str)
+    return path
+
+
+# =============================================================================
+# SINK REGISTRY
+# =============================================================================
+
+SINKS = {
+    'xlsx': write_xlsx,
+    'csv': write_csv_zip,
+    'html': write_html,
+    'sheets': write_sheets_json,
+}
+
+SINK_EXTENSIONS = {
+    'xlsx': '.xlsx',
+    'csv': '.csv.zip',
+    'html': '.html',
+    'sheets': '.sheets.json',
+}
+
+
+def export_sinks() -> List[str]:
+    """Extra sinks from SHEET_EXPORT_SINKS (unknown names are ignored)."""
+    names = os.environ.get('SHEET_EXPORT_SINKS', '')
+    return [n for n in (s.strip().lower() for s in names.split(',')) if n in SINKS and n != 'xlsx']
+
+
+def export_models(models: List[SheetModel], base_path: str, sinks: List[str] = None, scheduler=None) -> List[str]:
+    """Render models through each sink to base_path + the sink's extension.
+
+    With a RenderScheduler every sink is its own queued job (so they run in
+    parallel); otherwise they are written here in order. Returns the paths.
+    """
+    sinks = export_sinks() if sinks is None else sinks
+    paths = []
+    for sink in sinks:
+        path = base_path + SINK_EXTENSIONS[sink]
+        if scheduler is not None:
+            scheduler.submit(path, SINKS[sink], models, path)
+        else:
+            SINKS[sink](models, path)
+        paths.append(path)
+    return paths
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+DATED SNAPSHOT STORE
+Keeps one compact columnar snapshot per market per day so velocity and
+acceleration can look back more than one run:
+
+    {CACHE_DIR}/snapshots/us_2026-02-20.npz
+    {CACHE_DIR}/snapshots/uk_2026-02-20.npz
+
+Each file is a compressed .npz holding fixed-dtype arrays (URL strings plus
+float64 counts) and the capture time, so loading is a single binary read with
+no JSON parsing and no pickles. Snapshots older than SNAPSHOT_RETENTION_DAYS
+(default 14) are pruned on every save.
+
+When the frame being saved carries the day's velocity predictions
+(predicted_24h, velocity_points, action_window) they are stored alongside,
+so backtest.py can score each day's predictions against the next day's
+momentum. They are only returned when asked for (predictions=True).
+"""
+
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SNAPSHOT_SUBDIR = 'snapshots'
+SNAPSHOT_COLUMNS = ['shareCount', 'diggCount', 'playCount', 'momentum_score']
+PREDICTION_COLUMNS = ['predicted_24h', 'velocity_points']
+PREDICTION_LABELS = ['action_window']
+DEFAULT_RETENTION_DAYS = 14
+
+_FILE_RE = re.compile(r'^(?P<market>[a-z]+)_(?P<day>\d{4}-\d{2}-\d{2})\.npz$')
+
+
+def snapshot_dir(cache_dir: str) -> str:
+    return os.path.join(cache_dir, SNAPSHOT_SUBDIR)
+
+
+def snapshot_path(cache_dir: str, market: str, day: date) -> str:
+    return os.path.join(snapshot_dir(cache_dir), f"{market}_{day.isoformat()}.npz")
+
+
+def retention_days() -> int:
+    try:
+        return int(os.environ.get('SNAPSHOT_RETENTION_DAYS', DEFAULT_RETENTION_DAYS))
+    except ValueError:
+        return DEFAULT_RETENTION_DAYS
+
+
+def _as_date(day) -> date:
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return date.fromisoformat(str(day))
+
+
+# =============================================================================
+# WRITE
+# =============================================================================
+
+def save_snapshot(df: pd.DataFrame, market: str, cache_dir: str, captured_at: datetime = None) -> str:
+    """Write today's snapshot for one market and return its path.
+
+    Missing count columns are stored as 0; a second save on the same UTC day
+    replaces that day's file. Prediction columns are stored when df has all
+    of them.
+    """
+    if captured_at is None:
+        captured_at = datetime.now(timezone.utc)
+    os.makedirs(snapshot_dir(cache_dir), exist_ok=True)
+
+    if len(df) > 0 and 'webVideoUrl' in df.columns:
+        has_url = df['webVideoUrl'].notna().to_numpy()
+        frame = df.reindex(columns=['webVideoUrl'] + SNAPSHOT_COLUMNS, fill_value=0)[has_url]
+        urls = frame['webVideoUrl'].astype(str).to_numpy(dtype=str)
+        arrays = {
+            col: pd.to_numeric(frame[col], errors='coerce').fillna(0).to_numpy(dtype='float64')
+            for col in SNAPSHOT_COLUMNS
+        }
+        if all(col in df.columns for col in PREDICTION_COLUMNS + PREDICTION_LABELS):
+            kept = df[has_url]
+            for col in PREDICTION_COLUMNS:
+                arrays[col] = pd.to_numeric(kept[col], errors='coerce').to_numpy(dtype='float64')
+            for col in PREDICTION_LABELS:
+                arrays[col] = kept[col].fillna('').astype(str).to_numpy(dtype=str)
+    else:
+        urls = np.array([], dtype=str)
+        arrays = {col: np.array([], dtype='float64') for col in SNAPSHOT_COLUMNS}
+
+    path = snapshot_path(cache_dir, market, captured_at.date())
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            webVideoUrl=urls,
+            captured_at=np.array(captured_at.isoformat()),
+            **arrays,
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def prune_snapshots(cache_dir: str, keep_days: int = None, today: date = None) -> int:
+    """Delete snapshots older than keep_days. Returns how many were removed."""
+    keep_days = retention_days() if keep_days is None else keep_days
+    if keep_days <= 0:
+        return 0
+    today = _as_date(today) if today is not None else datetime.now(timezone.utc).date()
+    cutoff = today - timedelta(days=keep_days)
+    removed = 0
+    for market, day in _scan(cache_dir):
+        if day < cutoff:
+            os.remove(snapshot_path(cache_dir, market, day))
+            removed += 1
+    return removed
+
+
+# =============================================================================
+# READ
+# =============================================================================
+
+def _scan(cache_dir: str):
+    path = snapshot_dir(cache_dir)
+    if not os.path.isdir(path):
+        return []
+    found = []
+    for name in os.listdir(path):
+        m = _FILE_RE.match(name)
+        if m:
+            found.append((m.group('market'), date.fromisoformat(m.group('day'))))
+    return found
+
+
+def list_snapshot_dates(market: str, cache_dir: str) -> list:
+    """Dates with a snapshot for this market, oldest first."""
+    return sorted(day for m, day in _scan(cache_dir) if m == market)
+
+
+def load_snapshot(market: str, day, cache_dir: str, predictions: bool = False):
+    """Return the snapshot frame for one market and date, or None if absent.
+
+    Columns: webVideoUrl, shareCount, diggCount, playCount, momentum_score,
+    captured_at (ISO string, same on every row). With predictions=True also
+    predicted_24h, velocity_points and action_window (NaN / '' for
+    snapshots saved without them).
+    """
+    path = snapshot_path(cache_dir, market, _as_date(day))
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        frame = pd.DataFrame({col: data[col] for col in ['webVideoUrl'] + SNAPSHOT_COLUMNS})
+        frame['captured_at'] = str(data['captured_at'])
+        if predictions:
+            for col in PREDICTION_COLUMNS:
+                frame[col] = data[col] if col in data.files else np.nan
+            for col in PREDICTION_LABELS:
+                frame[col] = data[col] if col in data.files else ''
+    return frame
+
+
+def snapshot_dates_before(market: str, cache_dir: str, before=None, k: int = 1) -> list:
+    """The k most recent snapshot dates strictly before `before` (default: today UTC), newest first."""
+    before = _as_date(before) if before is not None else datetime.now(timezone.utc).date()
+    dates = [d for d in list_snapshot_dates(market, cache_dir) if d < before]
+    return dates[::-1][:k]
+
+
+def load_recent_snapshots(market: str, cache_dir: str, k: int = 2, before=None) -> list:
+    """Load the k most recent snapshots before `before` as [(date, frame)], newest first."""
+    out = []
+    for day in snapshot_dates_before(market, cache_dir, before=before, k=k):
+        frame = load_snapshot(market, day, cache_dir)
+        if frame is not None:
+            out.append((day, frame))
+    return out
+
+
+def load_history(market: str, cache_dir: str, k: int = 2, before=None) -> pd.DataFrame:
+    """The last k snapshots stacked into one long frame with a snapshot_date column.
+
+    Lets callers merge several days against today in a single pass.
+    """
+    frames = []
+    for day, frame in load_recent_snapshots(market, cache_dir, k=k, before=before):
+        frame['snapshot_date'] = day
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['webVideoUrl'] + SNAPSHOT_COLUMNS + ['captured_at', 'snapshot_date'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_range(market: str, cache_dir: str, start=None, end=None, predictions: bool = False) -> pd.DataFrame:
+    """Every snapshot of a market dated start..end (inclusive, None = open) as one long frame.
+
+    Same columns as load_history; predictions as in load_snapshot.
+    """
+    start = _as_date(start) if start is not None else date.min
+    end = _as_date(end) if end is not None else date.max
+    frames = []
+    for day in list_snapshot_dates(market, cache_dir):
+        if start <= day <= end:
+            frame = load_snapshot(market, day, cache_dir, predictions=predictions)
+            if frame is not None:
+                frame['snapshot_date'] = day
+                frames.append(frame)
+    if not frames:
+        extra = PREDICTION_COLUMNS + PREDICTION_LABELS if predictions else []
+        return pd.DataFrame(columns=['webVideoUrl'] + SNAPSHOT_COLUMNS + ['captured_at'] + extra + ['snapshot_date'])
+    return pd.concat(frames, ignore_index=True)
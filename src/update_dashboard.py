@@ -272,7 +272,15 @@ def seed_historical_revenue(sheet):
     return len(rows)
 
 
-def update_opportunity_now(sheet, opportunity_data):
+def _append_sheet_rows(ws, tab_name, rows, verb='appended'):
+    """Append rows prepared by the pipeline (payload['sheet_rows'])."""
+    if rows:
+        ws.append_rows(rows, value_input_option='USER_ENTERED')
+    print(f'  {tab_name}: {len(rows)} rows {verb}')
+    return len(rows)
+
+
+def update_opportunity_now(sheet, opportunity_data, sheet_rows=None):
     ws = safe_get_worksheet(sheet, 'OPPORTUNITY_NOW')
     if ws is None:
         return 0
@@ -281,6 +289,9 @@ def update_opportunity_now(sheet, opportunity_data):
             ws.delete_rows(2, ws.row_count)
         except Exception:
             pass
+    if sheet_rows is not None:
+        # Rows exactly as rendered in the combined enhanced workbook
+        return _append_sheet_rows(ws, 'OPPORTUNITY_NOW', sheet_rows, 'written')
     if not opportunity_data:
         return 0
     rows = []
@@ -306,10 +317,12 @@ def update_opportunity_now(sheet, opportunity_data):
     return len(rows)
 
 
-def append_competitor_view(sheet, competitor_data, date_str):
+def append_competitor_view(sheet, competitor_data, date_str, sheet_rows=None):
     ws = safe_get_worksheet(sheet, 'COMPETITOR_VIEW')
     if ws is None:
         return 0
+    if sheet_rows is not None:
+        return _append_sheet_rows(ws, 'COMPETITOR_VIEW', sheet_rows)
     rows = []
     for gap in competitor_data:
         rows.append([
@@ -358,10 +371,12 @@ def append_prediction_log(sheet, model_summary, date_str):
     return 1
 
 
-def append_data_feed(sheet, my_performance_data, date_str):
+def append_data_feed(sheet, my_performance_data, date_str, sheet_rows=None):
     ws = safe_get_worksheet(sheet, 'DATA_FEED')
     if ws is None:
         return 0
+    if sheet_rows is not None:
+        return _append_sheet_rows(ws, 'DATA_FEED', sheet_rows)
     rows = []
     for item in my_performance_data:
         rows.append([
@@ -486,10 +501,16 @@ def main():
         print(f'ERROR: {payload_path} not found.')
         return
 
-    update_opportunity_now(sheet, payload.get('opportunity_matrix', []))
-    append_competitor_view(sheet, payload.get('competitor_gaps', []), today)
+    # Newer payloads carry the combined enhanced workbook's rendered rows;
+    # older payloads fall back to deriving rows from the raw lists
+    sheet_rows = payload.get('sheet_rows', {})
+    update_opportunity_now(sheet, payload.get('opportunity_matrix', []),
+                           sheet_rows=sheet_rows.get('OPPORTUNITY_NOW'))
+    append_competitor_view(sheet, payload.get('competitor_gaps', []), today,
+                           sheet_rows=sheet_rows.get('COMPETITOR_VIEW'))
     append_prediction_log(sheet, payload.get('model_summary', {}), today)
-    append_data_feed(sheet, payload.get('my_performance', []), today)
+    append_data_feed(sheet, payload.get('my_performance', []), today,
+                     sheet_rows=sheet_rows.get('DATA_FEED'))
     update_seasonal_alerts(sheet, payload.get('seasonal_alerts', []))
     update_revenue_tracker_metadata(sheet, payload.get('new_templates', []))
 
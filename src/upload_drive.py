@@ -113,6 +113,10 @@ def upload_file(service, filepath, folder_id):
         '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
         '.txt': 'text/plain',
         '.json': 'application/json',
+        '.gz': 'application/gzip',
+        '.parquet': 'application/vnd.apache.parquet',
+        '.zip': 'application/zip',
+        '.html': 'text/html',
     }
     ext = os.path.splitext(filename)[1]
     mime = mime_map.get(ext, 'application/octet-stream')
@@ -157,12 +161,12 @@ def main():
     output_dir = os.environ.get('OUTPUT_DIR', 'output')
 
     patterns = [
-        f'{output_dir}/BUILD_TODAY_TOP20_{today}.xlsx',
-        f'{output_dir}/BUILD_TODAY_TOP100_{today}.xlsx',
-        f'{output_dir}/TikTok_Trend_System_US_{today}.xlsx',
-        f'{output_dir}/TikTok_Trend_System_UK_{today}.xlsx',
+        f'{output_dir}/BUILD_TODAY_TOP20_{today}.*',
+        f'{output_dir}/BUILD_TODAY_TOP100_{today}.*',
+        f'{output_dir}/TikTok_Trend_System_US_{today}.*',
+        f'{output_dir}/TikTok_Trend_System_UK_{today}.*',
         f'{output_dir}/SUMMARY_REPORT_{today}.txt',
-        f'{output_dir}/BUILD_TODAY_*_ENHANCED_{today}.xlsx',
+        f'{output_dir}/BUILD_TODAY_*_ENHANCED_{today}.*',
     ]
 
     files_uploaded = 0
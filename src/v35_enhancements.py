@@ -10,16 +10,25 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.formatting.rule import ColorScaleRule, FormulaRule
 import json
 import os
-import re as _re
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
+import backtest
+import dashboard_store
+import prediction_log
+import velocity_engine
+from rules_engine import (ACTION_WINDOW_RULES, RECOMMENDED_VARIANTS_RULES,
+                          STOP_BUILDING_RULES, TUTORIAL_TRIGGER_RULES)
+from sheet_model import CellRule, SheetModel, Styled, export_models, fill_worksheet
+from workbook_styles import (BOLD_FONT, LINK_FONT, MONEY_FORMAT, THIN_BORDER, WHITE_BOLD_FONT,
+                             register_styles, solid, style, styles_for)
+
 
 def _sanitize_cell(value):
     """Sanitize a value before writing to an Excel cell.
@@ -133,13 +142,6 @@ SEED_REVENUE_DATA = [
 
 VARIANT_CACHE_DEFAULT_TTL = 7  # days
 
-def _strip_emoji(s: str) -> str:
-    """Strip leading emoji and whitespace from action_window/trajectory values."""
-    if not s:
-        return ""
-    return _re.sub(r'^[^\x00-\x7F]+\s*', '', str(s)).strip()
-
-
 def _as_float_vel(x) -> Optional[float]:
     """Robust float parsing for '+8,747/day', '32.9h', 8747, etc."""
     if x is None:
@@ -160,60 +162,17 @@ def _as_float_vel(x) -> Optional[float]:
 
 def calc_recommended_variants(aw: str, tr: str, age: Optional[float], cur: Optional[float]) -> int:
     """Calculate how many template variants to build (0/1/2/3/5/7)."""
-    awu = _strip_emoji(aw).upper()
-    tru = _strip_emoji(tr).upper()
-    agev = age if age is not None else 999999.0
-    curv = cur if cur is not None else 0.0
-
-    # Hard stop zones
-    if awu in ("PEAKED", "TOO LATE", "WINDOW CLOSING"):
-        return 0
-    if tru in ("DECLINING", "CRASHING"):
-        return 0
-    if agev >= 72:
-        return 0
-
-    # Last-chance tier (60-72h): exceptional only
-    if 60 <= agev < 72:
-        if awu in ("ACT NOW", "6-12H") and tru in ("EXPLOSIVE", "STRONG") and curv >= 5000:
-            return 1
-        return 0
-
-    # Normal allocation
-    if awu == "ACT NOW" and tru == "EXPLOSIVE" and agev <= 24:
-        return 7
-    if awu == "ACT NOW" and tru in ("EXPLOSIVE", "STRONG"):
-        return 5
-    if awu == "ACT NOW" and tru == "MODERATE":
-        return 3
-    if awu == "6-12H" and tru == "EXPLOSIVE":
-        return 5
-    if awu == "6-12H" and tru in ("STRONG", "MODERATE"):
-        return 3
-    if awu == "12-24H" and tru == "STRONG":
-        return 3
-    if awu == "12-24H" and tru == "MODERATE":
-        return 2
-    if awu == "12-24H" and tru == "FLAT":
-        return 1
-    return 0
+    return RECOMMENDED_VARIANTS_RULES.evaluate({
+        'action_window': aw, 'trajectory': tr, 'age_hours': age, 'momentum_score': cur,
+    })['recommended_variants']
 
 
 def calc_stop_building(aw: str, tr: str, age: Optional[float], streak: int) -> Tuple[bool, str]:
     """Determine if building should stop and why."""
-    awu = _strip_emoji(aw).upper()
-    tru = _strip_emoji(tr).upper()
-    agev = age if age is not None else 999999.0
-
-    if tru in ("DECLINING", "CRASHING"):
-        return True, "DECLINING_TRAJECTORY"
-    if awu in ("PEAKED", "TOO LATE"):
-        return True, "WINDOW_OVER"
-    if agev >= 72:
-        return True, "AGE_OVER_72H"
-    if streak >= 2:
-        return True, "VELOCITY_NONPOS_2_RUNS"
-    return False, ""
+    out = STOP_BUILDING_RULES.evaluate({
+        'action_window': aw, 'trajectory': tr, 'age_hours': age, 'velocity_nonpos_streak': streak,
+    })
+    return out['stop_building'], out['stop_reason']
 
 
 def load_streak_cache(path: str) -> Dict:
@@ -226,7 +185,10 @@ def load_streak_cache(path: str) -> Dict:
         out = {}
         for url, obj in raw.items():
             if isinstance(obj, dict):
-                out[str(url)] = {"streak": int(obj.get("streak", 0) or 0), "last_seen": obj.get("last_seen")}
+                entry = {"streak": int(obj.get("streak", 0) or 0), "last_seen": obj.get("last_seen")}
+                if obj.get("base") is not None:
+                    entry["base"] = int(obj["base"])
+                out[str(url)] = entry
             else:
                 out[str(url)] = {"streak": int(obj) if str(obj).isdigit() else 0, "last_seen": None}
         return out
@@ -263,6 +225,76 @@ def save_streak_cache(path: str, cache: dict) -> None:
         json.dump(cache, f, indent=2, sort_keys=True)
 
 
+class StreakLedger:
+    """Per-run view of the velocity streak cache, keyed by URL.
+
+    Loaded (and pruned) once per run, advanced once with update() in a
+    single vectorized merge, read by every workbook via streaks_for() and
+    written once with commit(). Each entry keeps the streak it was advanced
+    from ('base'), so a second run on the same day recomputes today's
+    streak from it instead of counting the day twice.
+    """
+
+    COLUMNS = ['streak', 'base', 'last_seen']
+
+    def __init__(self, path: str = None, entries: pd.DataFrame = None, today: str = None):
+        self.path = path
+        self.today = today or datetime.now().strftime("%Y-%m-%d")
+        if entries is None:
+            entries = pd.DataFrame(columns=self.COLUMNS, index=pd.Index([], name='webVideoUrl'))
+        self.entries = entries
+
+    @classmethod
+    def load(cls, path: str, ttl_days: int = VARIANT_CACHE_DEFAULT_TTL, today: str = None) -> 'StreakLedger':
+        cache = prune_streak_cache(load_streak_cache(path or ''), ttl_days)
+        entries = pd.DataFrame({
+            'streak': np.fromiter((obj['streak'] for obj in cache.values()), dtype='int64', count=len(cache)),
+            'base': [obj.get('base') for obj in cache.values()],
+            'last_seen': [obj.get('last_seen') for obj in cache.values()],
+        }, index=pd.Index(list(cache.keys()), name='webVideoUrl', dtype=object))
+        return cls(path, entries, today)
+
+    def update(self, urls, velocity) -> None:
+        """Advance the streaks of today's URLs from their velocity.
+
+        velocity <= 0 extends a streak, > 0 resets it, unknown holds it.
+        """
+        frame = pd.DataFrame({
+            'url': pd.Series(urls, dtype=object).astype(str).to_numpy(),
+            'vel': pd.to_numeric(pd.Series(velocity), errors='coerce').to_numpy(dtype='float64'),
+        })
+        frame = frame[frame['url'] != ''].drop_duplicates(subset='url', keep='last')
+        known = self.entries.reindex(frame['url'].to_numpy())
+        rerun = (known['last_seen'] == self.today).to_numpy() & known['base'].notna().to_numpy()
+        prev = np.where(rerun, pd.to_numeric(known['base'], errors='coerce').to_numpy(),
+                        known['streak'].fillna(0).to_numpy(dtype='float64'))
+        prev = np.nan_to_num(prev).astype('int64')
+
+        vel = frame['vel'].to_numpy()
+        streak = np.where(vel <= 0, prev + 1, np.where(vel > 0, 0, prev))
+
+        updated = pd.DataFrame({'streak': streak, 'base': prev, 'last_seen': self.today},
+                               index=pd.Index(frame['url'].to_numpy(), name='webVideoUrl', dtype=object))
+        rest = self.entries[~self.entries.index.isin(updated.index)]
+        self.entries = pd.concat([rest, updated]) if len(rest) else updated
+
+    def streaks_for(self, urls) -> np.ndarray:
+        """Current streak per URL (0 for URLs not in the ledger)."""
+        keys = pd.Series(urls, dtype=object).astype(str).to_numpy()
+        return self.entries['streak'].reindex(keys).fillna(0).to_numpy(dtype='int64')
+
+    def commit(self) -> None:
+        """Write the ledger back to the streak cache (once per run)."""
+        cache = {}
+        for url, streak, base, last_seen in zip(self.entries.index, self.entries['streak'],
+                                                self.entries['base'], self.entries['last_seen']):
+            entry = {"streak": int(streak), "last_seen": last_seen}
+            if pd.notna(base):
+                entry["base"] = int(base)
+            cache[url] = entry
+        save_streak_cache(self.path or '', cache)
+
+
 # =============================================================================
 # VELOCITY PREDICTION ENGINE
 # =============================================================================
@@ -285,13 +317,16 @@ class VelocityPrediction:
 def calculate_velocity_predictions(
     df_today: pd.DataFrame,
     df_yesterday: pd.DataFrame = None,
-    df_2days_ago: pd.DataFrame = None
+    df_2days_ago: pd.DataFrame = None,
+    cache_dir: str = None
 ) -> pd.DataFrame:
     """
     Calculate velocity-based predictions for all trends.
     
-    Uses up to 3 days of data to calculate velocity and acceleration.
-    Falls back gracefully when historical data is missing.
+    Velocity and acceleration are least-squares fits (velocity_engine.py)
+    over today, the yesterday / 2-days frames and, with a cache_dir, every
+    dated snapshot and micro-poll check of the URL. Falls back gracefully
+    when historical data is missing (velocity 0, LOW confidence).
     """
     df = df_today.copy()
     
@@ -320,127 +355,72 @@ def calculate_velocity_predictions(
     else:
         df['momentum_2days'] = np.nan
     
-    # Calculate velocity (change per day)
-    df['velocity'] = df['momentum_score'] - df['momentum_yesterday'].fillna(df['momentum_score'])
-    
-    # Calculate acceleration (change in velocity)
-    if df_yesterday is not None and df_2days_ago is not None:
-        velocity_yesterday = df['momentum_yesterday'] - df['momentum_2days']
-        df['acceleration'] = df['velocity'] - velocity_yesterday.fillna(0)
-    else:
-        df['acceleration'] = 0
+    # Fit velocity (change per day) and acceleration (change in velocity per
+    # day) over every observation of each URL
+    observations = velocity_engine.collect_observations(
+        df, frames=[f for f in (df_yesterday, df_2days_ago) if f is not None], cache_dir=cache_dir
+    )
+    fit = velocity_engine.fit_velocity(observations)
+    df = df.drop(columns=[c for c in fit.columns if c != 'webVideoUrl' and c in df.columns])
+    df = df.merge(fit, on='webVideoUrl', how='left')
+    df['velocity'] = df['velocity'].fillna(0)
+    df['acceleration'] = df['acceleration'].fillna(0)
+    df['velocity_points'] = df['velocity_points'].fillna(0).astype(int)
     
+    return prediction_kernel(df)
+
+
+def prediction_kernel(df: pd.DataFrame) -> pd.DataFrame:
+    """Predictions and labels from velocity / acceleration / velocity_points.
+
+    Every column is one vectorized pass over the frame (masked arithmetic,
+    np.select, the rule tables' np.select path), so cost is a handful of
+    array operations regardless of the number of trends. Adds the
+    predicted_6h/12h/24h, trajectory, peak_estimate_hours,
+    prediction_confidence, has_velocity_data and action_window columns
+    in place and returns df.
+    """
+    velocity = df['velocity'].to_numpy(dtype='float64')
+    acceleration = df['acceleration'].to_numpy(dtype='float64')
+    points = df['velocity_points'].to_numpy()
+
     # Predict future momentum using physics model: position + velocity*t + 0.5*acceleration*t^2
     # But cap acceleration impact to avoid runaway predictions
     df['acceleration_capped'] = df['acceleration'].clip(-50, 50)
     
     # Predictions (time in days: 0.25 = 6h, 0.5 = 12h, 1.0 = 24h)
-    df['predicted_6h'] = (
-        df['momentum_score'] + 
-        df['velocity'] * 0.25 + 
-        0.5 * df['acceleration_capped'] * (0.25 ** 2)
-    ).clip(lower=0)
-    
-    df['predicted_12h'] = (
-        df['momentum_score'] + 
-        df['velocity'] * 0.5 + 
-        0.5 * df['acceleration_capped'] * (0.5 ** 2)
-    ).clip(lower=0)
-    
-    df['predicted_24h'] = (
-        df['momentum_score'] + 
-        df['velocity'] * 1.0 + 
-        0.5 * df['acceleration_capped'] * (1.0 ** 2)
-    ).clip(lower=0)
-    
-    # Determine trajectory
-    def get_trajectory(velocity):
-        if velocity >= VELOCITY_THRESHOLDS['EXPLOSIVE']:
-            return '🚀 EXPLOSIVE'
-        elif velocity >= VELOCITY_THRESHOLDS['STRONG']:
-            return '📈 STRONG'
-        elif velocity >= VELOCITY_THRESHOLDS['MODERATE']:
-            return '↗️ MODERATE'
-        elif velocity >= VELOCITY_THRESHOLDS['WEAK']:
-            return '➡️ FLAT'
-        elif velocity >= VELOCITY_THRESHOLDS['DECLINING']:
-            return '↘️ DECLINING'
-        else:
-            return '📉 CRASHING'
-    
-    df['trajectory'] = df['velocity'].apply(get_trajectory)
+    momentum = df['momentum_score'].to_numpy(dtype='float64')
+    capped = df['acceleration_capped'].to_numpy(dtype='float64')
+    for label, t in (('predicted_6h', 0.25), ('predicted_12h', 0.5), ('predicted_24h', 1.0)):
+        df[label] = np.maximum(momentum + velocity * t + 0.5 * capped * (t ** 2), 0)
+    
+    # Determine trajectory (first threshold the velocity reaches)
+    df['trajectory'] = np.select(
+        [
+            velocity >= VELOCITY_THRESHOLDS['EXPLOSIVE'],
+            velocity >= VELOCITY_THRESHOLDS['STRONG'],
+            velocity >= VELOCITY_THRESHOLDS['MODERATE'],
+            velocity >= VELOCITY_THRESHOLDS['WEAK'],
+            velocity >= VELOCITY_THRESHOLDS['DECLINING'],
+        ],
+        ['🚀 EXPLOSIVE', '📈 STRONG', '↗️ MODERATE', '➡️ FLAT', '↘️ DECLINING'],
+        default='📉 CRASHING'
+    )
     
     # Estimate peak timing (when velocity will hit 0)
     # peak_time = -velocity / acceleration (only valid if acceleration < 0 and velocity > 0)
-    def estimate_peak(row):
-        if row['acceleration'] < -5 and row['velocity'] > 0:
-            peak_hours = (-row['velocity'] / row['acceleration']) * 24
-            if 0 < peak_hours < 72:
-                return round(peak_hours, 1)
-        return None
+    peaking = (acceleration < -5) & (velocity > 0)
+    peak_hours = np.full(len(df), np.nan)
+    np.divide(-velocity, acceleration, out=peak_hours, where=peaking)
+    peak_hours *= 24
+    df['peak_estimate_hours'] = np.where((peak_hours > 0) & (peak_hours < 72), np.round(peak_hours, 1), np.nan)
     
-    df['peak_estimate_hours'] = df.apply(estimate_peak, axis=1)
+    # Determine confidence based on data availability (observations fitted)
+    df['prediction_confidence'] = np.select([points >= 3, points == 2], ['HIGH', 'MEDIUM'], default='LOW')
     
-    # Determine confidence based on data availability
-    def get_confidence(row):
-        if pd.notna(row.get('momentum_2days')) and pd.notna(row.get('momentum_yesterday')):
-            return 'HIGH'
-        elif pd.notna(row.get('momentum_yesterday')):
-            return 'MEDIUM'
-        else:
-            return 'LOW'
-    
-    df['prediction_confidence'] = df.apply(get_confidence, axis=1)
-    
-    # Determine action window
-    def get_action_window(row):
-        age = row.get('age_hours', 999)
-        velocity = row['velocity']
-        momentum = row['momentum_score']
-        predicted_24h = row['predicted_24h']
-        has_velocity_data = pd.notna(row.get('momentum_yesterday')) and row.get('momentum_yesterday') != row.get('momentum_score', 0)
-        
-        # Too old - 72h window closing
-        if age > 60:
-            return '⚠️ WINDOW CLOSING'
-        
-        # If we have real velocity data, use it
-        if has_velocity_data:
-            # Explosive growth - act immediately
-            if velocity >= 200 and momentum >= 1000:
-                return '🔴 ACT NOW'
-            
-            # Strong growth - act within 6-12h
-            if velocity >= 100 and momentum >= 500:
-                return '🟠 6-12H'
-            
-            # Moderate growth but predicted to be big
-            if velocity >= 50 and predicted_24h >= 2000:
-                return '🟡 12-24H'
-            
-            # Flat or declining
-            if velocity <= 0:
-                if momentum >= 2000:
-                    return '⚠️ PEAKED'
-                else:
-                    return '❌ TOO LATE'
-            
-            # Default - worth monitoring
-            return '🟢 MONITOR'
-        
-        else:
-            # No velocity data — classify on momentum + age alone
-            if momentum >= 3000 and age <= 24:
-                return '🔴 ACT NOW'
-            if momentum >= 2000 and age <= 36:
-                return '🟠 6-12H'
-            if momentum >= 1000 and age <= 48:
-                return '🟡 12-24H'
-            if momentum >= 500:
-                return '🟢 MONITOR'
-            return '❌ TOO LATE'
-    
-    df['action_window'] = df.apply(get_action_window, axis=1)
+    # Determine action window (rules_engine.ACTION_WINDOW_RULES)
+    df['has_velocity_data'] = (points >= 2) & (velocity != 0)
+    df['action_window'] = ACTION_WINDOW_RULES.apply(df)['action_window']
     
     return df
 
@@ -508,110 +488,6 @@ def _ensure_calculated_metrics(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def create_velocity_summary(df: pd.DataFrame, cache_path: str = None) -> pd.DataFrame:
-    """Create a summary view of velocity predictions sorted by opportunity.
-    
-    Now includes variant allocation and stop rules (v3.5.0 Option B).
-    """
-    
-    cols = [
-        'webVideoUrl', 'text', 'author', 'age_hours',
-        'momentum_score', 'velocity', 'acceleration',
-        'predicted_6h', 'predicted_12h', 'predicted_24h',
-        'trajectory', 'peak_estimate_hours', 'prediction_confidence',
-        'action_window', 'Market', 'AI_CATEGORY'
-    ]
-    
-    # Filter to available columns
-    available_cols = [c for c in cols if c in df.columns]
-    summary = df[available_cols].copy()
-    
-    # Create opportunity score for sorting (with NaN handling)
-    # Prioritize: high predicted growth + young age + ACT NOW status
-    summary['opportunity_score'] = (
-        (summary['predicted_24h'].fillna(0) - summary['momentum_score'].fillna(0)) * 0.5 +  # Growth potential
-        summary['velocity'].fillna(0) * 0.3 +  # Current velocity
-        (72 - summary['age_hours'].fillna(72).clip(upper=72)) * 10  # Youth bonus
-    )
-    
-    # Boost ACT NOW items
-    summary.loc[summary['action_window'].str.contains('ACT NOW', na=False), 'opportunity_score'] *= 1.5
-    
-    # Sort by opportunity score
-    summary = summary.sort_values('opportunity_score', ascending=False)
-    
-    # Format for display (with NaN handling)
-    summary['Trend'] = summary['text'].fillna('').astype(str).str[:60] + '...' if 'text' in summary.columns else ''
-    summary['Creator'] = summary.get('author', '').fillna('')
-    summary['Age'] = summary['age_hours'].fillna(0).apply(lambda x: f"{x:.1f}h")
-    summary['Current'] = summary['momentum_score'].fillna(0).astype(int)
-    summary['Velocity'] = summary['velocity'].fillna(0).apply(lambda x: f"{x:+.0f}/day")
-    summary['In 6h'] = summary['predicted_6h'].fillna(0).astype(int)
-    summary['In 12h'] = summary['predicted_12h'].fillna(0).astype(int)
-    summary['In 24h'] = summary['predicted_24h'].fillna(0).astype(int)
-    summary['Peak In'] = summary['peak_estimate_hours'].apply(
-        lambda x: f"{x:.0f}h" if pd.notna(x) else "N/A"
-    )
-    
-    # ── Variant allocation & stop rules (Option B inline) ──
-    cache = prune_streak_cache(load_streak_cache(cache_path or ''), VARIANT_CACHE_DEFAULT_TTL)
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    
-    rec_variants = []
-    streaks = []
-    stops = []
-    stop_reasons = []
-    
-    for _, row in summary.iterrows():
-        aw = str(row.get('action_window', ''))
-        tr = str(row.get('trajectory', ''))
-        age_val = row.get('age_hours', None)
-        cur_val = row.get('momentum_score', None)
-        vel_val = row.get('velocity', None)
-        url = str(row.get('webVideoUrl', ''))
-        
-        # Streak calculation
-        prev = cache.get(url, {"streak": 0, "last_seen": None})
-        prev_streak = int(prev.get("streak", 0) or 0)
-        
-        vel_float = _as_float_vel(vel_val)
-        if vel_float is not None and vel_float <= 0:
-            streak = prev_streak + 1
-        elif vel_float is not None and vel_float > 0:
-            streak = 0
-        else:
-            streak = prev_streak  # unknown velocity -> hold
-        
-        if url:
-            cache[url] = {"streak": streak, "last_seen": today_str}
-        
-        rv = calc_recommended_variants(aw, tr, age_val, cur_val)
-        stop, reason = calc_stop_building(aw, tr, age_val, streak)
-        
-        rec_variants.append(rv)
-        streaks.append(streak)
-        stops.append(stop)
-        stop_reasons.append(reason)
-    
-    summary['recommended_variants'] = rec_variants
-    summary['velocity_nonpos_streak'] = streaks
-    summary['stop_building'] = stops
-    summary['stop_reason'] = stop_reasons
-    
-    # Save updated cache
-    save_streak_cache(cache_path or '', cache)
-    
-    # Final columns for output
-    output_cols = [
-        'action_window', 'trajectory', 'Trend', 'Creator', 'Age',
-        'Current', 'Velocity', 'In 6h', 'In 12h', 'In 24h',
-        'Peak In', 'prediction_confidence', 'Market', 'webVideoUrl',
-        'recommended_variants', 'velocity_nonpos_streak', 'stop_building', 'stop_reason'
-    ]
-    
-    return summary[[c for c in output_cols if c in summary.columns]]
-
-
 # =============================================================================
 # COMPETITOR ANALYSIS ENGINE
 # =============================================================================
@@ -746,17 +622,178 @@ def calculate_your_vs_competitor_metrics(
 # EXCEL OUTPUT GENERATION
 # =============================================================================
 
-def create_enhanced_excel(
+# Output keys of the three enhanced workbooks (integrate_with_daily_processor)
+ENHANCED_OUTPUTS = ('us_enhanced', 'uk_enhanced', 'combined_enhanced')
+
+# Tabs of an enhanced workbook, in workbook order
+ENHANCED_TABS = (
+    'DASHBOARD', 'OPPORTUNITY_NOW', 'REVENUE_TRACKER', 'REVENUE_INSIGHTS',
+    'COMPETITOR_VIEW', 'PREDICTION_LOG', 'DATA_FEED', 'COMPETITOR_INTEL',
+    'PAYMENTS', 'MONTHLY_REVENUE',
+)
+
+# Tabs whose formulas read other tabs; selecting one selects those too
+TAB_REQUIRES = {
+    'DASHBOARD': ('REVENUE_TRACKER', 'OPPORTUNITY_NOW', 'DATA_FEED', 'COMPETITOR_VIEW', 'PREDICTION_LOG'),
+    'REVENUE_INSIGHTS': ('REVENUE_TRACKER',),
+}
+
+# Analysis inputs each tab needs; anything no selected tab needs is skipped
+TAB_INPUTS = {
+    'OPPORTUNITY_NOW': ('predictions',),
+    'PREDICTION_LOG': ('backtest', 'prediction_log'),
+    'REVENUE_TRACKER': ('revenue',),
+    'PAYMENTS': ('revenue',),
+    'MONTHLY_REVENUE': ('revenue',),
+    'COMPETITOR_VIEW': ('competitor_gaps',),
+    'COMPETITOR_INTEL': ('competitor_intel',),
+}
+
+
+def resolve_tabs(tabs=None) -> Tuple[str, ...]:
+    """Selected enhanced tabs plus the tabs they reference, in workbook order (None = all)."""
+    if tabs is None:
+        return ENHANCED_TABS
+    unknown = set(tabs) - set(ENHANCED_TABS)
+    if unknown:
+        print(f"  [WARNING] Unknown enhanced tabs ignored: {', '.join(sorted(unknown))}")
+    selected = set(tabs) & set(ENHANCED_TABS)
+    for tab in list(selected):
+        selected.update(TAB_REQUIRES.get(tab, ()))
+    return tuple(t for t in ENHANCED_TABS if t in selected)
+
+
+TAB_INPUTS_ALL = {need for needs in TAB_INPUTS.values() for need in needs}
+
+
+def tab_inputs(tabs=None) -> set:
+    """Analysis inputs needed by the given enhanced tabs (None = all tabs)."""
+    return {need for tab in resolve_tabs(tabs) for need in TAB_INPUTS.get(tab, ())}
+
+
+def prepare_enhanced_workbook(
     df_today: pd.DataFrame,
     df_yesterday: pd.DataFrame = None,
     df_2days_ago: pd.DataFrame = None,
-    output_path: str = 'BUILD_TODAY_ENHANCED.xlsx',
     cache_path: str = None,
     dashboard_path: str = None,
-    live_revenue_df: pd.DataFrame = None
-) -> str:
+    live_revenue_df: pd.DataFrame = None,
+    context: 'AnalysisContext' = None,
+    tabs=None
+) -> Dict:
     """
-    Create v3.6.0 Enhanced Excel file with 8 tabs:
+    Run every analysis step of an enhanced workbook and return its inputs.
+
+    This is the stateful half (streak cache, revenue/prediction history,
+    competitor history on disk). The returned dict holds only DataFrames
+    and plain data so render_enhanced_workbook() can run in another process.
+
+    With an AnalysisContext the market-independent pieces (velocity
+    predictions, streaks, revenue, prediction log, competitor history,
+    seasonal alerts) are sliced from it instead of recomputed.
+
+    tabs limits the workbook to those tabs (see resolve_tabs); inputs only
+    disabled tabs need are not computed and are None in the result.
+    """
+    df_today = _ensure_calculated_metrics(df_today)
+    tabs = resolve_tabs(tabs)
+    needs = tab_inputs(tabs)
+
+    if context is not None:
+        prepared = {
+            'tabs': tabs,
+            'df_today': df_today,
+            'df_yesterday': context.yesterday,
+            'df_with_predictions': context.predictions_for(df_today) if 'predictions' in needs else None,
+            'competitor_gaps': analyze_competitor_gaps(df_today) if 'competitor_gaps' in needs else None,
+            'existing_revenue': context.existing_revenue,
+            'existing_prediction_log': context.existing_prediction_log,
+            'prediction_accuracy': context.accuracy_for() if 'backtest' in needs else None,
+            'comp_intel': context.competitor_intel_for(df_today) if 'competitor_intel' in needs else None,
+            'seasonal_alerts': context.seasonal_alerts,
+        }
+        prepared['sheets'] = enhanced_sheet_models(prepared)
+        return prepared
+
+    df_with_predictions = competitor_gaps = existing_revenue = existing_prediction_log = comp_intel = None
+    prediction_accuracy = None
+    data_dir = os.path.dirname(cache_path) if cache_path else 'data'
+    if not data_dir:
+        data_dir = 'data'
+
+    if 'predictions' in needs:
+        # Filter to fresh content (72h) for enhanced analysis
+        fresh_df = df_today[df_today['age_hours'] <= 72].copy() if 'age_hours' in df_today.columns else df_today.copy()
+
+        # Calculate velocity predictions on fresh data
+        df_with_predictions = calculate_velocity_predictions(fresh_df, df_yesterday, df_2days_ago)
+
+        # No shared context: this workbook owns the run's streak update
+        ledger = StreakLedger.load(cache_path)
+        ledger.update(df_with_predictions['webVideoUrl'], df_with_predictions['velocity'])
+        df_with_predictions['velocity_nonpos_streak'] = ledger.streaks_for(df_with_predictions['webVideoUrl'])
+        ledger.commit()
+
+    # Competitor analysis on full dataset
+    if 'competitor_gaps' in needs:
+        competitor_gaps = analyze_competitor_gaps(df_today)
+
+    # Load existing revenue/prediction data
+    if 'revenue' in needs:
+        existing_revenue = _load_existing_revenue(dashboard_path, live_revenue_df=live_revenue_df)
+    if 'prediction_log' in needs:
+        existing_prediction_log = _load_prediction_log_window(data_dir, dashboard_path)
+
+    # Score yesterday's stored predictions against today's momentum
+    if 'backtest' in needs:
+        prediction_accuracy = _latest_score(backtest.score_pairs(backtest.score_today(data_dir, df_today)))
+
+    # Build competitor intel (7-day deep analysis)
+    if 'competitor_intel' in needs:
+        try:
+            from competitor_intel_patch import build_competitor_intel
+            comp_intel = build_competitor_intel(df_today, data_dir)
+        except Exception as e:
+            print(f"  [WARNING] Could not build competitor intel: {e}")
+
+    prepared = {
+        'tabs': tabs,
+        'df_today': df_today,
+        'df_yesterday': df_yesterday,
+        'df_with_predictions': df_with_predictions,
+        'competitor_gaps': competitor_gaps,
+        'existing_revenue': existing_revenue,
+        'existing_prediction_log': existing_prediction_log,
+        'prediction_accuracy': prediction_accuracy,
+        'comp_intel': comp_intel,
+    }
+    prepared['sheets'] = enhanced_sheet_models(prepared)
+    return prepared
+
+
+def enhanced_sheet_models(prepared: Dict) -> Dict[str, SheetModel]:
+    """The table-shaped tabs of one enhanced workbook as SheetModels, by tab name.
+
+    DASHBOARD, REVENUE_TRACKER, REVENUE_INSIGHTS, COMPETITOR_INTEL and
+    MONTHLY_REVENUE are layout/formula driven and stay worksheet-native.
+    """
+    seasonal_alerts = prepared.get('seasonal_alerts')
+    builders = {
+        'OPPORTUNITY_NOW': lambda: _opportunity_now_sheet(prepared['df_with_predictions'],
+                                                          seasonal_alerts=seasonal_alerts),
+        'COMPETITOR_VIEW': lambda: _competitor_view_sheet(prepared['competitor_gaps']),
+        'PREDICTION_LOG': lambda: _prediction_log_sheet(prepared.get('prediction_accuracy'),
+                                                        prepared['existing_prediction_log']),
+        'DATA_FEED': lambda: _data_feed_sheet(prepared['df_today'], seasonal_alerts=seasonal_alerts),
+        'PAYMENTS': lambda: _payments_sheet(prepared['existing_revenue']),
+    }
+    tabs = prepared.get('tabs', ENHANCED_TABS)
+    return {name: build() for name, build in builders.items() if name in tabs}
+
+
+def render_enhanced_workbook(prepared: Dict, output_path: str) -> str:
+    """
+    Write a v3.6.0 Enhanced Excel file from prepare_enhanced_workbook() output:
     1. DASHBOARD - Formula-driven KPI summary
     2. OPPORTUNITY_NOW - 13-column priority build list
     3. REVENUE_TRACKER - 19-column revenue tracking (carried forward)
@@ -765,98 +802,182 @@ def create_enhanced_excel(
     6. PREDICTION_LOG - Model accuracy tracking
     7. DATA_FEED - 19-column enhanced MY_PERFORMANCE
     8. COMPETITOR_INTEL - 7-day deep competitor intelligence (9 sections)
+    9. PAYMENTS / 10. MONTHLY_REVENUE
     """
-    df_today = _ensure_calculated_metrics(df_today)
-
-    # Filter to fresh content (72h) for enhanced analysis
-    fresh_df = df_today[df_today['age_hours'] <= 72].copy() if 'age_hours' in df_today.columns else df_today.copy()
-
-    # Calculate velocity predictions on fresh data
-    df_with_predictions = calculate_velocity_predictions(fresh_df, df_yesterday, df_2days_ago)
-    velocity_summary = create_velocity_summary(df_with_predictions, cache_path=cache_path)
-
-    # Competitor analysis on full dataset
-    competitor_gaps = analyze_competitor_gaps(df_today)
-    h2h_metrics = calculate_your_vs_competitor_metrics(df_today)
-
-    # Load existing revenue/prediction data
-    existing_revenue = _load_existing_revenue(dashboard_path, live_revenue_df=live_revenue_df)
-    existing_prediction_log = _load_existing_prediction_log(dashboard_path)
-
-    # Build competitor intel (7-day deep analysis)
-    try:
-        from competitor_intel_patch import build_competitor_intel, build_competitor_intel_tab
-        comp_cache_dir = os.path.dirname(cache_path) if cache_path else 'data'
-        if not comp_cache_dir:
-            comp_cache_dir = 'data'
-        comp_intel = build_competitor_intel(df_today, comp_cache_dir)
-        has_comp_intel = True
-    except Exception as e:
-        print(f"  [WARNING] Could not build competitor intel: {e}")
-        comp_intel = None
-        has_comp_intel = False
+    existing_revenue = prepared['existing_revenue']
+    comp_intel = prepared['comp_intel']
+    seasonal_alerts = prepared.get('seasonal_alerts')
+    tabs = prepared.get('tabs', ENHANCED_TABS)
+    sheets = prepared.get('sheets') or enhanced_sheet_models(prepared)
 
     # Style definitions
     header_fill = PatternFill('solid', fgColor='1F4E78')
     header_font = Font(bold=True, color='FFFFFF')
-    cyan_fill = PatternFill('solid', fgColor='E0FFFF')
     thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
                          top=Side(style='thin'), bottom=Side(style='thin'))
 
     wb = Workbook()
+    wb.remove(wb.active)
 
     # TAB 1: DASHBOARD
-    ws = wb.active
-    ws.title = 'DASHBOARD'
-    _build_dashboard_tab(ws, header_fill, header_font)
+    if 'DASHBOARD' in tabs:
+        _build_dashboard_tab(wb.create_sheet('DASHBOARD'), header_fill, header_font,
+                             seasonal_alerts=seasonal_alerts)
 
     # TAB 2: OPPORTUNITY_NOW (13 columns)
-    ws_opp = wb.create_sheet('OPPORTUNITY_NOW')
-    _build_opportunity_now_tab(ws_opp, df_with_predictions, header_fill, header_font, thin_border)
+    if 'OPPORTUNITY_NOW' in tabs:
+        fill_worksheet(wb.create_sheet('OPPORTUNITY_NOW'), sheets['OPPORTUNITY_NOW'])
 
     # TAB 3: REVENUE_TRACKER (19 columns)
-    ws_rev = wb.create_sheet('REVENUE_TRACKER')
-    _build_revenue_tracker_tab(ws_rev, existing_revenue, header_fill, header_font, thin_border)
+    if 'REVENUE_TRACKER' in tabs:
+        ws_rev = wb.create_sheet('REVENUE_TRACKER')
+        _build_revenue_tracker_tab(ws_rev, existing_revenue, header_fill, header_font, thin_border)
 
     # TAB 4: REVENUE_INSIGHTS
-    ws_ins = wb.create_sheet('REVENUE_INSIGHTS')
-    _build_revenue_insights_tab(ws_ins, header_fill, header_font)
+    if 'REVENUE_INSIGHTS' in tabs:
+        ws_ins = wb.create_sheet('REVENUE_INSIGHTS')
+        _build_revenue_insights_tab(ws_ins, header_fill, header_font)
 
     # TAB 5: COMPETITOR_VIEW (12 columns)
-    ws_comp = wb.create_sheet('COMPETITOR_VIEW')
-    _build_competitor_view_tab(ws_comp, competitor_gaps, header_fill, header_font, thin_border)
+    if 'COMPETITOR_VIEW' in tabs:
+        fill_worksheet(wb.create_sheet('COMPETITOR_VIEW'), sheets['COMPETITOR_VIEW'])
 
     # TAB 6: PREDICTION_LOG (10 columns)
-    ws_pred = wb.create_sheet('PREDICTION_LOG')
-    _build_prediction_log_tab(ws_pred, df_with_predictions, df_yesterday,
-                               existing_prediction_log, header_fill, header_font, thin_border)
+    if 'PREDICTION_LOG' in tabs:
+        fill_worksheet(wb.create_sheet('PREDICTION_LOG'), sheets['PREDICTION_LOG'])
 
     # TAB 7: DATA_FEED (19 columns)
-    ws_feed = wb.create_sheet('DATA_FEED')
-    _build_data_feed_tab(ws_feed, df_today, header_fill, header_font, thin_border, cyan_fill)
+    if 'DATA_FEED' in tabs:
+        fill_worksheet(wb.create_sheet('DATA_FEED'), sheets['DATA_FEED'])
 
     # TAB 8: COMPETITOR_INTEL (7-day deep intelligence)
-    if has_comp_intel and comp_intel is not None:
-        ws_intel = wb.create_sheet('COMPETITOR_INTEL')
-        build_competitor_intel_tab(ws_intel, comp_intel, header_fill, header_font, thin_border)
+    if 'COMPETITOR_INTEL' in tabs and comp_intel is not None:
+        try:
+            from competitor_intel_patch import build_competitor_intel_tab
+            ws_intel = wb.create_sheet('COMPETITOR_INTEL')
+            build_competitor_intel_tab(ws_intel, comp_intel, header_fill, header_font, thin_border)
+        except ImportError as e:
+            print(f"  [WARNING] Could not build competitor intel tab: {e}")
 
     # TAB 9: PAYMENTS (Pioneer Programme day-by-day breakdown) - NEW v5.8.1
-    ws_pay = wb.create_sheet('PAYMENTS')
-    _build_payments_tab(ws_pay, existing_revenue, header_fill, header_font, thin_border)
+    if 'PAYMENTS' in tabs:
+        fill_worksheet(wb.create_sheet('PAYMENTS'), sheets['PAYMENTS'])
 
     # TAB 10: MONTHLY_REVENUE (month-over-month summary) - NEW v5.8.1
-    ws_monthly = wb.create_sheet('MONTHLY_REVENUE')
-    _build_monthly_revenue_tab(ws_monthly, existing_revenue, header_fill, header_font, thin_border)
+    if 'MONTHLY_REVENUE' in tabs:
+        ws_monthly = wb.create_sheet('MONTHLY_REVENUE')
+        _build_monthly_revenue_tab(ws_monthly, existing_revenue, header_fill, header_font, thin_border)
 
     wb.save(output_path)
     return output_path
 
 
+def create_enhanced_excel(
+    df_today: pd.DataFrame,
+    df_yesterday: pd.DataFrame = None,
+    df_2days_ago: pd.DataFrame = None,
+    output_path: str = 'BUILD_TODAY_ENHANCED.xlsx',
+    cache_path: str = None,
+    dashboard_path: str = None,
+    live_revenue_df: pd.DataFrame = None,
+    scheduler=None,
+    context: 'AnalysisContext' = None,
+    tabs=None
+) -> str:
+    """
+    Create v3.6.0 Enhanced Excel file (see render_enhanced_workbook for tabs;
+    tabs limits it to a subset, see resolve_tabs).
+
+    Analysis runs here; with a RenderScheduler the workbook itself is queued
+    instead of written before returning. The table-shaped tabs also go to
+    any SHEET_EXPORT_SINKS and, with a context, are kept in
+    context.sheet_models[output_path] for the dashboard payload.
+    """
+    prepared = prepare_enhanced_workbook(df_today, df_yesterday, df_2days_ago,
+                                         cache_path=cache_path, dashboard_path=dashboard_path,
+                                         live_revenue_df=live_revenue_df, context=context, tabs=tabs)
+    if context is not None:
+        context.sheet_models[output_path] = prepared['sheets']
+    if scheduler is not None:
+        scheduler.submit(output_path, render_enhanced_workbook, prepared, output_path)
+    else:
+        render_enhanced_workbook(prepared, output_path)
+    export_models(list(prepared['sheets'].values()), os.path.splitext(output_path)[0], scheduler=scheduler)
+    return output_path
+
+
 # =============================================================================
 # v3.6.0 TAB BUILDERS
 # =============================================================================
 
-def _build_dashboard_tab(ws, header_fill, header_font):
+# Named styles for the per-row cells of every tab (see workbook_styles.py)
+PAYMENT_STATUS_FILLS = {
+    'CAPPED': 'C6EFCE',
+    'EARNING': 'FFEB9C',
+    'PENDING': 'FFE4B5',
+    'NONE': 'F2F2F2',
+}
+
+register_styles({
+    'enh.header': style(fill=solid('1F4E78'), font=WHITE_BOLD_FONT, alignment=Alignment(horizontal='center')),
+    'enh.header.boxed': style(fill=solid('1F4E78'), font=WHITE_BOLD_FONT, alignment=Alignment(horizontal='center'),
+                              border=THIN_BORDER),
+    'enh.note': style(font=Font(italic=True, color='666666')),
+    'enh.cell': style(border=THIN_BORDER),
+    'enh.cell.bold': style(border=THIN_BORDER, font=BOLD_FONT),
+    'enh.link': style(border=THIN_BORDER, font=LINK_FONT),
+    'enh.money': style(border=THIN_BORDER, number_format=MONEY_FORMAT),
+    'enh.money.bold': style(border=THIN_BORDER, font=BOLD_FONT, number_format=MONEY_FORMAT),
+    'enh.money.input': style(number_format=MONEY_FORMAT),
+    'enh.pct': style(border=THIN_BORDER, number_format='0.0%'),
+    'enh.pct.bold': style(border=THIN_BORDER, font=BOLD_FONT, number_format='0.0%'),
+    'enh.input': style(fill=solid('FFFFE0')),
+    'enh.total': style(border=THIN_BORDER, fill=solid('1F4E78'), font=Font(bold=True, color='FFFFFF', size=11)),
+    'enh.total.money': style(border=THIN_BORDER, fill=solid('1F4E78'), font=Font(bold=True, color='FFFFFF', size=11),
+                             number_format=MONEY_FORMAT),
+    'enh.total.pct': style(border=THIN_BORDER, fill=solid('1F4E78'), font=Font(bold=True, color='FFFFFF', size=11),
+                           number_format='0.0%'),
+    'enh.opp.act_now': style(border=THIN_BORDER, fill=solid('FF6B6B'), font=BOLD_FONT),
+    'enh.opp.today': style(border=THIN_BORDER, fill=solid('FFE4B5')),
+    'enh.gap.missed': style(border=THIN_BORDER, fill=solid('FF6B6B'), font=WHITE_BOLD_FONT),
+    'enh.gap.both': style(border=THIN_BORDER, fill=solid('90EE90')),
+    'enh.log.alt': style(border=THIN_BORDER, fill=solid('F5F5F5')),
+    'enh.log.new': style(border=THIN_BORDER, fill=solid('E0FFE0')),
+    'enh.feed': style(border=THIN_BORDER, fill=solid('E0FFFF')),
+    'enh.trigger.make_now': style(border=THIN_BORDER, fill=solid('FF0000'), font=WHITE_BOLD_FONT),
+    'enh.trigger.watch': style(border=THIN_BORDER, fill=solid('FFFF00')),
+    'enh.urgency.urgent': style(border=THIN_BORDER, fill=solid('8B0000'), font=WHITE_BOLD_FONT),
+    'enh.urgency.high': style(border=THIN_BORDER, fill=solid('FFA500')),
+    **{f'enh.pay.{status.lower()}': style(border=THIN_BORDER, fill=solid(color))
+       for status, color in PAYMENT_STATUS_FILLS.items()},
+})
+
+# Conditional formats of the table tabs (body cells carry only their
+# border / number format / link style)
+DATA_FEED_RULES = [
+    # Data columns 1-11 in CYAN
+    CellRule('enh.feed', 'A:K'),
+    # Trigger colors
+    CellRule('enh.trigger.make_now', 'L', key='L', values=('\U0001f534 MAKE_NOW',)),
+    CellRule('enh.trigger.watch', 'L', key='L', values=('\U0001f7e1 WATCH',)),
+    CellRule('enh.urgency.urgent', 'M', key='M', values=('\U0001f525 URGENT',)),
+    CellRule('enh.urgency.high', 'M', key='M', values=('\u26a1 HIGH',)),
+]
+
+PAYMENTS_RULES = [
+    CellRule(f'enh.pay.{status.lower()}', 'A:I', key='I',
+             values=('NO REVENUE' if status == 'NONE' else status,))
+    for status in PAYMENT_STATUS_FILLS
+]
+
+
+def _seasonal_alerts_today():
+    from seasonal_calendar import get_seasonal_alerts
+    from datetime import date
+    return get_seasonal_alerts(date.today())
+
+
+def _build_dashboard_tab(ws, header_fill, header_font, seasonal_alerts=None):
     section_fill = PatternFill('solid', fgColor='E8F4FD')  # Light blue for section headers
     kpi_fill = PatternFill('solid', fgColor='F5F5F5')  # Light grey for KPI cells
     red_kpi = PatternFill('solid', fgColor='FFE0E0')  # Light red for urgent KPIs
@@ -950,9 +1071,7 @@ def _build_dashboard_tab(ws, header_fill, header_font):
     ws.merge_cells('A19:L19')
     seasonal_end_row = 20  # Track where seasonal section ends
     try:
-        from seasonal_calendar import get_seasonal_alerts
-        from datetime import date
-        alerts = get_seasonal_alerts(date.today())
+        alerts = seasonal_alerts if seasonal_alerts is not None else _seasonal_alerts_today()
         if alerts:
             for i, a in enumerate(alerts):
                 cell = ws.cell(row=20+i, column=1, value=f"{a.get('emoji','')} {a.get('event','')} \u2014 {a.get('timing','')}")
@@ -998,15 +1117,14 @@ def _build_dashboard_tab(ws, header_fill, header_font):
         ws.column_dimensions[get_column_letter(col)].width = 16
 
 
-def _build_opportunity_now_tab(ws, df_pred, header_fill, header_font, thin_border):
+def _opportunity_now_sheet(df_pred, seasonal_alerts=None) -> SheetModel:
     headers = ['Priority', 'Build Priority', 'Time Zone', 'Time Remaining',
                'Trend', 'Creator', 'Momentum', 'Opportunity Score', 'Age',
                'Market', 'Seasonal', 'Previously Built', 'URL']
-    for ci, h in enumerate(headers, 1):
-        c = ws.cell(row=1, column=ci, value=h)
-        c.fill = header_fill
-        c.font = header_font
-        c.alignment = Alignment(horizontal='center')
+    sheet = SheetModel('OPPORTUNITY_NOW', header=headers, header_style='enh.header', freeze='A2',
+                       note='No immediate opportunities - check DASHBOARD for monitoring items',
+                       note_style='enh.note',
+                       widths=dict([('A',8),('B',22),('C',12),('D',25),('E',50),('F',18),('G',12),('H',16),('I',10),('J',15),('K',18),('L',15),('M',50)]))
 
     # Filter to actionable
     actionable = df_pred[
@@ -1054,19 +1172,17 @@ def _build_opportunity_now_tab(ws, df_pred, header_fill, header_font, thin_borde
     tz_label = '\U0001f7e2 PRIME' if is_prime else 'OFF_PEAK'
     seasonal_text = ''
     try:
-        from seasonal_calendar import get_seasonal_alerts
-        from datetime import date
-        alerts = get_seasonal_alerts(date.today())
+        alerts = seasonal_alerts if seasonal_alerts is not None else _seasonal_alerts_today()
         if alerts: seasonal_text = alerts[0].get('event', '')
     except Exception: pass
 
-    for ri, (_, row) in enumerate(actionable.iterrows(), 2):
+    for priority, (_, row) in enumerate(actionable.iterrows(), 1):
         aw = str(row.get('action_window', ''))
         is_act_now = 'ACT NOW' in aw
         hours_left = max(0, 72 - row.get('age_hours', 0))
         time_rem = f"{hours_left:.0f}h of prime time left" if is_prime else f"{hours_left:.0f}h remaining"
         vals = [
-            ri - 1,
+            priority,
             '\U0001f534 BUILD_IMMEDIATELY' if is_act_now else '\U0001f7e0 BUILD_TODAY',
             tz_label, time_rem,
             str(row.get('text', ''))[:60] if pd.notna(row.get('text')) else '',
@@ -1076,31 +1192,21 @@ def _build_opportunity_now_tab(ws, df_pred, header_fill, header_font, thin_borde
             f"{row.get('age_hours', 0):.1f}h",
             str(row.get('Market', '')) if pd.notna(row.get('Market')) else '',
             seasonal_text, '',
-            str(row.get('webVideoUrl', '')),
         ]
-        row_color = 'FF6B6B' if is_act_now else 'FFE4B5'
-        for ci, val in enumerate(vals, 1):
-            c = ws.cell(row=ri, column=ci, value=_sanitize_cell(val))
-            c.border = thin_border
-            if ci <= 12:
-                c.fill = PatternFill('solid', fgColor=row_color)
-                if is_act_now: c.font = Font(bold=True)
-        url_cell = ws.cell(row=ri, column=13)
+        row_style = 'enh.opp.act_now' if is_act_now else 'enh.opp.today'
+        cells = [Styled(_sanitize_cell(val), row_style) for val in vals]
         url_val = str(row.get('webVideoUrl', ''))
         if url_val.startswith('http'):
-            url_cell.hyperlink = url_val
-            url_cell.font = Font(color='0000FF', underline='single')
-
-    if len(actionable) == 0:
-        ws['A2'] = 'No immediate opportunities - check DASHBOARD for monitoring items'
-        ws['A2'].font = Font(italic=True, color='666666')
+            cells.append(Styled(_sanitize_cell(url_val), 'enh.link', link=url_val))
+        else:
+            cells.append(Styled(_sanitize_cell(url_val), 'enh.cell'))
+        sheet.rows.append(cells)
 
-    ws.freeze_panes = 'A2'
-    for col, w in [('A',8),('B',22),('C',12),('D',25),('E',50),('F',18),('G',12),('H',16),('I',10),('J',15),('K',18),('L',15),('M',50)]:
-        ws.column_dimensions[col].width = w
+    return sheet
 
 
 def _build_revenue_tracker_tab(ws, existing_revenue, header_fill, header_font, thin_border):
+    st = styles_for(ws)
     headers = ['TikTok URL', 'Account', 'Template Link', 'Received ($)',
                'Estimated ($)', 'US & EU3 Installs', 'ROW Installs',
                'Total Installs', 'Rev/Install', 'At Cap?', 'Trend Description',
@@ -1119,23 +1225,20 @@ def _build_revenue_tracker_tab(ws, existing_revenue, header_fill, header_font, t
                 col_name = headers[ci-1] if ci <= len(headers) else ''
                 val = row.get(col_name, row.iloc[ci-1] if ci-1 < len(row) else '')
                 if pd.isna(val): val = ''
-                ws.cell(row=ri, column=ci, value=_sanitize_cell(val)).border = thin_border
+                st.apply(ws.cell(row=ri, column=ci, value=_sanitize_cell(val)), 'enh.cell')
             # Formulas for calculated columns
             ws.cell(row=ri, column=8, value=f'=F{ri}+G{ri}')
-            ws.cell(row=ri, column=9, value=f'=IFERROR(D{ri}/H{ri},0)')
-            ws.cell(row=ri, column=9).number_format = '$#,##0.00'
+            st.apply(ws.cell(row=ri, column=9, value=f'=IFERROR(D{ri}/H{ri},0)'), 'enh.money')
             ws.cell(row=ri, column=10, value=f'=IF(D{ri}>=2500,"\u2705 CAP","")')
             max_data_row = ri
 
     # Add formulas for empty rows (for future user input)
-    input_fill = PatternFill('solid', fgColor='FFFFE0')
     for ri in range(max_data_row + 1, max_data_row + 51):
         ws.cell(row=ri, column=8, value=f'=F{ri}+G{ri}')
-        ws.cell(row=ri, column=9, value=f'=IFERROR(D{ri}/H{ri},0)')
-        ws.cell(row=ri, column=9).number_format = '$#,##0.00'
+        st.apply(ws.cell(row=ri, column=9, value=f'=IFERROR(D{ri}/H{ri},0)'), 'enh.money.input')
         ws.cell(row=ri, column=10, value=f'=IF(D{ri}>=2500,"\u2705 CAP","")')
         for ci in [3,4,5,6,7,19]:
-            ws.cell(row=ri, column=ci).fill = input_fill
+            st.apply(ws.cell(row=ri, column=ci), 'enh.input')
 
     ws.freeze_panes = 'A2'
     for col, w in [('A',50),('B',20),('C',40),('D',12),('E',12),('F',15),('G',12),('H',12),('I',12),('J',10),('K',40),('R',14)]:
@@ -1260,101 +1363,77 @@ def _build_revenue_insights_tab(ws, header_fill, header_font):
         ws.column_dimensions[col].width = w
 
 
-def _build_competitor_view_tab(ws, competitor_gaps, header_fill, header_font, thin_border):
+def _competitor_view_sheet(competitor_gaps) -> SheetModel:
     headers = ['Date', 'Competitor', 'Trend', 'Competitor Momentum', 'Your Momentum',
                'Competitor Shares/h', 'Market', 'Gap Type', 'Hours Behind',
                'Est. Missed Revenue ($)', 'AI Category', 'URL']
-    for ci, h in enumerate(headers, 1):
-        c = ws.cell(row=1, column=ci, value=h)
-        c.fill = header_fill; c.font = header_font; c.alignment = Alignment(horizontal='center')
+    sheet = SheetModel('COMPETITOR_VIEW', header=headers, header_style='enh.header', freeze='A2',
+                       note='No competitor posts found in today\'s trending data', note_style='enh.note',
+                       widths=dict([('A',12),('B',20),('C',50),('D',18),('E',15),('F',16),('G',15),('H',18),('I',14),('J',18),('K',12),('L',50)]))
 
     date_str = datetime.now().strftime('%Y-%m-%d')
-    if len(competitor_gaps) > 0:
-        for ri, (_, row) in enumerate(competitor_gaps.iterrows(), 2):
-            vals = [date_str, row.get('competitor_account',''), str(row.get('trend_text',''))[:60],
-                    int(row.get('competitor_momentum',0)), 0, round(float(row.get('competitor_shares_h',0)),1),
-                    str(row.get('market','')), row.get('gap_type',''), row.get('hours_behind',''),
-                    round(float(row.get('estimated_missed_revenue',0)),2), str(row.get('ai_category','')),
-                    str(row.get('trend_url',''))]
-            for ci, val in enumerate(vals, 1):
-                c = ws.cell(row=ri, column=ci, value=_sanitize_cell(val))
-                c.border = thin_border
-            gap_cell = ws.cell(row=ri, column=8)
-            if gap_cell.value == 'MISSED_BY_YOU':
-                gap_cell.fill = PatternFill('solid', fgColor='FF6B6B')
-                gap_cell.font = Font(bold=True, color='FFFFFF')
-            elif gap_cell.value == 'BOTH_CAUGHT':
-                gap_cell.fill = PatternFill('solid', fgColor='90EE90')
-            url_cell = ws.cell(row=ri, column=12)
-            uv = str(row.get('trend_url',''))
-            if uv.startswith('http'):
-                url_cell.hyperlink = uv
-                url_cell.font = Font(color='0000FF', underline='single')
-    else:
-        ws['A2'] = 'No competitor posts found in today\'s trending data'
-        ws['A2'].font = Font(italic=True, color='666666')
-    ws.freeze_panes = 'A2'
-    for col, w in [('A',12),('B',20),('C',50),('D',18),('E',15),('F',16),('G',15),('H',18),('I',14),('J',18),('K',12),('L',50)]:
-        ws.column_dimensions[col].width = w
+    for _, row in competitor_gaps.iterrows():
+        vals = [date_str, row.get('competitor_account',''), str(row.get('trend_text',''))[:60],
+                int(row.get('competitor_momentum',0)), 0, round(float(row.get('competitor_shares_h',0)),1),
+                str(row.get('market','')), row.get('gap_type',''), row.get('hours_behind',''),
+                round(float(row.get('estimated_missed_revenue',0)),2), str(row.get('ai_category','')),
+                str(row.get('trend_url',''))]
+        cells = [Styled(_sanitize_cell(val), 'enh.cell') for val in vals]
+        gap_cell = cells[7]
+        if gap_cell.value == 'MISSED_BY_YOU':
+            gap_cell.style = 'enh.gap.missed'
+        elif gap_cell.value == 'BOTH_CAUGHT':
+            gap_cell.style = 'enh.gap.both'
+        uv = str(row.get('trend_url',''))
+        if uv.startswith('http'):
+            cells[11].style = 'enh.link'
+            cells[11].link = uv
+        sheet.rows.append(cells)
+    return sheet
+
+
+def _prediction_log_values(score: Dict) -> list:
+    """The 10 PREDICTION_LOG cells of one day's backtest score."""
+    accuracy = score['direction_accuracy_pct']
+    vals = [str(score['date']), score['trends_tracked'],
+            round(accuracy / 100, 2) if pd.notna(accuracy) else '',
+            score['bias'], score['mean_absolute_pct_error'], score['correct_build'], score['false_positive'],
+            score['missed_opportunity'], score['correct_skip'], score['tuning_suggestion']]
+    return ['' if pd.isna(val) else val for val in vals]
 
 
-def _build_prediction_log_tab(ws, df_pred, df_yesterday, existing_log, header_fill, header_font, thin_border):
+def _prediction_log_sheet(accuracy, existing_log) -> SheetModel:
     headers = ['Date', 'Trends Tracked', 'Direction Accuracy %', 'Bias', 'MAPE %',
                'Correct Builds', 'False Positives', 'Missed Opportunities', 'Correct Skips', 'Tuning Suggestion']
-    for ci, h in enumerate(headers, 1):
-        c = ws.cell(row=1, column=ci, value=h)
-        c.fill = header_fill; c.font = header_font; c.alignment = Alignment(horizontal='center')
+    sheet = SheetModel('PREDICTION_LOG', header=headers, header_style='enh.header', freeze='A2',
+                       widths=dict([('A',12),('B',15),('C',20),('D',15),('E',10),('J',40)]))
 
-    start_row = 2
-    alt_fill = PatternFill('solid', fgColor='F5F5F5')
+    # Earlier days: the window read from the prediction log store
     if existing_log is not None and len(existing_log) > 0:
-        for ri, (_, row) in enumerate(existing_log.iterrows(), 2):
-            for ci in range(1, 11):
-                val = row.iloc[ci-1] if ci-1 < len(row) else ''
-                if pd.isna(val): val = ''
-                c = ws.cell(row=ri, column=ci, value=_sanitize_cell(val))
-                c.border = thin_border
-                if ri % 2 == 0: c.fill = alt_fill
-            start_row = ri + 1
+        for ri, score in enumerate(existing_log.to_dict('records'), 2):
+            style = 'enh.log.alt' if ri % 2 == 0 else 'enh.cell'
+            sheet.rows.append([Styled(_sanitize_cell(val), style) for val in _prediction_log_values(score)])
 
-    date_str = datetime.now().strftime('%Y-%m-%d')
-    if df_yesterday is not None and len(df_yesterday) > 0 and len(df_pred) > 0:
-        tracked = len(df_pred[df_pred['prediction_confidence'].isin(['HIGH', 'MEDIUM'])])
-        if tracked > 0:
-            correct_dir = total_cmp = 0
-            for _, row in df_pred.iterrows():
-                vel = row.get('velocity', 0)
-                delta = row.get('momentum_score', 0) - row.get('yesterday_momentum', 0)
-                if pd.notna(vel) and pd.notna(row.get('yesterday_momentum')):
-                    total_cmp += 1
-                    if (vel > 0 and delta > 0) or (vel <= 0 and delta <= 0): correct_dir += 1
-            dir_acc = correct_dir / total_cmp if total_cmp > 0 else 0
-            vals = [date_str, tracked, round(dir_acc, 2), 'Neutral', 0, 0, 0, 0, 0, 'Insufficient data for tuning']
-            new_row_fill = PatternFill('solid', fgColor='E0FFE0')  # Highlight today's new entry
-            for ci, val in enumerate(vals, 1):
-                c = ws.cell(row=start_row, column=ci, value=_sanitize_cell(val))
-                c.border = thin_border
-                c.fill = new_row_fill
+    # Today's row: yesterday's predictions scored by backtest.py
+    if accuracy is not None and accuracy['trends_tracked'] > 0:
+        # Highlight today's new entry
+        sheet.rows.append([Styled(_sanitize_cell(val), 'enh.log.new') for val in _prediction_log_values(accuracy)])
 
-    ws.freeze_panes = 'A2'
-    for col, w in [('A',12),('B',15),('C',20),('D',15),('E',10),('J',40)]:
-        ws.column_dimensions[col].width = w
+    return sheet
 
 
-def _build_data_feed_tab(ws, df_today, header_fill, header_font, thin_border, cyan_fill):
+def _data_feed_sheet(df_today, seasonal_alerts=None) -> SheetModel:
     headers = ['Date', 'Account', 'Trend', 'Age', 'Momentum', 'Status', 'Market',
                'Views/h', 'Shares/h', 'BUILD_NOW', 'TikTok URL', 'TUTORIAL_TRIGGER',
                'URGENCY', 'Trigger Reason', 'AI Category', 'Opportunity Score',
                'Time Zone', 'Build Priority', 'Seasonal Event']
-    for ci, h in enumerate(headers, 1):
-        c = ws.cell(row=1, column=ci, value=h)
-        c.fill = header_fill; c.font = header_font; c.alignment = Alignment(horizontal='center')
+    sheet = SheetModel('DATA_FEED', header=headers, header_style='enh.header', freeze='A2',
+                       rules=DATA_FEED_RULES)
 
     date_str = datetime.now().strftime('%Y-%m-%d')
     if 'author' not in df_today.columns:
-        ws['A2'] = 'No author data available'
-        ws.freeze_panes = 'A2'
-        return
+        sheet.note = 'No author data available'
+        return sheet
 
     your_mask = df_today['author'].str.lower().isin([a.lower() for a in YOUR_ACCOUNTS])
     your_posts = df_today[your_mask].copy()
@@ -1362,16 +1441,15 @@ def _build_data_feed_tab(ws, df_today, header_fill, header_font, thin_border, cy
     tz_label = '\U0001f7e2 PRIME' if 8 <= now_hour <= 22 else 'OFF_PEAK'
     seasonal_text = ''
     try:
-        from seasonal_calendar import get_seasonal_alerts
-        from datetime import date
-        alerts = get_seasonal_alerts(date.today())
+        alerts = seasonal_alerts if seasonal_alerts is not None else _seasonal_alerts_today()
         if alerts: seasonal_text = alerts[0].get('event', '')
     except Exception: pass
 
-    from daily_processor import calculate_tutorial_trigger
+    triggers = TUTORIAL_TRIGGER_RULES.apply(your_posts)
+    your_posts[['TUTORIAL_TRIGGER', 'URGENCY', 'trigger_reason']] = triggers[['TUTORIAL_TRIGGER', 'URGENCY', 'trigger_reason']]
 
-    for ri, (_, row) in enumerate(your_posts.iterrows(), 2):
-        trigger, urgency, reason = calculate_tutorial_trigger(row)
+    for row in your_posts.to_dict('records'):
+        trigger, urgency, reason = row['TUTORIAL_TRIGGER'], row['URGENCY'], row['trigger_reason']
         mom = float(row.get('momentum_score', 0))
         shares_h = float(row.get('shares_per_hour', 0))
         age = float(row.get('age_hours', 0))
@@ -1392,32 +1470,15 @@ def _build_data_feed_tab(ws, df_today, header_fill, header_font, thin_border, cy
                 str(row.get('webVideoUrl','')), trigger, urgency, reason,
                 str(row.get('AI_CATEGORY','')) if pd.notna(row.get('AI_CATEGORY')) else '',
                 opp_score, tz_label, build_pri, seasonal_text]
-        for ci, val in enumerate(vals, 1):
-            c = ws.cell(row=ri, column=ci, value=_sanitize_cell(val))
-            c.border = thin_border
-            if ci <= 11: c.fill = cyan_fill
-        # Trigger colors
-        trig_cell = ws.cell(row=ri, column=12)
-        if 'MAKE_NOW' in str(trigger):
-            trig_cell.fill = PatternFill('solid', fgColor='FF0000')
-            trig_cell.font = Font(bold=True, color='FFFFFF')
-        elif 'WATCH' in str(trigger):
-            trig_cell.fill = PatternFill('solid', fgColor='FFFF00')
-        urg_cell = ws.cell(row=ri, column=13)
-        if 'URGENT' in str(urgency):
-            urg_cell.fill = PatternFill('solid', fgColor='8B0000')
-            urg_cell.font = Font(bold=True, color='FFFFFF')
-        elif 'HIGH' in str(urgency):
-            urg_cell.fill = PatternFill('solid', fgColor='FFA500')
-        url_cell = ws.cell(row=ri, column=11)
+        cells = [Styled(_sanitize_cell(val), 'enh.cell') for val in vals]
         uv = str(row.get('webVideoUrl',''))
         if uv.startswith('http'):
-            url_cell.hyperlink = uv
-            url_cell.font = Font(color='0000FF', underline='single')
+            cells[10].style = 'enh.link'
+            cells[10].link = uv
+        sheet.rows.append(cells)
 
-    ws.freeze_panes = 'A2'
-    for col, w in [('A',12),('B',20),('C',50),('D',10),('E',12),('F',15),('G',15),('H',10),('I',10),('K',50),('L',18),('N',30)]:
-        ws.column_dimensions[col].width = w
+    sheet.widths = dict([('A',12),('B',20),('C',50),('D',10),('E',12),('F',15),('G',15),('H',10),('I',10),('K',50),('L',18),('N',30)])
+    return sheet
 
 
 # =============================================================================
@@ -1448,8 +1509,8 @@ def _extract_post_month(url):
     return d[:7] if d else None
 
 
-def _build_payments_tab(ws, existing_revenue, header_fill, header_font, thin_border):
-    """Build PAYMENTS tab: day-by-day Pioneer Programme breakdown.
+def _payments_sheet(existing_revenue) -> SheetModel:
+    """PAYMENTS tab: day-by-day Pioneer Programme breakdown.
     
     Sorted by post date (extracted from video ID).
     Color coding: green = at $2,500 cap, yellow = earning, orange = pending/no revenue.
@@ -1457,17 +1518,12 @@ def _build_payments_tab(ws, existing_revenue, header_fill, header_font, thin_bor
     headers = ['TikTok URL', 'Account', 'Post Date', 'Received ($)',
                'Estimated ($)', 'US & EU3 Installs', 'ROW Installs',
                'Total Installs', 'Status']
-    for ci, h in enumerate(headers, 1):
-        c = ws.cell(row=1, column=ci, value=h)
-        c.fill = header_fill
-        c.font = header_font
-        c.alignment = Alignment(horizontal='center')
-        c.border = thin_border
+    sheet = SheetModel('PAYMENTS', header=headers, header_style='enh.header.boxed', freeze='A2',
+                       rules=PAYMENTS_RULES)
 
     if existing_revenue is None or len(existing_revenue) == 0:
-        ws.cell(row=2, column=1, value='No revenue data available')
-        ws.freeze_panes = 'A2'
-        return
+        sheet.note = 'No revenue data available'
+        return sheet
 
     # Build payment rows with post dates
     rows = []
@@ -1477,9 +1533,8 @@ def _build_payments_tab(ws, existing_revenue, header_fill, header_font, thin_bor
             url_col = col_name
             break
     if not url_col:
-        ws.cell(row=2, column=1, value='Could not find URL column in revenue data')
-        ws.freeze_panes = 'A2'
-        return
+        sheet.note = 'Could not find URL column in revenue data'
+        return sheet
 
     for _, row in existing_revenue.iterrows():
         url = str(row.get(url_col, ''))
@@ -1511,42 +1566,24 @@ def _build_payments_tab(ws, existing_revenue, header_fill, header_font, thin_bor
     # Sort by post date descending (newest first)
     rows.sort(key=lambda r: r['post_date'], reverse=True)
 
-    # Color fills
-    green_fill = PatternFill('solid', fgColor='C6EFCE')    # Capped
-    yellow_fill = PatternFill('solid', fgColor='FFEB9C')    # Earning
-    orange_fill = PatternFill('solid', fgColor='FFE4B5')    # Pending
-    gray_fill = PatternFill('solid', fgColor='F2F2F2')      # No revenue
-
-    for ri, r in enumerate(rows, 2):
-        ws.cell(row=ri, column=1, value=_sanitize_cell(r['url'])).border = thin_border
-        ws.cell(row=ri, column=2, value=_sanitize_cell(r['account'])).border = thin_border
-        ws.cell(row=ri, column=3, value=_sanitize_cell(r['post_date'])).border = thin_border
-        ws.cell(row=ri, column=4, value=r['received']).border = thin_border
-        ws.cell(row=ri, column=4).number_format = '$#,##0.00'
-        ws.cell(row=ri, column=5, value=r['estimated']).border = thin_border
-        ws.cell(row=ri, column=5).number_format = '$#,##0.00'
-        ws.cell(row=ri, column=6, value=int(r['us_eu3'])).border = thin_border
-        ws.cell(row=ri, column=7, value=int(r['row_installs'])).border = thin_border
-        ws.cell(row=ri, column=8, value=int(r['total'])).border = thin_border
-        ws.cell(row=ri, column=9, value=r['status']).border = thin_border
-
-        # Color coding by status
-        if r['status'] == 'CAPPED':
-            fill = green_fill
-        elif r['status'] == 'EARNING':
-            fill = yellow_fill
-        elif r['status'] == 'PENDING':
-            fill = orange_fill
-        else:
-            fill = gray_fill
-        
-        for ci in range(1, 10):
-            ws.cell(row=ri, column=ci).fill = fill
-
-    ws.freeze_panes = 'A2'
-    for col, w in [('A', 55), ('B', 22), ('C', 12), ('D', 12), ('E', 12),
-                   ('F', 15), ('G', 12), ('H', 12), ('I', 14)]:
-        ws.column_dimensions[col].width = w
+    # Color coding by status (PAYMENTS_RULES): green = capped, yellow =
+    # earning, orange = pending, gray = no revenue
+    for r in rows:
+        sheet.rows.append([
+            Styled(_sanitize_cell(r['url']), 'enh.cell'),
+            Styled(_sanitize_cell(r['account']), 'enh.cell'),
+            Styled(_sanitize_cell(r['post_date']), 'enh.cell'),
+            Styled(r['received'], 'enh.money'),
+            Styled(r['estimated'], 'enh.money'),
+            Styled(int(r['us_eu3']), 'enh.cell'),
+            Styled(int(r['row_installs']), 'enh.cell'),
+            Styled(int(r['total']), 'enh.cell'),
+            Styled(r['status'], 'enh.cell'),
+        ])
+
+    sheet.widths = dict([('A', 55), ('B', 22), ('C', 12), ('D', 12), ('E', 12),
+                         ('F', 15), ('G', 12), ('H', 12), ('I', 14)])
+    return sheet
 
 
 def _build_monthly_revenue_tab(ws, existing_revenue, header_fill, header_font, thin_border):
@@ -1555,6 +1592,7 @@ def _build_monthly_revenue_tab(ws, existing_revenue, header_fill, header_font, t
     Groups templates by post month (extracted from video ID).
     Shows templates posted, received, estimated, installs, at cap, with revenue, growth %.
     """
+    st = styles_for(ws)
     # Main summary headers
     headers = ['Month', 'Templates', 'Received ($)', 'Estimated ($)',
                'US & EU3 Installs', 'ROW Installs', 'Total Installs',
@@ -1618,36 +1656,23 @@ def _build_monthly_revenue_tab(ws, existing_revenue, header_fill, header_font, t
     # Sort by month
     sorted_months = sorted(monthly.keys())
 
-    # Write monthly rows
-    gold_fill = PatternFill('solid', fgColor='FFD700')
+    # Write monthly rows (bold when the month has at-cap templates)
     for ri, month in enumerate(sorted_months, 2):
         m = monthly[month]
         cap_rate = (m['at_cap'] / m['templates'] * 100) if m['templates'] > 0 else 0
         avg_rev = (m['received'] / m['templates']) if m['templates'] > 0 else 0
         rev_install = (m['received'] / m['total']) if m['total'] > 0 else 0
-
-        ws.cell(row=ri, column=1, value=month).border = thin_border
-        ws.cell(row=ri, column=2, value=m['templates']).border = thin_border
-        ws.cell(row=ri, column=3, value=m['received']).border = thin_border
-        ws.cell(row=ri, column=3).number_format = '$#,##0.00'
-        ws.cell(row=ri, column=4, value=m['estimated']).border = thin_border
-        ws.cell(row=ri, column=4).number_format = '$#,##0.00'
-        ws.cell(row=ri, column=5, value=int(m['us_eu3'])).border = thin_border
-        ws.cell(row=ri, column=6, value=int(m['row_installs'])).border = thin_border
-        ws.cell(row=ri, column=7, value=int(m['total'])).border = thin_border
-        ws.cell(row=ri, column=8, value=m['at_cap']).border = thin_border
-        ws.cell(row=ri, column=9, value=m['with_revenue']).border = thin_border
-        ws.cell(row=ri, column=10, value=round(cap_rate, 1)).border = thin_border
-        ws.cell(row=ri, column=10).number_format = '0.0%'
-        ws.cell(row=ri, column=11, value=round(avg_rev, 2)).border = thin_border
-        ws.cell(row=ri, column=11).number_format = '$#,##0.00'
-        ws.cell(row=ri, column=12, value=round(rev_install, 2)).border = thin_border
-        ws.cell(row=ri, column=12).number_format = '$#,##0.00'
-
-        # Highlight row if it has at-cap templates
-        if m['at_cap'] > 0:
-            for ci in range(1, 13):
-                ws.cell(row=ri, column=ci).font = Font(bold=True)
+        bold = '.bold' if m['at_cap'] > 0 else ''
+
+        for ci, val, kind in [
+            (1, month, 'cell'), (2, m['templates'], 'cell'),
+            (3, m['received'], 'money'), (4, m['estimated'], 'money'),
+            (5, int(m['us_eu3']), 'cell'), (6, int(m['row_installs']), 'cell'),
+            (7, int(m['total']), 'cell'), (8, m['at_cap'], 'cell'),
+            (9, m['with_revenue'], 'cell'), (10, round(cap_rate, 1), 'pct'),
+            (11, round(avg_rev, 2), 'money'), (12, round(rev_install, 2), 'money'),
+        ]:
+            st.apply(ws.cell(row=ri, column=ci, value=val), f'enh.{kind}{bold}')
 
     # TOTAL row
     total_row = len(sorted_months) + 2
@@ -1656,8 +1681,8 @@ def _build_monthly_revenue_tab(ws, existing_revenue, header_fill, header_font, t
     total_avg_rev = (totals.get('received', 0) / totals.get('templates', 1)) if totals.get('templates', 0) > 0 else 0
     total_rev_install = (totals.get('received', 0) / totals.get('total', 1)) if totals.get('total', 0) > 0 else 0
 
-    total_fill = PatternFill('solid', fgColor='1F4E78')
-    total_font = Font(bold=True, color='FFFFFF', size=11)
+    total_styles = {3: 'enh.total.money', 4: 'enh.total.money', 10: 'enh.total.pct',
+                    11: 'enh.total.money', 12: 'enh.total.money'}
     for ci, val in enumerate([
         'TOTAL', totals.get('templates', 0),
         totals.get('received', 0), totals.get('estimated', 0),
@@ -1666,15 +1691,7 @@ def _build_monthly_revenue_tab(ws, existing_revenue, header_fill, header_font, t
         totals.get('with_revenue', 0), round(total_cap_rate, 1),
         round(total_avg_rev, 2), round(total_rev_install, 2)
     ], 1):
-        c = ws.cell(row=total_row, column=ci, value=val)
-        c.fill = total_fill
-        c.font = total_font
-        c.border = thin_border
-    ws.cell(row=total_row, column=3).number_format = '$#,##0.00'
-    ws.cell(row=total_row, column=4).number_format = '$#,##0.00'
-    ws.cell(row=total_row, column=10).number_format = '0.0%'
-    ws.cell(row=total_row, column=11).number_format = '$#,##0.00'
-    ws.cell(row=total_row, column=12).number_format = '$#,##0.00'
+        st.apply(ws.cell(row=total_row, column=ci, value=val), total_styles.get(ci, 'enh.total'))
 
     # Empty row then MONTH-OVER-MONTH GROWTH section
     growth_header_row = total_row + 2
@@ -1707,17 +1724,15 @@ def _build_monthly_revenue_tab(ws, existing_revenue, header_fill, header_font, t
             pace = 'Flat'
             pace_icon = '\u2796'
 
-        ws.cell(row=ri, column=1, value=month).border = thin_border
-        ws.cell(row=ri, column=2, value=m['received']).border = thin_border
-        ws.cell(row=ri, column=2).number_format = '$#,##0.00'
-        ws.cell(row=ri, column=3, value=change).border = thin_border
-        ws.cell(row=ri, column=3).number_format = '$#,##0.00'
+        st.apply(ws.cell(row=ri, column=1, value=month), 'enh.cell')
+        st.apply(ws.cell(row=ri, column=2, value=m['received']), 'enh.money')
+        st.apply(ws.cell(row=ri, column=3, value=change), 'enh.money')
         if prev_rev > 0:
-            ws.cell(row=ri, column=4, value=f'{change_pct:.1f}%').border = thin_border
+            st.apply(ws.cell(row=ri, column=4, value=f'{change_pct:.1f}%'), 'enh.cell')
         else:
-            ws.cell(row=ri, column=4, value='N/A').border = thin_border
-        ws.cell(row=ri, column=5, value=m['templates']).border = thin_border
-        ws.cell(row=ri, column=6, value=f'{pace_icon} {pace}').border = thin_border
+            st.apply(ws.cell(row=ri, column=4, value='N/A'), 'enh.cell')
+        st.apply(ws.cell(row=ri, column=5, value=m['templates']), 'enh.cell')
+        st.apply(ws.cell(row=ri, column=6, value=f'{pace_icon} {pace}'), 'enh.cell')
         
         prev_rev = m['received']
 
@@ -1752,26 +1767,13 @@ def _load_existing_revenue(dashboard_path, live_revenue_df=None):
         primary_df = live_revenue_df
         primary_source = f"Google Sheet ({len(live_revenue_df)} entries)"
     
-    # Priority 2: Dashboard file
+    # Priority 2: Dashboard file (via its state sidecar, see dashboard_store.py)
     if primary_df is None and dashboard_path and os.path.exists(dashboard_path):
         try:
-            wb = load_workbook(dashboard_path, data_only=True)
-            if 'REVENUE_TRACKER' in wb.sheetnames:
-                ws = wb['REVENUE_TRACKER']
-                data = []
-                headers = [ws.cell(1, c).value for c in range(1, 20)]
-                for ri in range(2, ws.max_row + 1):
-                    row_data = {}
-                    has_data = False
-                    for ci in range(1, 20):
-                        val = ws.cell(ri, ci).value
-                        col_name = headers[ci-1] if ci-1 < len(headers) else f'col_{ci}'
-                        row_data[col_name] = val
-                        if val is not None and str(val).strip() != '': has_data = True
-                    if has_data: data.append(row_data)
-                if data:
-                    primary_df = pd.DataFrame(data)
-                    primary_source = f"dashboard file ({len(data)} entries)"
+            tracker_df = dashboard_store.load_revenue_tracker(dashboard_path)
+            if tracker_df is not None:
+                primary_df = tracker_df
+                primary_source = f"dashboard file ({len(tracker_df)} entries)"
         except Exception as e:
             print(f"  Warning: Could not load revenue from file: {e}")
     
@@ -1831,26 +1833,214 @@ def _load_existing_revenue(dashboard_path, live_revenue_df=None):
         return primary_df
 
 
-def _load_existing_prediction_log(dashboard_path):
-    if not dashboard_path or not os.path.exists(dashboard_path):
+def _latest_score(scores: pd.DataFrame) -> Optional[Dict]:
+    """Last row of backtest.score_pairs() output as a dict, or None."""
+    if scores is None or len(scores) == 0:
         return None
+    return scores.iloc[-1:].to_dict('records')[0]
+
+
+def _load_prediction_log_window(cache_dir, dashboard_path=None):
+    """PREDICTION_LOG history shown above today's row, from the prediction log store.
+
+    The first time, rows already in an existing dashboard's PREDICTION_LOG
+    tab are imported into the store.
+    """
     try:
-        wb = load_workbook(dashboard_path, data_only=True)
-        if 'PREDICTION_LOG' not in wb.sheetnames: return None
-        ws = wb['PREDICTION_LOG']
-        data = []
-        for ri in range(2, ws.max_row + 1):
-            row_data = [ws.cell(ri, c).value for c in range(1, 11)]
-            if any(v is not None and str(v).strip() != '' for v in row_data):
-                data.append(row_data)
-        if not data: return None
-        headers = [ws.cell(1, c).value for c in range(1, 11)]
-        return pd.DataFrame(data, columns=headers)
+        if not prediction_log.has_log(cache_dir) and dashboard_path and os.path.exists(dashboard_path):
+            imported = prediction_log.import_legacy(cache_dir, dashboard_store.load_prediction_log(dashboard_path))
+            if imported:
+                print(f"  Imported {imported} PREDICTION_LOG rows into {prediction_log.log_dir(cache_dir)}")
+        return prediction_log.read_window(cache_dir)
     except Exception as e:
         print(f"  Warning: Could not load prediction log: {e}")
         return None
 
 
+# =============================================================================
+# PER-RUN ANALYSIS CONTEXT
+# =============================================================================
+
+def find_dashboard_file(cache_dir: str, output_dir: str = '.') -> Optional[str]:
+    """Locate an existing TikTok_Dashboard_With_Revenue.xlsx, if any."""
+    for candidate in [
+        os.path.join(cache_dir, 'TikTok_Dashboard_With_Revenue.xlsx'),
+        os.path.join(output_dir, 'TikTok_Dashboard_With_Revenue.xlsx'),
+        'data/TikTok_Dashboard_With_Revenue.xlsx',
+    ]:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def _union_by_url(*frames) -> Optional[pd.DataFrame]:
+    frames = [f for f in frames if f is not None and len(f) > 0]
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True).drop_duplicates(subset=['webVideoUrl'], keep='first')
+
+
+@dataclass
+class AnalysisContext:
+    """Market-independent artifacts computed once per run.
+
+    Shared by the US / UK / combined enhanced workbooks and the daily
+    briefing; each takes slices instead of reloading or recomputing.
+    """
+    cache_dir: str
+    dashboard_path: Optional[str]
+    seasonal_alerts: List[Dict]
+    existing_revenue: Optional[pd.DataFrame]
+    existing_prediction_log: Optional[pd.DataFrame]
+    competitor_history: Optional[Dict]
+    yesterday: Optional[pd.DataFrame]      # URL-deduplicated US+UK union
+    two_days: Optional[pd.DataFrame]       # URL-deduplicated US+UK union
+    predictions: pd.DataFrame              # velocity predictions on today's union, all ages
+    streaks: Optional[StreakLedger] = None  # advanced once; committed at the end of the run
+    prediction_pairs: Optional[pd.DataFrame] = None  # yesterday's predictions vs today's momentum (backtest)
+    sheet_models: Dict[str, Dict[str, SheetModel]] = field(default_factory=dict)  # workbook path -> tabs
+
+    @property
+    def has_velocity(self) -> bool:
+        if self.yesterday is not None and len(self.yesterday) > 0:
+            return True
+        return 'has_velocity_data' in self.predictions.columns and bool(self.predictions['has_velocity_data'].any())
+
+    def predictions_for(self, df_market: pd.DataFrame, max_age: float = 72) -> pd.DataFrame:
+        """Prediction rows for one market's URLs (fresh only), in that market's order."""
+        if 'webVideoUrl' not in df_market.columns or len(self.predictions) == 0:
+            return self.predictions.iloc[0:0].copy()
+        pred = self.predictions
+        if max_age is not None and 'age_hours' in pred.columns:
+            pred = pred[pred['age_hours'] <= max_age]
+        urls = df_market[['webVideoUrl']].drop_duplicates()
+        out = urls.merge(pred, on='webVideoUrl', how='inner')
+        if self.streaks is not None:
+            out['velocity_nonpos_streak'] = self.streaks.streaks_for(out['webVideoUrl'])
+        return out
+
+    def accuracy_for(self) -> Optional[Dict]:
+        """Yesterday's predictions scored against today's US+UK union.
+
+        Run-wide, like the logged history, so every workbook's
+        PREDICTION_LOG shows the same rows.
+        """
+        if self.prediction_pairs is None or len(self.prediction_pairs) == 0:
+            return None
+        return _latest_score(backtest.score_pairs(self.prediction_pairs))
+
+    def commit(self) -> None:
+        """Write the run's state once its workbooks are built.
+
+        Saves the velocity streak ledger and appends today's backtest to the
+        prediction log.
+        """
+        if self.streaks is not None:
+            self.streaks.commit()
+        if self.prediction_pairs is not None and len(self.prediction_pairs) > 0:
+            prediction_log.append_day(self.cache_dir, self.prediction_pairs)
+
+    def competitor_intel_for(self, df_today: pd.DataFrame) -> Optional[Dict]:
+        """7-day competitor intel for one workbook, reusing the loaded history."""
+        if self.competitor_history is None:
+            return None
+        try:
+            from competitor_intel_patch import build_competitor_intel
+            return build_competitor_intel(df_today, self.cache_dir, history=self.competitor_history)
+        except Exception as e:
+            print(f"  [WARNING] Could not build competitor intel: {e}")
+            return None
+
+
+def build_analysis_context(
+    combined_data: pd.DataFrame,
+    yesterday_us: pd.DataFrame = None,
+    yesterday_uk: pd.DataFrame = None,
+    two_days_us: pd.DataFrame = None,
+    two_days_uk: pd.DataFrame = None,
+    cache_dir: str = None,
+    output_dir: str = '.',
+    dashboard_path: str = None,
+    live_revenue_df: pd.DataFrame = None,
+    needs: set = None
+) -> AnalysisContext:
+    """Load/compute everything that does not depend on the market, once.
+
+    Velocity predictions run on the URL-deduplicated union of today's data.
+    The velocity streak ledger is loaded and advanced once here, over the
+    fresh union, and yesterday's predictions are scored against today; the
+    caller writes both with context.commit() once the run's workbooks are
+    built.
+
+    needs (see tab_inputs; None = everything) skips loading revenue, the
+    prediction log or competitor history, and computing predictions, when
+    no selected output uses them.
+    """
+    needs = set(TAB_INPUTS_ALL if needs is None else needs)
+    cache_dir = cache_dir or os.environ.get('CACHE_DIR', 'data')
+    if not dashboard_path:
+        dashboard_path = find_dashboard_file(cache_dir, output_dir)
+        if dashboard_path:
+            print(f"  Found existing dashboard: {dashboard_path}")
+
+    try:
+        seasonal_alerts = _seasonal_alerts_today()
+    except Exception as e:
+        print(f"  [WARNING] Could not load seasonal alerts: {e}")
+        seasonal_alerts = []
+
+    existing_revenue = existing_prediction_log = competitor_history = None
+    if 'revenue' in needs:
+        existing_revenue = _load_existing_revenue(dashboard_path, live_revenue_df=live_revenue_df)
+    if 'prediction_log' in needs:
+        existing_prediction_log = _load_prediction_log_window(cache_dir, dashboard_path)
+
+    if 'competitor_intel' in needs:
+        try:
+            from competitor_intel_patch import load_competitor_history
+            competitor_history = load_competitor_history(cache_dir)
+        except Exception as e:
+            print(f"  [WARNING] Could not load competitor history: {e}")
+
+    yesterday = _union_by_url(yesterday_us, yesterday_uk)
+    two_days = _union_by_url(two_days_us, two_days_uk)
+
+    prediction_pairs = None
+    if 'backtest' in needs:
+        try:
+            prediction_pairs = backtest.score_today(cache_dir, combined_data)
+        except Exception as e:
+            print(f"  [WARNING] Could not score yesterday's predictions: {e}")
+
+    if 'predictions' in needs:
+        today = _ensure_calculated_metrics(combined_data)
+        if 'webVideoUrl' in today.columns:
+            today = today.drop_duplicates(subset=['webVideoUrl'], keep='first')
+        predictions = calculate_velocity_predictions(today, yesterday, two_days, cache_dir=cache_dir)
+
+        # Variant streaks advance once per run, over the fresh union
+        fresh = predictions[predictions['age_hours'] <= 72] if 'age_hours' in predictions.columns else predictions
+        streaks = StreakLedger.load(os.path.join(cache_dir, 'velocity_streak_cache.json'))
+        streaks.update(fresh['webVideoUrl'], fresh['velocity'])
+    else:
+        predictions = pd.DataFrame(columns=['webVideoUrl'])
+        streaks = None
+
+    return AnalysisContext(
+        cache_dir=cache_dir,
+        dashboard_path=dashboard_path,
+        seasonal_alerts=seasonal_alerts,
+        existing_revenue=existing_revenue,
+        existing_prediction_log=existing_prediction_log,
+        competitor_history=competitor_history,
+        yesterday=yesterday,
+        two_days=two_days,
+        predictions=predictions,
+        streaks=streaks,
+        prediction_pairs=prediction_pairs,
+    )
+
+
 # =============================================================================
 # DAILY BRIEFING - STRATEGIC ANALYSIS TEXT
 # =============================================================================
@@ -1859,13 +2049,17 @@ def generate_daily_briefing(
     df_today: pd.DataFrame,
     df_yesterday: pd.DataFrame = None,
     output_dir: str = '.',
-    cache_path: str = None
+    cache_path: str = None,
+    context: AnalysisContext = None
 ) -> str:
     """
     Generate written daily briefing with:
     1. Immediate Actions - top trends to build RIGHT NOW
     2. Strategic Insights - competitor analysis across ALL 6 competitors
     
+    With an AnalysisContext the velocity predictions computed for the
+    enhanced workbooks are reused instead of recalculated.
+    
     Returns the briefing text.
     """
     from datetime import datetime
@@ -1889,7 +2083,10 @@ def generate_daily_briefing(
     
     # Calculate velocity if yesterday available
     has_velocity = False
-    if df_yesterday is not None and len(df_yesterday) > 0:
+    if context is not None and context.has_velocity:
+        velocity_df = context.predictions[context.predictions['webVideoUrl'].isin(df['webVideoUrl'])]
+        has_velocity = True
+    elif df_yesterday is not None and len(df_yesterday) > 0:
         velocity_df = calculate_velocity_predictions(df, df_yesterday)
         has_velocity = True
     else:
@@ -2141,52 +2338,75 @@ def integrate_with_daily_processor(
     two_days_uk: pd.DataFrame = None,
     output_dir: str = '.',
     dashboard_path: str = None,
-    live_revenue_df: pd.DataFrame = None
+    live_revenue_df: pd.DataFrame = None,
+    combined_data: pd.DataFrame = None,
+    scheduler=None,
+    context: AnalysisContext = None,
+    outputs: Dict = None
 ) -> Dict[str, str]:
-    """Main integration function - generates enhanced files with revenue tracking."""
+    """Main integration function - generates enhanced files with revenue tracking.
+
+    combined_data is the URL-deduplicated union from build_enriched_frames();
+    when omitted the US and UK frames are concatenated here. With a
+    RenderScheduler the three workbooks are queued rather than written.
+    context is the run's AnalysisContext; built here when not supplied, in
+    which case it is also committed here (streaks, prediction log).
+    outputs maps 'us_enhanced' / 'uk_enhanced' / 'combined_enhanced' to
+    the tabs to build (None = all); files not in it are skipped
+    (outputs=None builds all three in full).
+    """
     date_str = datetime.now().strftime('%Y-%m-%d')
     output_files = {}
     cache_dir = os.environ.get('CACHE_DIR', 'data')
     streak_cache_path = os.path.join(cache_dir, 'velocity_streak_cache.json')
 
-    # Auto-detect dashboard file
-    if not dashboard_path:
-        for candidate in [
-            os.path.join(cache_dir, 'TikTok_Dashboard_With_Revenue.xlsx'),
-            os.path.join(output_dir, 'TikTok_Dashboard_With_Revenue.xlsx'),
-            'data/TikTok_Dashboard_With_Revenue.xlsx',
-        ]:
-            if os.path.exists(candidate):
-                dashboard_path = candidate
-                print(f"  Found existing dashboard: {candidate}")
-                break
+    if us_data is not None and uk_data is not None:
+        if combined_data is not None and len(combined_data) > 0:
+            combined = combined_data
+        else:
+            combined = pd.concat([us_data, uk_data], ignore_index=True)
+    else:
+        combined = us_data if us_data is not None else uk_data
+    if combined is None or len(combined) == 0:
+        return output_files
+
+    if outputs is None:
+        outputs = dict.fromkeys(ENHANCED_OUTPUTS)
+    wanted = {key: tabs for key, tabs in outputs.items() if key in ENHANCED_OUTPUTS}
+    if not wanted:
+        return output_files
+
+    own_context = context is None
+    if own_context:
+        context = build_analysis_context(
+            combined, yesterday_us, yesterday_uk, two_days_us, two_days_uk,
+            cache_dir=cache_dir, output_dir=output_dir,
+            dashboard_path=dashboard_path, live_revenue_df=live_revenue_df,
+            needs=set().union(*(tab_inputs(tabs) for tabs in wanted.values()))
+        )
 
-    if us_data is not None and len(us_data) > 0:
+    if 'us_enhanced' in wanted and us_data is not None and len(us_data) > 0:
         us_path = f"{output_dir}/BUILD_TODAY_US_ENHANCED_{date_str}.xlsx"
-        create_enhanced_excel(us_data, yesterday_us, two_days_us, us_path,
-                              cache_path=streak_cache_path, dashboard_path=dashboard_path,
-                              live_revenue_df=live_revenue_df)
+        create_enhanced_excel(us_data, output_path=us_path, cache_path=streak_cache_path,
+                              scheduler=scheduler, context=context, tabs=wanted['us_enhanced'])
         output_files['us_enhanced'] = us_path
 
-    if uk_data is not None and len(uk_data) > 0:
+    if 'uk_enhanced' in wanted and uk_data is not None and len(uk_data) > 0:
         uk_path = f"{output_dir}/BUILD_TODAY_UK_ENHANCED_{date_str}.xlsx"
-        create_enhanced_excel(uk_data, yesterday_uk, two_days_uk, uk_path,
-                              cache_path=streak_cache_path, dashboard_path=dashboard_path,
-                              live_revenue_df=live_revenue_df)
+        create_enhanced_excel(uk_data, output_path=uk_path, cache_path=streak_cache_path,
+                              scheduler=scheduler, context=context, tabs=wanted['uk_enhanced'])
         output_files['uk_enhanced'] = uk_path
 
-    if us_data is not None and uk_data is not None:
-        combined = pd.concat([us_data, uk_data], ignore_index=True)
-        combined_yesterday = None
-        if yesterday_us is not None and yesterday_uk is not None:
-            combined_yesterday = pd.concat([yesterday_us, yesterday_uk], ignore_index=True)
-            combined_yesterday = combined_yesterday.drop_duplicates(subset=['webVideoUrl'], keep='first')
+    if 'combined_enhanced' in wanted and us_data is not None and uk_data is not None:
         combined_path = f"{output_dir}/BUILD_TODAY_COMBINED_ENHANCED_{date_str}.xlsx"
-        create_enhanced_excel(combined, combined_yesterday, None, combined_path,
-                              cache_path=streak_cache_path, dashboard_path=dashboard_path,
-                              live_revenue_df=live_revenue_df)
+        create_enhanced_excel(combined, output_path=combined_path, cache_path=streak_cache_path,
+                              scheduler=scheduler, context=context, tabs=wanted['combined_enhanced'])
         output_files['combined_enhanced'] = combined_path
 
+    # A caller-supplied context is committed by the caller at the end of its run
+    if own_context:
+        context.commit()
+
     return output_files
 
 
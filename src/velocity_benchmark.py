@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+VELOCITY BENCHMARK
+Micro-benchmark of the velocity prediction path on synthetic trends:
+
+    fit       velocity_engine.fit_velocity over today + yesterday + 2 days
+    kernel    v35_enhancements.prediction_kernel (predictions + labels)
+    full      calculate_velocity_predictions end to end (merges, fit, kernel)
+
+Each size is run a few times and the best wall time kept; the last column
+is the kernel cost per trend, which should stay flat as the size grows.
+
+Usage:
+  python velocity_benchmark.py                      # 1k, 10k, 100k, 1M trends
+  python velocity_benchmark.py 5000 50000           # custom sizes
+  VELOCITY_BENCH_REPEATS=5 python velocity_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import velocity_engine
+from v35_enhancements import calculate_velocity_predictions, prediction_kernel
+
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def synthetic_days(n: int, seed: int = 42):
+    """Today / yesterday / 2-days-ago frames for n trends (most seen all three days)."""
+    rng = np.random.default_rng(seed)
+    urls = np.array([f'https://www.tiktok.com/@bench/video/{i}' for i in range(n)], dtype=object)
+    momentum_2d = rng.uniform(100, 5000, n)
+    velocity = rng.normal(0, 150, n)
+    acceleration = rng.normal(-10, 40, n)
+
+    def frame(days_ago, keep):
+        t = -days_ago
+        momentum = np.maximum(momentum_2d + velocity * (t + 2) + 0.5 * acceleration * (t + 2) ** 2, 0)
+        return pd.DataFrame({
+            'webVideoUrl': urls[keep],
+            'momentum_score': momentum[keep],
+            'age_hours': rng.uniform(1, 72, n)[keep] + days_ago * 24,
+            'shares_per_hour': rng.uniform(1, 200, n)[keep],
+        })
+
+    everything = np.ones(n, dtype=bool)
+    return (frame(0, everything), frame(1, rng.random(n) < 0.8), frame(2, rng.random(n) < 0.6))
+
+
+def best_time(fn, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=DEFAULT_SIZES, repeats: int = 3) -> pd.DataFrame:
+    rows = []
+    for n in sizes:
+        today, yesterday, two_days = synthetic_days(n)
+        now = pd.Timestamp.now(tz='UTC')
+        obs = velocity_engine.collect_observations(today, frames=[yesterday, two_days], now=now)
+        fitted = today.merge(velocity_engine.fit_velocity(obs), on='webVideoUrl', how='left')
+        fitted[['velocity', 'acceleration']] = fitted[['velocity', 'acceleration']].fillna(0)
+
+        fit_s = best_time(lambda: velocity_engine.fit_velocity(obs), repeats)
+        kernel_s = best_time(lambda: prediction_kernel(fitted.copy()), repeats)
+        full_s = best_time(lambda: calculate_velocity_predictions(today, yesterday, two_days), repeats)
+        rows.append({
+            'trends': n,
+            'fit_s': fit_s,
+            'kernel_s': kernel_s,
+            'full_s': full_s,
+            'kernel_us_per_trend': kernel_s / n * 1e6,
+        })
+        print(f"  {n:>9,} trends: fit {fit_s:7.3f}s  kernel {kernel_s:7.3f}s  "
+              f"full {full_s:7.3f}s  ({kernel_s / n * 1e6:.2f} µs/trend)")
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)
+    repeats = int(os.environ.get('VELOCITY_BENCH_REPEATS', 3))
+    print(f"Velocity prediction benchmark (best of {repeats})")
+    run(sizes, repeats)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+VELOCITY ENGINE
+Momentum velocity and acceleration per trend, fitted by least squares over
+every observation the system holds for a URL instead of differencing today
+against yesterday:
+
+    today                  the current scrape (t = 0)
+    yesterday / 2 days     the snapshot frames the run already loaded
+    dated snapshots        {CACHE_DIR}/snapshots/*.npz, last VELOCITY_HISTORY_DAYS
+    micro-poll checks      {CACHE_DIR}/micro_candidates.json (every ~2h)
+
+Per URL the model is
+
+    momentum(t) = m + velocity * t + 0.5 * acceleration * t^2     (t in days)
+
+fitted around t = 0 (now). All trends are solved together: per-URL moment
+sums come from np.bincount and the normal equations from one batched
+np.linalg.solve, so cost is linear in the number of observations. URLs with
+two distinct observation times (or too short a span for curvature) get the
+straight-line slope and zero acceleration; a single observation gives no
+velocity (NaN).
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import snapshot_store
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MICRO_CANDIDATES_FILE = 'micro_candidates.json'
+DEFAULT_HISTORY_DAYS = 7
+
+# Observations closer together than this (days) count as one (~1 minute):
+# yesterday's frame and yesterday's snapshot are the same capture
+TIME_RESOLUTION_DAYS = 1 / 1440
+
+# Curvature is only fitted when a URL's observations span at least this long
+QUADRATIC_MIN_SPAN_DAYS = 0.5
+
+# Frames without a captured_at column are assumed this many days old
+DEFAULT_FRAME_AGES = (1.0, 2.0)
+
+
+def history_days() -> int:
+    try:
+        return int(os.environ.get('VELOCITY_HISTORY_DAYS', DEFAULT_HISTORY_DAYS))
+    except ValueError:
+        return DEFAULT_HISTORY_DAYS
+
+
+def _utc_now() -> pd.Timestamp:
+    return pd.Timestamp(datetime.now(timezone.utc))
+
+
+def _days_before(captured_at, now: pd.Timestamp, default_days: float) -> np.ndarray:
+    """Observation times (days, negative = past) from a captured_at column."""
+    captured = pd.to_datetime(pd.Series(captured_at), errors='coerce', utc=True)
+    days = (captured - now).dt.total_seconds().to_numpy(dtype='float64') / 86400
+    return np.where(np.isnan(days), -default_days, days)
+
+
+# =============================================================================
+# OBSERVATIONS
+# =============================================================================
+
+def frame_observations(df: pd.DataFrame, now: pd.Timestamp, default_days: float = 0.0) -> pd.DataFrame:
+    """(webVideoUrl, t, momentum) rows from a frame with webVideoUrl + momentum_score."""
+    if df is None or len(df) == 0 or 'webVideoUrl' not in df.columns or 'momentum_score' not in df.columns:
+        return pd.DataFrame({'webVideoUrl': pd.Series(dtype=object), 't': pd.Series(dtype='float64'),
+                             'momentum': pd.Series(dtype='float64')})
+    if 'captured_at' in df.columns:
+        t = _days_before(df['captured_at'].to_numpy(), now, default_days)
+    else:
+        t = np.full(len(df), -default_days)
+    return pd.DataFrame({
+        'webVideoUrl': df['webVideoUrl'].to_numpy(),
+        't': t,
+        'momentum': pd.to_numeric(df['momentum_score'], errors='coerce').to_numpy(dtype='float64'),
+    })
+
+
+def snapshot_observations(cache_dir: str, now: pd.Timestamp, days: int = None) -> pd.DataFrame:
+    """Observations from the dated snapshots of both markets (last `days` dates)."""
+    days = history_days() if days is None else days
+    frames = []
+    for market in ('us', 'uk'):
+        history = snapshot_store.load_history(market, cache_dir, k=days, before=now.date())
+        frames.append(frame_observations(history, now, default_days=DEFAULT_FRAME_AGES[0]))
+    return pd.concat(frames, ignore_index=True)
+
+
+def micro_poll_observations(cache_dir: str, now: pd.Timestamp, days: int = None) -> pd.DataFrame:
+    """Observations from the micro-poller's per-candidate checks."""
+    days = history_days() if days is None else days
+    path = os.path.join(cache_dir, MICRO_CANDIDATES_FILE)
+    urls, stamps, momentum = [], [], []
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  [WARNING] Could not read micro-poll checks: {e}")
+            state = {}
+        for candidate in state.get('candidates', []):
+            for check in candidate.get('checks', []):
+                if check.get('momentum') is None or not check.get('timestamp'):
+                    continue
+                urls.append(candidate.get('url'))
+                stamps.append(check['timestamp'])
+                momentum.append(float(check['momentum']))
+    obs = pd.DataFrame({
+        'webVideoUrl': pd.Series(urls, dtype=object),
+        't': _days_before(stamps, now, np.nan) if stamps else np.array([], dtype='float64'),
+        'momentum': np.array(momentum, dtype='float64'),
+    })
+    return obs[obs['t'].notna() & (obs['t'] >= -days)]
+
+
+def collect_observations(df_today: pd.DataFrame, frames=(), cache_dir: str = None,
+                         now: pd.Timestamp = None) -> pd.DataFrame:
+    """Every usable observation of today's URLs as one long (webVideoUrl, t, momentum) frame.
+
+    frames are earlier snapshot frames already in memory (yesterday, two
+    days ago), assumed 1 and 2 days old when they carry no captured_at.
+    With a cache_dir the dated snapshots and micro-poll checks are added.
+    Repeated captures of the same URL at the same time are counted once.
+    """
+    now = _utc_now() if now is None else now
+    parts = [frame_observations(df_today, now)]
+    for i, frame in enumerate(frames):
+        default_days = DEFAULT_FRAME_AGES[min(i, len(DEFAULT_FRAME_AGES) - 1)]
+        parts.append(frame_observations(frame, now, default_days=default_days))
+    if cache_dir:
+        parts.append(snapshot_observations(cache_dir, now))
+        parts.append(micro_poll_observations(cache_dir, now))
+    obs = pd.concat(parts, ignore_index=True)
+    obs = obs[obs['momentum'].notna() & obs['webVideoUrl'].isin(parts[0]['webVideoUrl'])]
+    obs = obs.assign(slot=np.round(obs['t'].to_numpy() / TIME_RESOLUTION_DAYS))
+    return obs.drop_duplicates(subset=['webVideoUrl', 'slot'], keep='first').drop(columns='slot')
+
+
+# =============================================================================
+# FIT
+# =============================================================================
+
+def fit_velocity(obs: pd.DataFrame) -> pd.DataFrame:
+    """Least-squares velocity/acceleration for every URL in obs, in one pass.
+
+    Returns one row per URL: velocity and acceleration (momentum per day and
+    per day^2), velocity_points (distinct observation times) and
+    velocity_span_days.
+    """
+    codes, urls = pd.factorize(obs['webVideoUrl'])
+    n_urls = len(urls)
+    t = obs['t'].to_numpy(dtype='float64')
+    y = obs['momentum'].to_numpy(dtype='float64')
+
+    # Moment sums per URL: s[k] = sum(t^k), r[k] = sum(y * t^k)
+    powers = [np.ones_like(t), t, t * t, t ** 3, t ** 4]
+    s = [np.bincount(codes, weights=p, minlength=n_urls) for p in powers]
+    r = [np.bincount(codes, weights=y * p, minlength=n_urls) for p in powers[:3]]
+    points = s[0].astype(int)
+
+    t_min = np.full(n_urls, np.inf)
+    t_max = np.full(n_urls, -np.inf)
+    np.minimum.at(t_min, codes, t)
+    np.maximum.at(t_max, codes, t)
+    span = np.where(points > 0, t_max - t_min, 0.0)
+
+    velocity = np.full(n_urls, np.nan)
+    acceleration = np.zeros(n_urls)
+
+    # Straight line through 2+ distinct times
+    linear = points >= 2
+    det = s[0] * s[2] - s[1] ** 2
+    ok = linear & (det > 0)
+    velocity[ok] = (s[0][ok] * r[1][ok] - s[1][ok] * r[0][ok]) / det[ok]
+
+    # Quadratic where there is enough spread to see curvature
+    quad = (points >= 3) & (span >= QUADRATIC_MIN_SPAN_DAYS)
+    if quad.any():
+        m = np.stack([
+            np.stack([s[0], s[1], s[2]], axis=-1),
+            np.stack([s[1], s[2], s[3]], axis=-1),
+            np.stack([s[2], s[3], s[4]], axis=-1),
+        ], axis=1)[quad]
+        rhs = np.stack([r[0], r[1], r[2]], axis=-1)[quad]
+        solvable = np.abs(np.linalg.det(m)) > 1e-9
+        coef = np.zeros_like(rhs)
+        if solvable.any():
+            coef[solvable] = np.linalg.solve(m[solvable], rhs[solvable][..., None])[..., 0]
+        idx = np.flatnonzero(quad)[solvable]
+        velocity[idx] = coef[solvable, 1]
+        acceleration[idx] = 2 * coef[solvable, 2]
+
+    return pd.DataFrame({
+        'webVideoUrl': urls,
+        'velocity': velocity,
+        'acceleration': acceleration,
+        'velocity_points': points,
+        'velocity_span_days': span,
+    })
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+WORKBOOK STYLE REGISTRY
+Named cell styles shared by every openpyxl workbook builder.
+
+Builders used to create a new Font/PatternFill/Border for almost every cell
+they wrote, and openpyxl then hashed each one back into the workbook's
+de-duplicated style tables. Now every cell look is declared once, by ID,
+in the module that uses it:
+
+    register_styles({
+        'enh.cell': style(border=THIN_BORDER),
+        'enh.opp.act_now': style(border=THIN_BORDER, fill=solid('FF6B6B'), font=BOLD_FONT),
+    })
+
+and applied through the workbook's registry:
+
+    st = styles_for(ws)
+    st.apply(ws.cell(row=r, column=c, value=v), 'enh.opp.act_now')
+
+The first use of an ID in a workbook adds one (hidden) NamedStyle to it;
+every later cell just copies the cached style array, the same thing
+`cell.style = name` does minus the name lookup. Works for regular and
+write-only (WriteOnlyCell) workbooks.
+
+The same IDs double as conditional-format styles (differential_style()),
+so a rule such as "rows whose Status is SPIKING" paints with exactly the
+look a styled cell would get.
+"""
+
+from copy import copy
+from weakref import WeakKeyDictionary
+
+from openpyxl.styles import Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+
+
+# =============================================================================
+# SHARED PIECES
+# =============================================================================
+
+STYLE_PREFIX = 'tts.'
+
+THIN_SIDE = Side(style='thin')
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+BOLD_FONT = Font(bold=True)
+WHITE_BOLD_FONT = Font(bold=True, color='FFFFFF')
+LINK_FONT = Font(color='0000FF', underline='single')
+MONEY_FORMAT = '$#,##0.00'
+
+
+def solid(color: str) -> PatternFill:
+    return PatternFill('solid', fgColor=color)
+
+
+def style(font=None, fill=None, border=None, number_format=None, alignment=None) -> dict:
+    """One style spec; anything left out keeps the workbook default font/border/etc."""
+    return {
+        'font': font,
+        'fill': fill,
+        'border': border,
+        'number_format': number_format,
+        'alignment': alignment,
+    }
+
+
+# Style ID -> spec, filled in by each builder module at import time
+STYLE_SPECS = {}
+
+
+def register_styles(specs: dict) -> None:
+    """Declare style IDs (namespaced per module, e.g. 'enh.*', 'intel.*')."""
+    STYLE_SPECS.update(specs)
+
+
+# =============================================================================
+# PER-WORKBOOK REGISTRY
+# =============================================================================
+
+class StyleRegistry:
+    """Named styles of one workbook, created lazily from STYLE_SPECS."""
+
+    def __init__(self, wb):
+        self.wb = wb
+        self._arrays = {}
+
+    def _register(self, style_id):
+        spec = STYLE_SPECS[style_id]
+        named = NamedStyle(
+            name=STYLE_PREFIX + style_id,
+            # NamedStyle's own fallbacks (Font(), Border()) are not the
+            # workbook defaults a plain cell has, so fill those in here
+            font=spec['font'] or DEFAULT_FONT,
+            fill=spec['fill'],
+            border=spec['border'] or DEFAULT_BORDER,
+            alignment=spec['alignment'],
+            number_format=spec['number_format'],
+            hidden=True,
+        )
+        self.wb.add_named_style(named)
+        array = named.as_tuple()
+        self._arrays[style_id] = array
+        return array
+
+    def apply(self, cell, style_id):
+        """Give cell the style registered as style_id; returns the cell."""
+        array = self._arrays.get(style_id)
+        if array is None:
+            array = self._register(style_id)
+        cell._style = copy(array)
+        return cell
+
+
+_REGISTRIES = WeakKeyDictionary()
+
+
+def styles_for(ws_or_wb) -> StyleRegistry:
+    """The StyleRegistry of a worksheet's (or workbook's) workbook."""
+    wb = getattr(ws_or_wb, 'parent', None) or ws_or_wb
+    registry = _REGISTRIES.get(wb)
+    if registry is None:
+        registry = _REGISTRIES[wb] = StyleRegistry(wb)
+    return registry
+
+
+# =============================================================================
+# CONDITIONAL FORMATS
+# =============================================================================
+
+_DIFFERENTIAL = {}
+
+
+def differential_style(style_id) -> DifferentialStyle:
+    """style_id as a conditional-format (dxf) style: font, fill and border."""
+    dxf = _DIFFERENTIAL.get(style_id)
+    if dxf is None:
+        spec = STYLE_SPECS[style_id]
+        fill = spec['fill']
+        if fill is not None and fill.fill_type == 'solid':
+            # Excel paints a dxf solid fill with bgColor, a cell's with fgColor
+            fill = PatternFill('solid', fgColor=copy(fill.fgColor), bgColor=copy(fill.fgColor))
+        dxf = _DIFFERENTIAL[style_id] = DifferentialStyle(font=spec['font'], fill=fill, border=spec['border'])
+    return dxf